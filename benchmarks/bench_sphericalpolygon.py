@@ -0,0 +1,281 @@
+'''
+Benchmark suite for the sphericalpolygon package.
+
+It times the construction, area, perimeter, centroid, inertia and contains_points of
+    1. every plate boundary in NnrMRVL_PltBndsLatLon, one by one and as a PolygonCollection;
+    2. synthetic polygons with 10 to 10^6 vertices;
+    3. point batches of 1 to 10^7 points against a plate boundary;
+    4. the centroid by the legacy dblquad method of a large plate boundary with one and several worker processes,
+and reports the best wall time, throughput and peak memory of each case.
+It also checks the numerical agreement of the fast paths against the reference implementations.
+
+Usage:
+python benchmarks/bench_sphericalpolygon.py [--quick] [--save-baseline baseline.json] [--baseline baseline.json] [--tolerance 1.5]
+
+The results are written as JSON to stdout or to --output. The script exits with status 1 if any agreement check fails,
+unless --skip-checks is given, and with --baseline also if any case is slower than tolerance times its baseline.
+benchmarks/baseline.json is the quick baseline recorded with the commit that last changed the timings;
+timings depend on the machine, so a baseline should be recorded on the machine that runs the comparison.
+It also holds the area, perimeter, centroid and inertia tensor of every plate boundary by the original release (commit 04e9d27), recorded by record_reference.py,
+which are checked against the current outputs unless --reference points elsewhere.
+'''
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from sphericalpolygon import Sphericalpolygon,PolygonCollection
+from sphericalpolygon.inside_polygon import inside_polygon
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','NnrMRVL_PltBndsLatLon')
+REFERENCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),'baseline.json')
+
+# Cases faster than this are too noisy to be compared with the baseline.
+MIN_SECONDS = 1e-3
+
+def synthetic_polygon(n,lat0=10,lon0=170,radius=20):
+    '''
+    A star-shaped, hence simple, polygon with n vertices around (lat0,lon0), which crosses the antimeridian.
+    '''
+    theta = np.linspace(0,2*np.pi,n,endpoint=False)
+    r = radius*(1 + 0.3*np.sin(7*theta))
+    vertices = np.column_stack([lat0 + r*np.sin(theta),lon0 + r*np.cos(theta)/np.cos(np.radians(lat0))])
+    return np.append(vertices,vertices[:1],axis=0)
+
+def random_points(n,seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([np.degrees(np.arcsin(rng.uniform(-1,1,n))),rng.uniform(-180,180,n)])
+
+def plate_files():
+    return sorted(f for f in os.listdir(DATA_DIR) if f != 'All_boundaries')
+
+def measure(func,repeat,items):
+    '''
+    Best wall time over repeat runs, and peak traced memory of an additional run.
+    '''
+    seconds = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = min(seconds,time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'seconds':seconds,'items':items,'throughput':items/seconds if seconds > 0 else np.inf,'peak_mb':peak/2**20}
+
+def run_timings(quick,repeat):
+    results = {}
+    plates = {name:np.loadtxt(os.path.join(DATA_DIR,name),skiprows=1) for name in plate_files()}
+    polygons = [Sphericalpolygon.from_array(vertices) for vertices in plates.values()]
+    n_vertices = sum(len(vertices) for vertices in plates.values())
+
+    # Plate boundaries one by one; properties are recomputed on fresh instances, so that the cache is not timed.
+    results['plates/construct'] = measure(lambda: [Sphericalpolygon.from_array(v) for v in plates.values()],repeat,n_vertices)
+    results['plates/area'] = measure(lambda: [Sphericalpolygon(p.vertices).area() for p in polygons],repeat,n_vertices)
+    results['plates/perimeter'] = measure(lambda: [Sphericalpolygon(p.vertices).perimeter() for p in polygons],repeat,n_vertices)
+    results['plates/centroid'] = measure(lambda: [Sphericalpolygon(p.vertices).centroid(quantity=False) for p in polygons],repeat,n_vertices)
+    results['plates/inertia'] = measure(lambda: [Sphericalpolygon(p.vertices).inertia() for p in polygons],repeat,n_vertices)
+
+    filename = os.path.join(DATA_DIR,'All_boundaries')
+    results['collection/load'] = measure(lambda: PolygonCollection.from_file(filename),repeat,n_vertices)
+    collection = PolygonCollection.from_file(filename)
+    results['collection/properties'] = measure(collection.properties,repeat,n_vertices)
+
+    # Synthetic polygons with increasing numbers of vertices
+    sizes = [10,100,1000,10000] if quick else [10,100,1000,10000,100000,1000000]
+    points = random_points(1000 if quick else 10000)
+    for n in sizes:
+        vertices = synthetic_polygon(n)
+        results['synthetic/{:d}/construct'.format(n)] = measure(lambda: Sphericalpolygon(vertices),repeat,n)
+        results['synthetic/{:d}/perimeter'.format(n)] = measure(lambda: Sphericalpolygon(vertices).perimeter(),repeat,n)
+        results['synthetic/{:d}/inertia'.format(n)] = measure(lambda: Sphericalpolygon(vertices).inertia(),repeat,n)
+        results['synthetic/{:d}/centroid'.format(n)] = measure(lambda: Sphericalpolygon(vertices).centroid(quantity=False),repeat,n)
+        results['synthetic/{:d}/contains_points'.format(n)] = measure(lambda: Sphericalpolygon(vertices).contains_points(points),repeat,len(points))
+
+    # The legacy dblquad integration over a process pool; the other methods are vectorized and do not use the pool.
+    polygon = Sphericalpolygon.from_array(plates['nz' if quick else 'pa'])
+    workers = max(2,min(4,os.cpu_count() or 1))
+    for w in (1,workers):
+        results['dblquad/workers-{:d}/centroid'.format(w)] = measure(lambda: polygon.centroid(method='dblquad',workers=w,quantity=False),1,len(polygon.vertices))
+
+    # Point batches against the Pacific plate
+    polygon = Sphericalpolygon.from_array(plates['pa'])
+    batches = [1,100,10000,1000000] if quick else [1,100,10000,1000000,10000000]
+    for m in batches:
+        points = random_points(m)
+        results['points/{:d}/contains_points'.format(m)] = measure(lambda: polygon.contains_points(points),repeat,m)
+
+    return results
+
+def centroid_diff(a,b):
+    '''
+    Maximal absolute difference of two centroids in form of [lat,lon,depth], with the longitudes compared modulo 360 degrees.
+    '''
+    diff = np.array(a,dtype=float) - np.array(b,dtype=float)
+    diff[1] = np.mod(diff[1] + 180,360) - 180
+    return np.max(np.abs(diff))
+
+def run_checks(quick,reference=None):
+    '''
+    Compare the fast paths with the reference implementations, and the outputs for the plate boundaries with those of the original release recorded in reference;
+    each check records the maximal absolute difference and whether it is within its tolerance.
+    '''
+    checks = {}
+    names = plate_files()
+    polygons = {name:Sphericalpolygon.from_file(os.path.join(DATA_DIR,name),skiprows=1) for name in names}
+
+    # dblquad integrates each side numerically and is slow, so only the plates with fewer vertices are checked in quick mode.
+    limit = 100 if quick else np.inf
+    diff_centroid = diff_inertia = 0
+    for polygon in polygons.values():
+        if len(polygon.vertices) > limit: continue
+        diff_centroid = max(diff_centroid,centroid_diff(polygon.centroid(quantity=False),polygon.centroid(method='dblquad',quantity=False)))
+        diff_inertia = max(diff_inertia,np.max(np.abs(polygon.inertia() - polygon.inertia(method='dblquad'))))
+    # The closed-form side integrals agree with the dblquad path of this version, which shares the signed area with them, within 1e-10. 
+    # Against the original release, whose signed area differs slightly, they are checked with the recorded reference outputs below.
+    checks['centroid/analytic-vs-dblquad'] = {'max_diff':diff_centroid,'tolerance':1e-10}
+    checks['inertia/analytic-vs-dblquad'] = {'max_diff':diff_inertia,'tolerance':1e-10}
+
+    # The Gauss-Legendre path is fast enough to be checked on all plates.
+    diff_centroid = diff_inertia = 0
+    for polygon in polygons.values():
+        diff_centroid = max(diff_centroid,centroid_diff(polygon.centroid(quantity=False),polygon.centroid(method='gauss',quantity=False)))
+        diff_inertia = max(diff_inertia,np.max(np.abs(polygon.inertia() - polygon.inertia(method='gauss'))))
+    checks['centroid/analytic-vs-gauss'] = {'max_diff':diff_centroid,'tolerance':1e-10}
+    checks['inertia/analytic-vs-gauss'] = {'max_diff':diff_inertia,'tolerance':1e-10}
+
+    if reference:
+        diffs = {'area':0,'perimeter':0,'centroid':0,'depth':0,'inertia':0}
+        for name,outputs in reference.items():
+            polygon = polygons[name]
+            centroid = polygon.centroid(quantity=False)
+            diffs['area'] = max(diffs['area'],abs(polygon.area() - outputs['area']))
+            diffs['perimeter'] = max(diffs['perimeter'],abs(polygon.perimeter() - outputs['perimeter']))
+            diffs['centroid'] = max(diffs['centroid'],centroid_diff(list(centroid[:2]) + [0],outputs['centroid'][:2] + [0]))
+            diffs['depth'] = max(diffs['depth'],abs(centroid[2] - outputs['centroid'][2]))
+            diffs['inertia'] = max(diffs['inertia'],np.max(np.abs(polygon.inertia() - outputs['inertia'])))
+        # The original release summed arccos of the inner products for the perimeter, which loses about 1e-8 per short side, up to 2e-7 over a plate;
+        # side_lengths uses atan2 instead. The signed area by side_excess differs from the original one by up to 2e-11 and agrees with the Gauss-Bonnet area below within 1e-14.
+        # The depth of the centroid, one minus the length of the first moment over the area, changes by the relative change of the area,
+        # which reaches 1.2e-8 for the smallest plate (MN, with an area of 2e-4); the latitude and longitude do not depend on the area.
+        checks['area/vs-reference'] = {'max_diff':diffs['area'],'tolerance':1e-10}
+        checks['perimeter/vs-reference'] = {'max_diff':diffs['perimeter'],'tolerance':5e-7}
+        checks['centroid/vs-reference'] = {'max_diff':diffs['centroid'],'tolerance':1e-10}
+        checks['depth/vs-reference'] = {'max_diff':diffs['depth'],'tolerance':5e-8}
+        checks['inertia/vs-reference'] = {'max_diff':diffs['inertia'],'tolerance':1e-10}
+
+    # The area by the Gauss-Bonnet theorem, from the turning angles at the vertices, is independent of polygon_excess.
+    diff_area = 0
+    for polygon in polygons.values():
+        xyz = polygon.xyz[:-1]
+        xyz = xyz[np.any(xyz != np.roll(xyz,1,axis=0),axis=1)]
+        normals = np.cross(xyz,np.roll(xyz,-1,axis=0))
+        normals /= np.linalg.norm(normals,axis=1,keepdims=True)
+        turning = np.arctan2(np.sum(np.cross(np.roll(normals,1,axis=0),normals)*xyz,axis=1),np.sum(np.roll(normals,1,axis=0)*normals,axis=1))
+        area = np.mod(2*np.pi - turning.sum(),4*np.pi)
+        area = min(area,4*np.pi - area)
+        diff_area = max(diff_area,abs(area - polygon.area()))
+    checks['area/excess-vs-gauss-bonnet'] = {'max_diff':diff_area,'tolerance':1e-9}
+
+    # Containment: the indexed test against the winding test on all plates, and against the original per-point test on a subset.
+    points = random_points(2000 if quick else 20000,seed=1)
+    mismatches = 0
+    for polygon in polygons.values():
+        mismatches += np.sum(polygon.contains_points(points) != polygon.contains_points(points,method='winding'))
+    checks['contains_points/index-vs-winding'] = {'max_diff':int(mismatches),'tolerance':0}
+
+    mismatches = 0
+    for name in ['an','pa','nz','ca']:
+        polygon = polygons[name]
+        reference = np.array([inside_polygon(point,polygon.vertices,polygon.orientation) for point in points[:200]])
+        mismatches += np.sum(polygon.contains_points(points[:200]) != reference)
+    checks['contains_points/index-vs-reference'] = {'max_diff':int(mismatches),'tolerance':0}
+
+    # The batched collection kernels against the single polygon methods
+    collection = PolygonCollection.from_file(os.path.join(DATA_DIR,'All_boundaries'))
+    props = collection.properties()
+    diff = 0
+    for k in range(len(collection)):
+        polygon = collection[k]
+        diff = max(diff,abs(props['area'][k] - polygon.area()),abs(props['perimeter'][k] - polygon.perimeter()),np.max(np.abs(props['inertia'][k] - polygon.inertia())))
+    checks['collection/batched-vs-single'] = {'max_diff':diff,'tolerance':1e-10}
+
+    for check in checks.values():
+        check['passed'] = bool(check['max_diff'] <= check['tolerance'])
+    return checks
+
+def compare(results,baseline,tolerance):
+    '''
+    Cases slower than tolerance times their baselines
+    '''
+    slowdowns = {}
+    for name,result in results.items():
+        if name not in baseline: continue
+        reference = baseline[name]['seconds']
+        if max(reference,result['seconds']) < MIN_SECONDS: continue
+        if result['seconds'] > tolerance*reference: slowdowns[name] = result['seconds']/reference
+    return slowdowns
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark suite for the sphericalpolygon package.')
+    parser.add_argument('--quick',action='store_true',help='smaller polygons and point batches, and fewer dblquad checks')
+    parser.add_argument('--repeat',type=int,default=3,help='number of timed runs per case; the best one is reported')
+    parser.add_argument('--output',help='write the results as JSON to this file instead of stdout')
+    parser.add_argument('--save-baseline',help='record the timings as a baseline JSON file')
+    parser.add_argument('--baseline',help='compare the timings with a baseline JSON file')
+    parser.add_argument('--tolerance',type=float,default=1.5,help='allowed ratio of the time over the baseline time')
+    parser.add_argument('--skip-checks',action='store_true',help='skip the numerical agreement checks')
+    parser.add_argument('--reference',default=REFERENCE_FILE,help='JSON file with the reference outputs of the original release for the plate boundaries')
+    args = parser.parse_args(argv)
+
+    report = {'timings':run_timings(args.quick,args.repeat)}
+    if not args.skip_checks:
+        reference = None
+        if os.path.exists(args.reference):
+            with open(args.reference) as f:
+                reference = json.load(f).get('reference')
+        report['checks'] = run_checks(args.quick,reference)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['timings']
+        report['slowdowns'] = compare(report['timings'],baseline,args.tolerance)
+        failed = bool(report['slowdowns'])
+    if 'checks' in report:
+        failed = failed or not all(check['passed'] for check in report['checks'].values())
+
+    if args.save_baseline:
+        # The recorded reference outputs are kept.
+        baseline = {}
+        if os.path.exists(args.save_baseline):
+            with open(args.save_baseline) as f:
+                baseline = json.load(f)
+        baseline['timings'] = report['timings']
+        with open(args.save_baseline,'w') as f:
+            json.dump(baseline,f,indent=2)
+
+    text = json.dumps(report,indent=2,default=float)
+    if args.output:
+        with open(args.output,'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    for name in sorted(report['timings']):
+        result = report['timings'][name]
+        print('{:40s} {:10.4f} s {:14.1f} /s {:10.1f} MB'.format(name,result['seconds'],result['throughput'],result['peak_mb']),file=sys.stderr)
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+'''
+Record the area, perimeter, centroid and inertia tensor of every plate boundary in NnrMRVL_PltBndsLatLon as reference outputs in a baseline JSON file,
+against which bench_sphericalpolygon.py checks the current implementation.
+
+The script only uses the methods of the original release, so that it can run against an earlier checkout of the package,
+such as the one the references in benchmarks/baseline.json were recorded with:
+
+git worktree add /tmp/sphericalpolygon-04e9d27 04e9d27
+PYTHONPATH=/tmp/sphericalpolygon-04e9d27 python benchmarks/record_reference.py benchmarks/baseline.json
+
+Usage:
+python benchmarks/record_reference.py baseline.json
+'''
+import json
+import os
+import sys
+
+import numpy as np
+
+from sphericalpolygon import Sphericalpolygon
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','NnrMRVL_PltBndsLatLon')
+
+def record(filename):
+    reference = {}
+    for name in sorted(f for f in os.listdir(DATA_DIR) if f != 'All_boundaries'):
+        polygon = Sphericalpolygon.from_file(os.path.join(DATA_DIR,name),skiprows=1)
+        lat,lon,depth = polygon.centroid()
+        reference[name] = {'area':float(polygon.area()),'perimeter':float(polygon.perimeter()),
+                           'centroid':[float(getattr(lat,'value',lat)),float(getattr(lon,'value',lon)),float(depth)],
+                           'inertia':[float(value) for value in polygon.inertia()]}
+
+    baseline = {}
+    if os.path.exists(filename):
+        with open(filename) as f:
+            baseline = json.load(f)
+    baseline['reference'] = reference
+    with open(filename,'w') as f:
+        json.dump(baseline,f,indent=2)
+
+if __name__ == '__main__':
+    record(sys.argv[1])
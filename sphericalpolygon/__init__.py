@@ -8,6 +8,22 @@ Currently, operations on spherical polygons include:
     3. identify the location of the centroid 
     4. compute the geometrical or physical moment of inertia tensor
     5. determine whether one or more points are inside the spherical polygon.
+Multiple spherical polygons, such as all plate boundaries in one file, can be processed at once with PolygonCollection,
+and PolygonLocator finds which of them contains each point. batch_properties computes the centroids and inertia tensors
+of thousands of spherical polygons over a process pool. MutableSphericalpolygon updates the properties with a constant number of side evaluations
+when a single vertex is moved, inserted or removed, and PolygonCache reuses the polygons built from the same vertices. rasterize_latlon and rasterize_healpix fill global grids
+with one or many spherical polygons, and rotation_matrices converts scipy Rotations or Euler poles for the rotated properties.
+The mass, center of mass and inertia tensor can be integrated with a variable area density, given as a function or on a grid through density_field.
+The module instrument records the calls, wall times and counts of the stages on request.
 '''
 
 from .polygonclasses.sphericalpolygon import Sphericalpolygon
+from .polygonclasses.polygoncollection import PolygonCollection
+from .polygonclasses.polygonlocator import PolygonLocator
+from .polygonclasses.mutablepolygon import MutableSphericalpolygon
+from .polygonclasses.polygoncache import PolygonCache
+from .batch import batch_properties
+from .raster import rasterize_latlon,rasterize_healpix
+from .rotation import rotation_matrices
+from .density import density_field
+from . import instrument
@@ -0,0 +1,88 @@
+import numpy as np
+
+from .centroid import polygon_centroid
+from .inertia import polygon_inertia
+
+def _batch_chunk(task):
+    '''
+    Centroids and inertia tensors over a unit sphere of the polygons in one chunk.
+    '''
+    from .polygonclasses.polygoncollection import PolygonCollection
+
+    vertices,offsets,method = task
+    if method == 'analytic':
+        collection = PolygonCollection([''] * (len(offsets) - 1),vertices,offsets)
+        return collection.centroid(),collection.inertia()
+
+    polygons = [vertices[offsets[k]:offsets[k+1]] for k in range(len(offsets) - 1)]
+    centroids = np.array([polygon_centroid(polygon,method) for polygon in polygons]).reshape(-1,3)
+    inertias = np.array([polygon_inertia(polygon,method) for polygon in polygons]).reshape(-1,6)
+    return centroids,inertias
+
+def batch_properties(polygons,offsets=None,R=1,rho=1,method='analytic',workers=1,chunk_size=256,progress=None,executor=None):
+    '''
+    Calculate the centroids and the geometrical or physical(if the area density is given) moment of inertia tensors of many spherical polygons,
+    spreading chunks of polygons over a process pool.
+
+    Usage:
+    centroids,inertias = batch_properties([polygon_a,polygon_b])
+    centroids,inertias = batch_properties(vertices,offsets,6378.137,[81,95],workers=4,progress=print)
+
+    Inputs:
+    polygons -> [list, float 2d array or PolygonCollection] instances of class Sphericalpolygon or float 2d arrays of closed polygons in form of [[lat_0,lon_0],...,[lat_n,lon_n]] with unit of degrees;
+    the packed vertices of all polygons together with offsets; or an instance of class PolygonCollection.
+
+    Parameters:
+    offsets -> [int array, optional, default = None] for packed vertices, the k-th polygon takes the vertices from offsets[k] to offsets[k+1]-1
+    R -> [optional, float, default = 1] sphere radius
+    rho -> [optional, float or float array, default = 1] area density of all polygons, or of each polygon in order
+    method -> [optional, str, default = 'analytic'] 'analytic' for the closed-form side integrals, 'gauss' or 'adaptive' for Gauss-Legendre rules with their default order and tolerance, 
+    or 'dblquad' for the legacy numerical integration
+    workers -> [optional, int, default = 1] number of processes over which the chunks are spread
+    chunk_size -> [optional, int, default = 256] number of polygons per chunk
+    progress -> [optional, callable, default = None] called as progress(done,total) with the numbers of finished and all polygons after each chunk
+    executor -> [optional, concurrent.futures.Executor, default = None] an existing thread or process pool to use instead of creating one
+
+    Outputs:
+    centroids -> [float 2d array] centroids in form of [[lat_0,lon_0,depth_0],...] in order of the polygons, with lat and lon in degrees
+    inertias -> [float 2d array] inertia tensors in order of the polygons, each with six components M_{11}, M_{22}, M_{33}, M_{12}, M_{13}, and M_{23}
+    '''
+    if method not in ('analytic','gauss','adaptive','dblquad'):
+        raise Exception("Method for the batch properties can either be 'analytic', 'gauss', 'adaptive' or 'dblquad'.")
+
+    if hasattr(polygons,'offsets'):
+        vertices,offsets = polygons.vertices,polygons.offsets
+    elif offsets is None:
+        polygons = [np.asarray(getattr(polygon,'vertices',polygon),dtype=float) for polygon in polygons]
+        vertices = np.concatenate(polygons) if polygons else np.zeros((0,2))
+        offsets = np.cumsum([0] + [len(polygon) for polygon in polygons])
+    else:
+        vertices = polygons
+    vertices,offsets = np.asarray(vertices,dtype=float),np.asarray(offsets)
+
+    total = len(offsets) - 1
+    tasks = []
+    for i in range(0,total,chunk_size):
+        bounds = offsets[i:i+chunk_size+1]
+        tasks.append((vertices[bounds[0]:bounds[-1]],bounds - bounds[0],method))
+
+    centroids,inertias = np.zeros((total,3)),np.zeros((total,6))
+
+    pool = executor
+    if pool is None and workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        results = map(_batch_chunk,tasks) if pool is None else pool.map(_batch_chunk,tasks)
+        done = 0
+        for centroid,inertia in results:
+            centroids[done:done+len(centroid)] = centroid
+            inertias[done:done+len(inertia)] = inertia
+            done += len(centroid)
+            if progress is not None: progress(done,total)
+    finally:
+        if pool is not executor: pool.shutdown()
+
+    centroids[:,2] *= R
+    inertias *= R**4*np.reshape(rho,(-1,1))
+    return centroids,inertias
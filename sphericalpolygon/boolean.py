@@ -0,0 +1,214 @@
+import numpy as np
+from .functions import xyz2latlon,angles_between,arc_distances,arc_lat_ranges,arc_crossings
+from . import instrument
+
+# Points closer than this angle in radians are taken as coincident, and points closer than it to a side as lying on the side.
+EPSILON = 1e-10
+
+def _ring(polygon):
+    # Unit vectors of the distinct vertices of a polygon, ordered so that the polygon lies on the left of its sides.
+    xyz = polygon.xyz[:-1] if (polygon.xyz[0] == polygon.xyz[-1]).all() else polygon.xyz
+    xyz = xyz[angles_between(xyz,np.roll(xyz,-1,axis=0)) > EPSILON]
+    if polygon.orientation == 'Clockwise': xyz = xyz[::-1]
+    return _remove_spikes(xyz)
+
+def _remove_spikes(xyz):
+    # Remove the zero-width spikes that go out and back along the same path, which enclose no area but would be clipped inconsistently.
+    while len(xyz) > 3:
+        tip = angles_between(np.roll(xyz,1,axis=0),np.roll(xyz,-1,axis=0)) < EPSILON
+        if not tip.any(): return xyz
+
+        # Start the ring just before a tip, and fold the spikes back with a stack.
+        stack = []
+        for point in np.roll(xyz,1 - int(np.argmax(tip)),axis=0):
+            if len(stack) >= 2 and np.sum((point - stack[-2])**2) < EPSILON**2:
+                stack.pop()
+            else:
+                stack.append(point)
+        xyz = np.array(stack)
+    return xyz
+
+def side_pairs(xyz_a,xyz_b):
+    '''
+    Find the pairs of sides of two closed rings whose latitude-longitude boxes share a cell of a grid, as candidates for intersections.
+    Each side is registered in the cells of its box, so that only the sides in the same cells are compared instead of all pairs.
+    '''
+    rings = [xyz_a,xyz_b]
+    n_lat = max(1,int(np.sqrt((len(xyz_a) + len(xyz_b))/2)))
+    n_lon = 2*n_lat
+
+    cells,sides = [],[]
+    for xyz in rings:
+        a,b = xyz,np.roll(xyz,-1,axis=0)
+        low,high = arc_lat_ranges(a,b)
+        lat_a,lon_a,_ = xyz2latlon(a)
+        lat_b,lon_b,_ = xyz2latlon(b)
+        dlon = (lon_b - lon_a + 180) % 360 - 180
+        west,east = np.minimum(lon_a,lon_a + dlon),np.maximum(lon_a,lon_a + dlon)
+
+        # Sides near the poles may cover all longitudes.
+        polar = (high > 90 - 1e-6) | (low < -90 + 1e-6)
+        west,east = np.where(polar,0,west),np.where(polar,360 - 1e-9,east)
+
+        i0 = np.clip(((low + 90)/180*n_lat).astype(int),0,n_lat-1)
+        i1 = np.clip(((high + 90)/180*n_lat).astype(int),0,n_lat-1)
+        j0 = np.floor(west/360*n_lon).astype(int)
+        j1 = np.floor(east/360*n_lon).astype(int)
+
+        counts = (i1 - i0 + 1)*(j1 - j0 + 1)
+        side = np.repeat(np.arange(len(xyz)),counts)
+        k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts,counts)
+        width = (j1 - j0 + 1)[side]
+        cells.append((i0[side] + k//width)*n_lon + (j0[side] + k % width) % n_lon)
+        sides.append(side)
+
+    # Join the registrations of the two rings on the cells.
+    order = np.argsort(cells[1],kind='stable')
+    cells_b,sides_b = cells[1][order],sides[1][order]
+    starts,stops = np.searchsorted(cells_b,cells[0],'left'),np.searchsorted(cells_b,cells[0],'right')
+    counts = stops - starts
+    pair_a = np.repeat(sides[0],counts)
+    pair_b = sides_b[np.repeat(starts - np.cumsum(counts) + counts,counts) + np.arange(counts.sum())]
+
+    keys = np.unique(pair_a.astype(np.int64)*len(xyz_b) + pair_b)
+    return keys//len(xyz_b),keys % len(xyz_b)
+
+def _find(parent,i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def _split_rings(xyz_a,xyz_b):
+    '''
+    Split the sides of two rings at their intersections and at the vertices of one ring lying on the sides of the other.
+    The vertices and intersections are numbered as nodes, where coincident vertices of the two rings share a node.
+    '''
+    n_a,n_b = len(xyz_a),len(xyz_b)
+    ia,ib = side_pairs(xyz_a,xyz_b)
+    a0,a1 = xyz_a[ia],xyz_a[(ia + 1) % n_a]
+    b0,b1 = xyz_b[ib],xyz_b[(ib + 1) % n_b]
+
+    nodes = [xyz_a,xyz_b]
+    splits = {0:[],1:[]}
+    parent = list(range(n_a + n_b))
+
+    # Vertices of one ring on the sides of the other, including coincident vertices
+    for ring,sides,starts,ends,others,other_ids in [(0,ia,a0,a1,(b0,b1),(n_a + ib,n_a + (ib + 1) % n_b)),
+                                                     (1,ib,b0,b1,(a0,a1),(ia,(ia + 1) % n_a))]:
+        for points,ids in zip(others,other_ids):
+            on_side = arc_distances(points,starts,ends) < EPSILON
+            at_start = angles_between(points,starts) < EPSILON
+            at_end = angles_between(points,ends) < EPSILON
+            interior = on_side & ~at_start & ~at_end
+            splits[ring].append((sides[interior],angles_between(points[interior],starts[interior]),ids[interior]))
+
+            if ring == 0:
+                start_ids,end_ids = ia,(ia + 1) % n_a
+                for i,j in zip(np.concatenate([start_ids[at_start],end_ids[at_end]]),np.concatenate([ids[at_start],ids[at_end]])):
+                    ri,rj = _find(parent,i),_find(parent,j)
+                    if ri != rj: parent[max(ri,rj)] = min(ri,rj)
+
+    # Proper crossings in the interiors of both sides
+    crossing,p = arc_crossings(a0,a1,b0,b1,EPSILON)
+    ids = n_a + n_b + np.arange(crossing.sum())
+    nodes.append(p[crossing])
+    splits[0].append((ia[crossing],angles_between(p[crossing],a0[crossing]),ids))
+    splits[1].append((ib[crossing],angles_between(p[crossing],b0[crossing]),ids))
+
+    nodes = np.vstack(nodes)
+    parent += list(range(len(parent),len(nodes)))
+    roots = np.array([_find(parent,i) for i in range(len(nodes))])
+
+    # Walk each ring through its vertices and the splitting nodes in order along the sides.
+    sequences = []
+    for ring,n,offset in [(0,n_a,0),(1,n_b,n_a)]:
+        sides = np.concatenate([np.arange(n)] + [s[0] for s in splits[ring]])
+        t = np.concatenate([np.zeros(n)] + [s[1] for s in splits[ring]])
+        ids = np.concatenate([offset + np.arange(n)] + [s[2] for s in splits[ring]])
+        sequence = roots[ids[np.lexsort((t,sides))]]
+        sequence = sequence[sequence != np.roll(sequence,1)]
+        sequences.append(sequence)
+    return nodes,sequences
+
+def _chain(nodes,starts,ends):
+    # Link the kept sub-sides into closed rings of nodes.
+    starts,ends = starts.tolist(),ends.tolist()
+    outgoing = {}
+    for k,s in enumerate(starts): outgoing.setdefault(s,[]).append(k)
+
+    used = [False]*len(starts)
+    rings = []
+    for k in range(len(starts)):
+        if used[k]: continue
+        ring = []
+        while not used[k]:
+            used[k] = True
+            ring.append(starts[k])
+            candidates = [j for j in outgoing.get(ends[k],[]) if not used[j]]
+            if not candidates: break
+            k = candidates[0]
+        if len(ring) >= 3: rings.append(nodes[ring])
+    return rings
+
+@instrument.timed('boolean_rings',lambda polygon_a,polygon_b,operation: {'edges':len(polygon_a.vertices) + len(polygon_b.vertices) - 2})
+def boolean_rings(polygon_a,polygon_b,operation):
+    '''
+    Clip two spherical polygons with each other along their great-circle sides.
+
+    Usage:
+    rings = boolean_rings(polygon_a,polygon_b,'intersection')
+
+    Inputs:
+    polygon_a,polygon_b -> instances of class Sphericalpolygon
+    operation -> [str] Avaliable options are 'intersection', 'union' and 'difference', where the difference is polygon_a minus polygon_b.
+
+    Outputs:
+    rings -> [list of float 2d arrays] closed boundaries of the result in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees, each with the result on its left.
+    An outer boundary is thus counterclockwise, and the boundary of a hole is clockwise.
+    '''
+    if operation not in ('intersection','union','difference'):
+        raise Exception("Operation can either be 'intersection', 'union' or 'difference'.")
+
+    xyz_a,xyz_b = _ring(polygon_a),_ring(polygon_b)
+    nodes,(seq_a,seq_b) = _split_rings(xyz_a,xyz_b)
+
+    # The difference is the intersection with the complement of polygon_b, which lies on the left of its reversed boundary.
+    complement = operation == 'difference'
+    if complement: seq_b = seq_b[::-1]
+    keep_inside = operation != 'union'
+
+    n = len(nodes)
+    starts,ends,keys = [],[],[]
+    for seq in (seq_a,seq_b):
+        s,e = seq,np.roll(seq,-1)
+        starts.append(s); ends.append(e); keys.append(s.astype(np.int64)*n + e)
+
+    # Sides shared by both boundaries: in the same direction, they bound both polygons on the same side and are kept once;
+    # in opposite directions, the polygons lie on their two sides and the sides are dropped.
+    same_a = np.isin(keys[0],keys[1])
+    opposite_a = np.isin(ends[0].astype(np.int64)*n + starts[0],keys[1])
+    opposite_b = np.isin(ends[1].astype(np.int64)*n + starts[1],keys[0])
+    same_b = np.isin(keys[1],keys[0])
+
+    kept = []
+    for k,(other,shared,opposite) in enumerate([(polygon_b,same_a,opposite_a),(polygon_a,same_b,opposite_b)]):
+        s,e = starts[k],ends[k]
+        free = ~shared & ~opposite
+        mids = nodes[s[free]] + nodes[e[free]]
+        lats,lons,_ = xyz2latlon(mids)
+        inside = np.asarray(other.contains_points(np.column_stack([lats,lons])),dtype=bool).reshape(-1)
+        if complement and k == 0: inside = ~inside
+
+        keep = np.zeros(len(s),dtype=bool)
+        keep[free] = inside if keep_inside else ~inside
+        if k == 0: keep |= shared
+        kept.append((s[keep],e[keep]))
+
+    rings = _chain(nodes,np.concatenate([kept[0][0],kept[1][0]]),np.concatenate([kept[0][1],kept[1][1]]))
+    results = []
+    for xyz in rings:
+        lats,lons,_ = xyz2latlon(xyz)
+        vertices = np.column_stack([lats,lons])
+        results.append(np.vstack([vertices,vertices[:1]]))
+    return results
@@ -1,54 +1,74 @@
 import numpy as np
-from scipy.integrate import dblquad
-from astropy.coordinates import cartesian_to_spherical
-from astropy import units as u
 from .excess_area import polygon_excess
 from .functions import *
+from . import instrument
 
-def polygon_centroid(vertices):
+@instrument.timed('polygon_centroid',lambda vertices,*args,**kwargs: {'edges':len(vertices) - 1})
+def polygon_centroid(vertices,method='analytic',workers=1,executor=None,tol=None,order=None,error=False):
     '''
     Calculate the centroid of a spherical polygon over a unit sphere.
 
     Usage:
-    inertia = polygon_centroid(vertices)
+    centroid = polygon_centroid(vertices)
+    centroid = polygon_centroid(vertices,'dblquad')
+    centroid,err = polygon_centroid(vertices,'adaptive',tol=1e-4,error=True)
 
     Inputs:
     vertices -> [float 2d array] Vertices of the spherical polygon in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
     Vertices can be arranged either counterclockwise or clockwise.
 
+    Parameters:
+    method -> [optional, str, default = 'analytic'] Avaliable options are 'analytic', 'gauss', 'adaptive' and 'dblquad'. 
+    If 'analytic', all sides are evaluated at once by the closed-form side integrals; 
+    if 'gauss', the region between each side and the North Pole is integrated by a fixed-order Gauss-Legendre rule, vectorized over all sides;
+    if 'adaptive', the order of the Gauss-Legendre rule is doubled side by side until the estimated error is within tol;
+    if 'dblquad', each side is integrated numerically with scipy, which is much slower and mainly for cross-checking.
+    workers -> [optional, int, default = 1] number of processes over which sides and components are integrated in the 'dblquad' method
+    executor -> [optional, concurrent.futures.Executor, default = None] an existing thread or process pool to use in the 'dblquad' method instead of creating one.
+    The other methods are vectorized over the sides in one process and ignore workers and executor.
+    tol -> [optional, float, default = None] For 'adaptive', the error tolerance relative to the area of the polygon, 1e-10 if None; 
+    for 'dblquad', the absolute and relative tolerances of scipy for each side, its defaults if None.
+    order -> [optional, int, default = None] number of Gauss-Legendre nodes in longitude and latitude for 'gauss', 16 if None; or the starting number for 'adaptive', 4 if None
+    error -> [optional, bool, default = False] If True, the estimated error is returned as well.
+
     Outputs:
     lat,lon,depth -> [float array with 3 elements] centroid location with lat and lon in degrees, and depth less than 1
+    err -> [float] estimated distance from the computed centroid to the exact one; for 'analytic', only rounding errors are estimated.
 
     Note: The spherical polygon has a latitude range of [-90°,90°] and a longitude range of [-180°,180°] or [0°,360°].
     ''' 
-    N = len(vertices)
-    
-    # Initialize the 3 components of the centroid coordinate
-    sumx,sumy,sumz = np.zeros(3)
+    if method == 'analytic':
+        centroid = _polygon_centroid_analytic(vertices)
+        err = np.finfo(float).eps*len(vertices)
+    elif method in ('gauss','adaptive','dblquad'):
+        centroid,err = _polygon_centroid_numeric(vertices,method,workers,executor,tol,order)
+    else:
+        raise Exception("Method for the centroid can either be 'analytic', 'gauss', 'adaptive' or 'dblquad'.")
 
-    for i in range(N - 1):
-        p1 = np.radians(vertices[i])
-        p2 = np.radians(vertices[i+1]) 
-        
-        pdlon = p2[1]-p1[1]
-        if pdlon < -np.pi: p2[1] = p2[1] + 2*np.pi 
-        if pdlon > np.pi: p2[1] = p2[1] - 2*np.pi 
- 
-        # If two adjacent vertices are close enough(coincident), do nothing. 
-        if np.abs(pdlon)  < 1e-6: continue 
-            
-        c1,c2,c3= integrate_coeffs(p1,p2)    
+    lat,lon,r = xyz2latlon(np.array(centroid)) 
+    depth = 1 - r
+    if error: return np.array([lat,lon,depth]),err
+    return np.array([lat,lon,depth])
 
-        # Calculate the centroid coordinate
-        sx = dblquad(fx, p1[1], p2[1], fs_low,fs_up)
-        sy = dblquad(fy, p1[1], p2[1], fs_low,fs_up)
-        sz = dblquad(fz, p1[1], p2[1], fs_low,fs_up)
-        
-        sumx += sx[0] 
-        sumy += sy[0]
-        sumz += sz[0] 
-        
+def _polygon_centroid_analytic(vertices):
+    excess = polygon_excess(vertices)
+    first,second = edge_moments(latlon2xyz(vertices[:,0],vertices[:,1]))
+    area,first,second = region_moments(first.sum(axis=0),second.sum(axis=0),excess)
+    return first/area
+
+def _polygon_centroid_numeric(vertices,method,workers=1,executor=None,tol=None,order=None):
     excess = polygon_excess(vertices)    
+    area = np.mod(excess,4*np.pi)
+    area = min(area,4*np.pi - area)
+
+    # Each side and component is integrated independently, so they can be spread over a pool or vectorized.
+    if method == 'dblquad':
+        sums,errors = dblquad_sums([fx,fy,fz],vertices,'polygon_centroid',workers,executor,tol)
+    else:
+        target = (1e-10 if tol is None else tol)*area if method == 'adaptive' else None
+        if order is None: order = 4 if method == 'adaptive' else 16
+        sums,errors = gauss_sums([fx,fy,fz],vertices,'polygon_centroid',order,target)
+    sumx,sumy,sumz = sums
   
     # For counterclockwise arrangement
     if excess > 0 and excess < 2*np.pi: 
@@ -72,8 +92,4 @@ def polygon_centroid(vertices):
         centroidy = sumy/(4*np.pi + excess)
         centroidz = sumz/(4*np.pi + excess)
 
-    r,lat,lon = cartesian_to_spherical(centroidx,centroidy,centroidz) 
-    depth = 1 - r
-    lat,lon = lat.to(u.deg).value,lon.to(u.deg).value 
-     
-    return np.array([lat,lon,depth])
\ No newline at end of file
+    return (centroidx,centroidy,centroidz),np.linalg.norm(errors)/area
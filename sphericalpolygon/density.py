@@ -0,0 +1,109 @@
+import numpy as np
+from .excess_area import polygon_excess
+from .functions import gauss_sums,sphere_sums
+from . import instrument
+
+def density_field(values,lon_start=-180):
+    '''
+    Interpolate a density given on a global regular latitude-longitude grid bilinearly between the centers of the cells,
+    periodically in longitude and constant beyond the outermost rows towards the poles.
+
+    Usage:
+    density = density_field(grid)
+    rho = density(lats,lons)
+
+    Inputs:
+    values -> [float 2d array with shape (n_lat,n_lon)] density of the cells laid out as in rasterize_latlon,
+    where the cell (i,j) is centered at lat = -90 + (i+0.5)*dlat and lon = lon_start + (j+0.5)*dlon with dlat = 180/n_lat and dlon = 360/n_lon.
+
+    Parameters:
+    lon_start -> [float, optional, default = -180] western longitude of the first column
+
+    Outputs:
+    density -> [function] density as a function of arrays of lat and lon in degrees
+    '''
+    values = np.asarray(values,dtype=float)
+    n_lat,n_lon = values.shape
+    dlat,dlon = 180/n_lat,360/n_lon
+
+    def density(lat,lon):
+        i = np.clip((np.asarray(lat) + 90)/dlat - 0.5,0,n_lat - 1)
+        j = np.mod((np.asarray(lon) - lon_start)/dlon - 0.5,n_lon)
+        i0,j0 = np.floor(i).astype(int),np.floor(j).astype(int) % n_lon
+        i1,j1 = np.minimum(i0 + 1,n_lat - 1),(j0 + 1) % n_lon
+        wi,wj = i - np.floor(i),j - np.floor(j)
+        return (1 - wi)*((1 - wj)*values[i0,j0] + wj*values[i0,j1]) + wi*((1 - wj)*values[i1,j0] + wj*values[i1,j1])
+    return density
+
+def density_function(rho):
+    '''
+    Convert a density given as a scalar, a function of lat and lon in degrees, or a grid as accepted by density_field into a function of lat and lon in degrees.
+    '''
+    if callable(rho): return rho
+    if np.ndim(rho) == 2: return density_field(rho)
+    if np.ndim(rho) == 0: return lambda lat,lon: np.full(np.shape(lat),float(rho))
+    raise Exception('Density can either be a scalar, a function of lat and lon in degrees, or a 2d array on a global latitude-longitude grid.')
+
+def _moment_integrands(density):
+    # Area density times the Jacobian cos(lat), times 1, x, y, z, xx, yy, zz, xy, xz and yz over a unit sphere, with lat and lon in radians
+    def integrands(lat,lon):
+        lat,lon = np.broadcast_arrays(lat,lon)
+        rho = density(np.degrees(lat),np.mod(np.degrees(lon) + 180,360) - 180)*np.cos(lat)
+        x,y,z = np.cos(lat)*np.cos(lon),np.cos(lat)*np.sin(lon),np.sin(lat)
+        return np.stack([rho,rho*x,rho*y,rho*z,rho*x*x,rho*y*y,rho*z*z,rho*x*y,rho*x*z,rho*y*z])
+    return integrands
+
+@instrument.timed('density_moments',lambda vertices,*args,**kwargs: {'edges':len(vertices) - 1})
+def density_moments(vertices,rho,order=None,tol=None):
+    '''
+    Integrate the mass, first moment and second moment of a spherical polygon with a variable area density over a unit sphere
+    in one pass over the sides, by Gauss-Legendre rules over the regions between each side and the North Pole, vectorized over all sides.
+
+    Usage:
+    mass,first,second,errors = density_moments(vertices,lambda lat,lon: 3.3 - 0.3*np.sin(np.radians(lat))**2)
+    mass,first,second,errors = density_moments(vertices,grid,tol=1e-6)
+
+    Inputs:
+    vertices -> [float 2d array] Vertices of the spherical polygon in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+    rho -> [float, function, or float 2d array] area density as a scalar; a vectorized function of arrays of lat and lon in degrees, with lon in [-180,180);
+    or a grid as accepted by density_field, which is interpolated bilinearly.
+
+    Parameters:
+    order -> [optional, int, default = None] number of Gauss-Legendre nodes in longitude and latitude; 16 if None, or the starting number if tol is given, 4 if None.
+    tol -> [optional, float, default = None] If given, the order is doubled side by side until the estimated error of each moment is within tol relative to the mass.
+
+    Outputs:
+    mass -> [float] integral of the density over the polygon
+    first -> [float array with 3 elements] integrals of the density times x, y and z
+    second -> [float array with 6 elements] integrals of the density times xx, yy, zz, xy, xz and yz
+    errors -> [float array with 10 elements] estimated absolute errors of the mass, first and second moments
+
+    Note: The density should be smooth over the polygon for the rules to converge quickly; the order for a grid should resolve its cells.
+    If the regions between the sides and the North Pole cover the complement of the polygon, the moments over the whole sphere are integrated as well.
+    '''
+    integrands = _moment_integrands(density_function(rho))
+    excess = polygon_excess(vertices)
+    complement = np.abs(excess) >= 2*np.pi
+    if order is None: order = 16 if tol is None else 4
+
+    target = None
+    if tol is not None:
+        # The tolerance is scaled by an estimate of the mass from the rules of the starting order.
+        sums = gauss_sums(integrands,vertices,'density_moments',order)[0]
+        whole = sphere_sums(integrands,'density_moments',order)[0] if complement else None
+        target = tol*max(np.abs(_select(sums,whole,excess)[0]),np.finfo(float).tiny)
+
+    sums,errors = gauss_sums(integrands,vertices,'density_moments',order,target)
+    whole = None
+    if complement:
+        whole,whole_errors = sphere_sums(integrands,'density_moments',order,target)
+        errors = errors + whole_errors
+    moments = _select(sums,whole,excess)
+    return moments[0],moments[1:4],moments[4:],errors
+
+def _select(sums,whole,excess):
+    # Consistent with the orientation of the polygon, the region with an area not greater than 2π is selected from the integrals over the sides and the whole sphere.
+    if 0 < excess < 2*np.pi: return sums
+    if -2*np.pi < excess < 0: return -sums
+    if excess == 0: return np.zeros_like(sums)
+    return whole - sums if excess > 0 else whole + sums
@@ -1,6 +1,7 @@
 import numpy as np
-from .functions import hav
+from . import instrument
 
+@instrument.timed('polygon_excess',lambda vertices: {'edges':len(vertices) - 1})
 def polygon_excess(vertices):
     '''
     Calculate the signed area of a spherical polygon over a unit sphere. 
@@ -19,34 +20,37 @@ def polygon_excess(vertices):
     
     Note: The spherical polygon has a latitude range of [-90°,90°] and a longitude range of [-180°,180°] or [0°,360°].
     ''' 
-    N = len(vertices)
+    return side_excess(vertices).sum()
 
-    sum_excess = 0
-    
-    for i in range(N-1):
-        p1,p2 = np.radians(vertices[i]),np.radians(vertices[i+1]) 
-        pdlat,pdlon = p2[0] - p1[0], p2[1] - p1[1] 
-        dlon = np.abs(pdlon) 
-        
-        # If two adjacent vertices are close enough(coincident), do nothing. 
-        if dlon < 1e-6: continue 
+def side_excess(vertices):
+    '''
+    Calculate the signed area of the spherical triangles consisting of each side of a spherical polygon and the North Pole.
 
-        # Calculate the area of a spherical triangle consisting of sides and north poles  
-        if dlon > np.pi: dlon = 2*np.pi - dlon 
-        if pdlon < -np.pi: p2[1] = p2[1] + 2*np.pi 
-        if pdlon > np.pi: p2[1] = p2[1] - 2*np.pi 
-        
-        havb = hav(pdlat) + np.cos(p1[0])*np.cos(p2[0])*hav(dlon) 
-        b = 2*np.arcsin(np.sqrt(havb)) 
-        a,c = np.pi/2 - p1[0], np.pi/2 - p2[0] 
-        s = 0.5*(a + b + c) 
-        t = np.tan(s/2)*np.tan((s - a)/2)*np.tan((s - b)/2)*np.tan((s - c)/2) 
-        excess = 4*np.arctan(np.sqrt(np.abs(t)))
-        if p2[1] - p1[1] < 0: excess = -excess 
-    
-        sum_excess += excess 
+    Usage: 
+    excess = side_excess(vertices)
+
+    Inputs:
+    vertices -> [float 2d array] Vertices of the spherical polygon in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+
+    Outputs:
+    excess -> [float array with n elements] The signed area of the triangles in steradians, which sum up to the signed area of the polygon.
+    '''
+    lats,lons = np.radians(vertices[:,0]),np.radians(vertices[:,1])
+    pdlon = np.diff(lons)
+
+    # Wrap the longitude differences across the antimeridian. 
+    dlon = pdlon.copy()
+    dlon[pdlon < -np.pi] += 2*np.pi
+    dlon[pdlon > np.pi] -= 2*np.pi
+
+    # If two adjacent vertices are close enough(coincident), do nothing. 
+    dlon[np.abs(pdlon) < 1e-6] = 0
 
-    return sum_excess
+    # Calculate the signed area of spherical triangles consisting of sides and north poles.
+    # The formula tan(E/2) = t1*t2*sin(dlon)/(1 + t1*t2*cos(dlon)) with t = tan(π/4 - lat/2) keeps full relative precision for very small sides.
+    t = np.tan(np.pi/4 - lats/2)
+    t12 = t[:-1]*t[1:]
+    return 2*np.arctan2(t12*np.sin(dlon),1 + t12*np.cos(dlon))
 
 def polygon_area(vertices):
     '''
@@ -1,11 +1,178 @@
 import numpy as np
+from . import instrument
 
 # Half-versed-sine
 def hav(x): 
     return (1 - np.cos(x))/2   
 
-# Integeral lowerlimit as a function of longitude.
-def fs_low(lon): 
+# Unit vectors of points given in form of lats and lons with unit of degrees.
+def latlon2xyz(lats,lons):
+    lats,lons = np.radians(lats),np.radians(lons)
+    coslat = np.cos(lats)
+    return np.stack([coslat*np.cos(lons),coslat*np.sin(lons),np.sin(lats)],axis=-1)
+
+# Vertices of a closed polygon, with the first vertex appended to the end if it is not equal to the last one.
+def close_ring(vertices):
+    if (vertices[0] != vertices[-1]).any():
+        vertices = np.append(vertices,[vertices[0]],axis=0)
+    return vertices
+
+# Lats and lons in degrees and radial distances of cartesian coordinates; lons are in [0°,360°).
+def xyz2latlon(xyz):
+    x,y,z = xyz[...,0],xyz[...,1],xyz[...,2]
+    rxy = np.hypot(x,y)
+    lats = np.degrees(np.arctan2(z,rxy))
+    lons = np.degrees(np.arctan2(y,x)) % 360
+    return lats,lons,np.hypot(rxy,z)
+
+# Indices of the equiangular cube-face cells containing the unit vectors, with n x n cells on each of the 6 faces.
+def cube_cells(xyz,n):
+    axis = np.argmax(np.abs(xyz),axis=-1)
+    major = np.take_along_axis(xyz,axis[...,None],axis=-1)[...,0]
+    face = 2*axis + (major < 0)
+    uv = np.stack([np.where(axis == 0,xyz[...,1],xyz[...,0]),np.where(axis == 2,xyz[...,1],xyz[...,2])],axis=-1)/np.abs(major)[...,None]
+    ij = np.clip(((np.arctan(uv)*4/np.pi + 1)/2*n).astype(int),0,n-1)
+    return (face*n + ij[...,0])*n + ij[...,1]
+
+# Unit vectors of the centers and corners of all equiangular cube-face cells in order of their indices given by cube_cells.
+def cube_cell_grid(n):
+    def face_points(a):
+        # a: equiangular coordinates of shape (...,2) in [-1,1]
+        u,v = np.tan(a[...,0]*np.pi/4),np.tan(a[...,1]*np.pi/4)
+        xyz = []
+        for axis in range(3):
+            for sign in (1,-1):
+                p = np.empty(u.shape + (3,))
+                p[...,axis] = sign
+                p[...,1 if axis == 0 else 0] = u
+                p[...,1 if axis == 2 else 2] = v
+                xyz.append(p)
+        xyz = np.stack(xyz)
+        return xyz/np.linalg.norm(xyz,axis=-1,keepdims=True)
+
+    edges = np.linspace(-1,1,n+1)
+    mids = (edges[:-1] + edges[1:])/2
+    centers = face_points(np.stack(np.meshgrid(mids,mids,indexing='ij'),axis=-1)).reshape(-1,3)
+    corners = [face_points(np.stack(np.meshgrid(edges[di:n+di],edges[dj:n+dj],indexing='ij'),axis=-1)).reshape(-1,3) for di in (0,1) for dj in (0,1)]
+    return centers,np.stack(corners,axis=1)
+
+# Central angles of the sides of a polygon given by the unit vectors of its vertices.
+def side_lengths(xyz):
+    a,b = xyz[:-1],xyz[1:]
+    # atan2 of the cross and inner products keeps full precision for both very small and nearly antipodal sides.
+    return np.arctan2(np.linalg.norm(np.cross(a,b),axis=1),np.sum(a*b,axis=1))
+
+# Central angles between unit vectors, broadcasting over the leading axes.
+def angles_between(a,b):
+    # The chord length keeps full precision for small angles.
+    return 2*np.arcsin(np.minimum(np.linalg.norm(a - b,axis=-1)/2,1))
+
+# Central angles from points to the great-circle arcs from a to b, broadcasting over the leading axes.
+def arc_distances(points,a,b):
+    n = np.cross(a,b)
+    norm = np.linalg.norm(n,axis=-1,keepdims=True)
+    n = np.divide(n,norm,out=np.zeros_like(n),where=norm > 0)
+
+    # The foot of the perpendicular lies on the arc if the point is on the inner sides of the great circles through n and a, and through n and b.
+    on_arc = (np.sum(points*np.cross(n,a),axis=-1) >= 0) & (np.sum(points*np.cross(b,n),axis=-1) >= 0) & (norm[...,0] > 0)
+    perpendicular = np.arcsin(np.minimum(np.abs(np.sum(points*n,axis=-1)),1))
+    return np.where(on_arc,perpendicular,np.minimum(angles_between(points,a),angles_between(points,b)))
+
+# Proper crossings in the interiors of the great-circle arcs from a0 to a1 and from b0 to b1, row by row, with the crossing points;
+# arcs closer than epsilon in radians to parallel, or crossing closer than it to an endpoint, are taken as not crossing.
+def arc_crossings(a0,a1,b0,b1,epsilon):
+    na,nb = np.cross(a0,a1),np.cross(b0,b1)
+    p = np.cross(na,nb)
+    norm = np.linalg.norm(p,axis=1)
+    valid = norm > epsilon*np.linalg.norm(na,axis=1)*np.linalg.norm(nb,axis=1)
+    p = np.divide(p,norm[:,None],out=np.zeros_like(p),where=valid[:,None])
+    p *= np.where(np.sum(p*(a0 + a1),axis=1) < 0,-1,1)[:,None]
+
+    crossing = valid & (np.sum(p*np.cross(na,a0),axis=1) > 0) & (np.sum(p*np.cross(a1,na),axis=1) > 0) \
+                     & (np.sum(p*np.cross(nb,b0),axis=1) > 0) & (np.sum(p*np.cross(b1,nb),axis=1) > 0)
+    for endpoint in (a0,a1,b0,b1):
+        crossing &= angles_between(p,endpoint) >= epsilon
+    return crossing,p
+
+# Smallest spherical cap containing all unit vectors, by Welzl's algorithm in its iterative form; the points are scanned in numpy blocks for those outside of the current cap.
+def minimal_cap(xyz):
+    '''
+    The cap is given by its center as a unit vector and its angular radius in radians. 
+    The algorithm assumes the points lie in an open hemisphere; otherwise, the whole sphere with a radius of π is returned.
+    '''
+    points = xyz[np.random.default_rng(0).permutation(len(xyz))]
+
+    def cap2(a,b):
+        center = a + b
+        norm = np.linalg.norm(center)
+        if norm == 0: return a,np.pi
+        return center/norm,angles_between(a,b)/2
+
+    def cap3(a,b,c):
+        center = np.cross(b - a,c - a)
+        norm = np.linalg.norm(center)
+        if norm == 0: return max([cap2(a,b),cap2(a,c),cap2(b,c)],key=lambda cap: cap[1])
+        center = center/norm
+        if np.dot(center,a) < 0: center = -center
+        return center,angles_between(center,a)
+
+    def first_outside(cap,candidates):
+        # Index of the first candidate outside of the cap, with a margin for rounding errors
+        center,radius = cap
+        outside = angles_between(candidates,center) > radius*(1 + 1e-12) + 1e-15
+        return int(np.argmax(outside)) if outside.any() else None
+
+    def scan(cap,candidates,grow):
+        i = 0
+        while True:
+            j = first_outside(cap,candidates[i:])
+            if j is None: return cap
+            i += j
+            cap = grow(candidates[:i],candidates[i])
+            i += 1
+
+    def with_two(candidates,p,q):
+        return scan(cap2(p,q),candidates,lambda previous,r: cap3(p,q,r))
+
+    def with_one(candidates,p):
+        return scan((p,0.0),candidates,lambda previous,q: with_two(previous,p,q))
+
+    if len(points) == 0: return np.array([0.0,0.0,1.0]),np.pi
+    center,radius = scan((points[0],0.0),points[1:],lambda previous,p: with_one(np.vstack([points[:1],previous]),p))
+    if radius >= np.pi/2 or first_outside((center,radius),points) is not None: return center,np.pi
+    return center,radius
+
+# Latitude ranges in degrees of the great-circle arcs from a to b, which may bulge poleward beyond their endpoints.
+def arc_lat_ranges(a,b):
+    n = np.cross(a,b)
+    norm = np.linalg.norm(n,axis=-1,keepdims=True)
+    n = np.divide(n,norm,out=np.zeros_like(n),where=norm > 0)
+
+    # The northernmost point of the great circle and its antipode, the southernmost one
+    top = np.array([0,0,1]) - n[...,2:]*n
+    top_norm = np.linalg.norm(top,axis=-1,keepdims=True)
+    top = np.divide(top,top_norm,out=np.zeros_like(top),where=top_norm > 0)
+    na,bn = np.cross(n,a),np.cross(b,n)
+
+    lat_a,lat_b = np.arcsin(np.clip(a[...,2],-1,1)),np.arcsin(np.clip(b[...,2],-1,1))
+    low,high = np.minimum(lat_a,lat_b),np.maximum(lat_a,lat_b)
+    valid = (norm[...,0] > 0) & (top_norm[...,0] > 0)
+    for sign in (1,-1):
+        on_arc = valid & (np.sum(sign*top*na,axis=-1) >= 0) & (np.sum(sign*top*bn,axis=-1) >= 0)
+        extreme = np.arcsin(np.clip(sign*top[...,2],-1,1))
+        if sign > 0: high = np.where(on_arc,np.maximum(high,extreme),high)
+        else: low = np.where(on_arc,np.minimum(low,extreme),low)
+    return np.degrees(low),np.degrees(high)
+
+# Sum the values over the sides of each polygon in a packed vertex array, where the k-th polygon takes the vertices from offsets[k] to offsets[k+1]-1.
+def segment_sum(side_values,offsets):
+    side_values = np.array(side_values)
+    # Discard the sides joining the last vertex of a polygon to the first vertex of the next one.
+    side_values[offsets[1:-1]-1] = 0
+    return np.add.reduceat(side_values,offsets[:-1],axis=0)
+
+# Integeral lowerlimit as a function of longitude; c1,c2,c3 are the coefficients of the side given by integrate_coeffs.
+def fs_low(lon,c1,c2,c3): 
     return -np.arctan((c1*np.cos(lon)+c2*np.sin(lon))/c3)
 
 # Integeral upperlimit as a function of longitude.
@@ -14,13 +181,149 @@ def fs_up(lon):
 
 # Coefficients for determining the lowerlimit in inner integral. 
 def integrate_coeffs(p1,p2): 
-    global c1,c2,c3
     # p1:[lat_j,lon_j], p2:[lat_{j+1},lon_{j+1}]
     c1 = np.cos(p1[0])*np.sin(p1[1])*np.sin(p2[0])-np.cos(p2[0])*np.sin(p2[1])*np.sin(p1[0]) 
     c2 = np.cos(p2[0])*np.cos(p2[1])*np.sin(p1[0])-np.cos(p1[0])*np.cos(p1[1])*np.sin(p2[0]) 
     c3 = np.cos(p1[0])*np.cos(p2[0])*np.sin(p2[1]-p1[1]) 
     return c1,c2,c3
 
+# Integrate f over the region between a side and the North Pole; task is a tuple of (f,p1,p2,count,tol) with p1 and p2 in radians.
+# The integral, its absolute error estimated by scipy and the number of evaluations of f are returned.
+def side_dblquad(task):
+    from scipy.integrate import dblquad
+    f,p1,p2,count,tol = task
+    c1,c2,c3 = integrate_coeffs(p1,p2)
+    options = {} if tol is None else {'epsabs':tol,'epsrel':tol}
+    if not count: return dblquad(f, p1[1], p2[1], lambda lon: fs_low(lon,c1,c2,c3), fs_up, **options) + (0,)
+
+    # The evaluations of the integrand are counted here and returned, as the task may run in another process.
+    evaluations = [0]
+    def counted(lat,lon):
+        evaluations[0] += 1
+        return f(lat,lon)
+    return dblquad(counted, p1[1], p2[1], lambda lon: fs_low(lon,c1,c2,c3), fs_up, **options) + (evaluations[0],)
+
+# Integrals of each integrand summed over the sides by side_dblquad and their absolute errors, with the evaluations of the integrands recorded under stage while instrumentation is active.
+def dblquad_sums(integrands,vertices,stage,workers=1,executor=None,tol=None):
+    count = instrument.active
+    tasks = [(f,p1,p2,count,tol) for p1,p2 in dblquad_sides(vertices) for f in integrands]
+    results = np.reshape(map_tasks(side_dblquad,tasks,workers,executor),(-1,len(integrands),3))
+    if count: instrument.record(stage,evaluations=int(results[:,:,2].sum()))
+    return results[:,:,0].sum(axis=0),results[:,:,1].sum(axis=0)
+
+# Nodes and weights of the Gauss-Legendre rules on [-1,1], cached by order
+_gauss_rules = {}
+
+def gauss_rule(order):
+    if order not in _gauss_rules: _gauss_rules[order] = np.polynomial.legendre.leggauss(order)
+    return _gauss_rules[order]
+
+# Integrate each integrand over the regions between the sides and the North Pole by the tensor-product Gauss-Legendre rule of the given order,
+# in longitude along the side and in latitude from the side to the pole; sides is an array of [p1,p2] in radians as given by dblquad_sides.
+# integrands is a list of functions of (lat,lon), or a single function that returns the values of several integrands stacked along the first axis.
+def side_gauss(integrands,sides,order,chunk_elements=2**20):
+    t,w = gauss_rule(order)
+    values = []
+    step = max(1,chunk_elements//order**2)
+    for start in range(0,len(sides),step):
+        p1,p2 = sides[start:start+step,0].T,sides[start:start+step,1].T
+        c1,c2,c3 = integrate_coeffs(p1,p2)
+        half = (p2[1] - p1[1])/2
+        lon = ((p1[1] + p2[1])/2)[:,None] + half[:,None]*t
+        low = fs_low(lon,c1[:,None],c2[:,None],c3[:,None])
+        span = (np.pi/2 - low)/2
+        lat = ((np.pi/2 + low)/2)[:,:,None] + span[:,:,None]*t
+        weights = (half[:,None]*w*span)[:,:,None]*w
+        stacked = integrands(lat,lon[:,:,None]) if callable(integrands) else (f(lat,lon[:,:,None]) for f in integrands)
+        values.append(np.stack([np.einsum('sij,sij->s',value,weights) for value in stacked],axis=1))
+    if not values:
+        # No sides to integrate; the number of integrands is found from a single evaluation.
+        return np.zeros((0,len(integrands(np.zeros(1),np.zeros(1))) if callable(integrands) else len(integrands)))
+    return np.concatenate(values)
+
+# Integrate each integrand over the whole sphere by Gauss-Legendre rules of the given order on panels of 45° by 45°.
+def sphere_gauss(integrands,order):
+    t,w = gauss_rule(order)
+    edges = np.radians(np.arange(-180,181,45))
+    lon = (((edges[:-1] + edges[1:])/2)[:,None] + np.pi/8*t).ravel()
+    lon_weights = np.tile(np.pi/8*w,len(edges) - 1)
+    values = 0
+    for bottom in edges[2:6]:
+        lat = (bottom + np.pi/8 + np.pi/8*t)[:,None]
+        weights = (np.pi/8*w)[:,None]*lon_weights
+        stacked = integrands(lat,lon) if callable(integrands) else (f(lat,lon) for f in integrands)
+        values = values + np.array([np.sum(value*weights) for value in stacked])
+    return values
+
+# Integrals of each integrand summed over the sides by Gauss-Legendre rules and their estimated absolute errors.
+# With target = None, the rule of the given order is applied, and the error is estimated by the difference from the rule of half the order.
+# Otherwise, starting from the given order, the order of the sides whose error exceeds their share of target is doubled, 
+# until the total error is within target or the order reaches MAX_GAUSS_ORDER; the error of each side is the difference between the last two orders.
+MAX_GAUSS_ORDER = 256
+
+def gauss_sums(integrands,vertices,stage,order=16,target=None):
+    sides = np.reshape(dblquad_sides(vertices),(-1,2,2))
+    if target is None:
+        values = side_gauss(integrands,sides,order)
+        errors = np.abs(values - side_gauss(integrands,sides,max(1,order//2))).sum(axis=0)
+        if instrument.active: instrument.record(stage,evaluations=values.size*(order**2 + max(1,order//2)**2))
+        return values.sum(axis=0),errors
+
+    values = side_gauss(integrands,sides,order)
+    errors = np.full_like(values,np.inf)
+    evaluations = values.size*order**2
+    pending = np.ones(len(sides),dtype=bool)
+    while pending.any() and order < MAX_GAUSS_ORDER:
+        order *= 2
+        finer = side_gauss(integrands,sides[pending],order)
+        errors[pending] = np.abs(finer - values[pending])
+        values[pending] = finer
+        evaluations += finer.size*order**2
+        if (errors.sum(axis=0) <= target).all(): break
+        pending = (errors > target/len(sides)).any(axis=1)
+    if instrument.active: instrument.record(stage,evaluations=int(evaluations))
+    return values.sum(axis=0),errors.sum(axis=0)
+
+# Integrals of each integrand over the whole sphere and their estimated absolute errors, in the same way as gauss_sums.
+def sphere_sums(integrands,stage,order=16,target=None):
+    values = sphere_gauss(integrands,order)
+    errors = np.abs(values - sphere_gauss(integrands,max(1,order//2)))
+    evaluations = len(values)*32*(order**2 + max(1,order//2)**2)
+    while target is not None and (errors > target).any() and order < MAX_GAUSS_ORDER:
+        order *= 2
+        finer = sphere_gauss(integrands,order)
+        errors = np.abs(finer - values)
+        values = finer
+        evaluations += len(values)*32*order**2
+    if instrument.active: instrument.record(stage,evaluations=int(evaluations))
+    return values,errors
+
+# Apply func to each task, either serially, over a given executor, or over a new process pool with `workers` processes.
+def map_tasks(func,tasks,workers=1,executor=None):
+    if executor is not None:
+        return list(executor.map(func,tasks))
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(func,tasks,chunksize=max(1,len(tasks)//(4*workers))))
+    return list(map(func,tasks))
+
+# Sides of the polygon in radians that are integrated by dblquad, skipping coincident vertices.
+def dblquad_sides(vertices):
+    sides = []
+    for i in range(len(vertices) - 1):
+        p1 = np.radians(vertices[i])
+        p2 = np.radians(vertices[i+1]) 
+        
+        pdlon = p2[1]-p1[1]
+        if pdlon < -np.pi: p2[1] = p2[1] + 2*np.pi 
+        if pdlon > np.pi: p2[1] = p2[1] - 2*np.pi 
+ 
+        # If two adjacent vertices are close enough(coincident), do nothing. 
+        if np.abs(pdlon)  < 1e-6: continue 
+        sides.append((p1,p2))
+    return sides
+
 # Integrands corresponding to six components of the geometrical inertia tensor.
 def f11(lat,lon): 
     return np.cos(lat)**3*np.cos(lon)**2
@@ -47,4 +350,50 @@ def fy(lat,lon):
     return np.cos(lat)**2*np.sin(lon)         
 
 def fz(lat,lon):
-    return np.sin(2*lat)/2                        
\ No newline at end of file
+    return np.sin(2*lat)/2                        
+
+# Contributions of each side to the first and second moments of the region on the left of a closed boundary.
+@instrument.timed('edge_moments',lambda xyz: {'edges':len(xyz) - 1})
+def edge_moments(xyz):
+    '''
+    By the divergence theorem on the unit sphere, the integrals of x_i and x_i*x_j over a region bounded by great-circle arcs reduce to sums over the sides.
+    For a side from a to b with arc length theta and unit normal n = a×b/|a×b|, 
+    the first moment is theta*n/2 and the second moment is (n X^T + X n^T)/6 with X = a*sin(theta) + (n×a)*(1-cos(theta)).
+    The second moment of the region additionally contains area*I/3.
+    '''
+    a,b = xyz[:-1],xyz[1:]
+    cross = np.cross(a,b)
+    sin_theta = np.linalg.norm(cross,axis=1)
+    theta = np.arctan2(sin_theta,np.sum(a*b,axis=1))
+
+    # If two adjacent vertices are coincident, the side contributes nothing. 
+    valid = sin_theta > 0
+    n = np.zeros_like(cross)
+    n[valid] = cross[valid]/sin_theta[valid,None]
+    X = a*sin_theta[:,None] + np.cross(n,a)*(2*np.sin(theta/2)**2)[:,None]
+
+    first = theta[:,None]*n/2
+    second = np.stack([n[:,0]*X[:,0],n[:,1]*X[:,1],n[:,2]*X[:,2],
+                       (n[:,0]*X[:,1]+X[:,0]*n[:,1])/2,(n[:,0]*X[:,2]+X[:,0]*n[:,2])/2,(n[:,1]*X[:,2]+X[:,1]*n[:,2])/2],axis=1)/3
+    return first,second
+
+# Area, first moment and second moment of the spherical polygon over a unit sphere.
+def region_moments(first,second,excess):
+    '''
+    first and second are the moments summed over the sides, as given by edge_moments; they may be stacked for multiple polygons along the leading axes.
+    The signed excess determines the area of the region on the left of the boundary as excess mod 4π.
+    Consistent with the orientation of the polygon, the region with an area not greater than 2π is selected.
+    The second moment is listed in order of xx, yy, zz, xy, xz, yz.
+    '''
+    area_left = np.mod(excess,4*np.pi)
+    second = np.array(second,dtype=float)
+    second[...,:3] += np.expand_dims(area_left,-1)/3
+    
+    second_complement = -second
+    second_complement[...,:3] += 4/3*np.pi
+    
+    complement = area_left > 2*np.pi
+    area = np.where(complement,4*np.pi - area_left,area_left)
+    first = np.where(np.expand_dims(complement,-1),-first,first)
+    second = np.where(np.expand_dims(complement,-1),second_complement,second)
+    return area,first,second
@@ -1,58 +1,75 @@
 import numpy as np
-from scipy.integrate import dblquad
 from .excess_area import polygon_excess
 from .functions import *
+from . import instrument
 
-def polygon_inertia(vertices):
+@instrument.timed('polygon_inertia',lambda vertices,*args,**kwargs: {'edges':len(vertices) - 1})
+def polygon_inertia(vertices,method='analytic',workers=1,executor=None,tol=None,order=None,error=False):
     '''
     Calculate the geometrical inertia tensor of a spherical polygon over a unit sphere.
 
     Usage:
     inertia = polygon_inertia(vertices)
+    inertia = polygon_inertia(vertices,'dblquad')
+    inertia,err = polygon_inertia(vertices,'gauss',order=8,error=True)
 
     Inputs:
     vertices -> [float 2d array] Vertices of the spherical polygon in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
     Vertices can be arranged either counterclockwise or clockwise.
 
+    Parameters:
+    method -> [optional, str, default = 'analytic'] Avaliable options are 'analytic', 'gauss', 'adaptive' and 'dblquad'. 
+    If 'analytic', all sides are evaluated at once by the closed-form side integrals; 
+    if 'gauss', the region between each side and the North Pole is integrated by a fixed-order Gauss-Legendre rule, vectorized over all sides;
+    if 'adaptive', the order of the Gauss-Legendre rule is doubled side by side until the estimated error is within tol;
+    if 'dblquad', each side is integrated numerically with scipy, which is much slower and mainly for cross-checking.
+    workers -> [optional, int, default = 1] number of processes over which sides and components are integrated in the 'dblquad' method
+    executor -> [optional, concurrent.futures.Executor, default = None] an existing thread or process pool to use in the 'dblquad' method instead of creating one.
+    The other methods are vectorized over the sides in one process and ignore workers and executor.
+    tol -> [optional, float, default = None] For 'adaptive', the error tolerance of each component relative to the area of the polygon, 1e-10 if None; 
+    for 'dblquad', the absolute and relative tolerances of scipy for each side, its defaults if None.
+    order -> [optional, int, default = None] number of Gauss-Legendre nodes in longitude and latitude for 'gauss', 16 if None; or the starting number for 'adaptive', 4 if None
+    error -> [optional, bool, default = False] If True, the estimated errors are returned as well.
+
     Outputs:
     inertia -> [float array with 6 elements] geometrical inertia tensor; it is symmetrical and has six independent components.
+    err -> [float array with 6 elements] estimated absolute errors of the components; for 'analytic', only rounding errors are estimated.
 
     Note: The spherical polygon has a latitude range of [-90°,90°] and a longitude range of [-180°,180°] or [0°,360°].
     ''' 
-    N = len(vertices)
-    
-    # Initialize the 6 components of the geometrical inertia tensor
-    sum11,sum22,sum33,sum12,sum13,sum23 = np.zeros(6)
+    if method == 'analytic':
+        inertia = _polygon_inertia_analytic(vertices)
+        err = np.full(6,np.finfo(float).eps*len(vertices)*np.abs(inertia).max())
+    elif method in ('gauss','adaptive','dblquad'):
+        inertia,err = _polygon_inertia_numeric(vertices,method,workers,executor,tol,order)
+    else:
+        raise Exception("Method for the inertia tensor can either be 'analytic', 'gauss', 'adaptive' or 'dblquad'.")
+    if error: return inertia,err
+    return inertia
 
-    for i in range(N - 1):
-        p1 = np.radians(vertices[i])
-        p2 = np.radians(vertices[i+1]) 
-        
-        pdlon = p2[1]-p1[1]
-        if pdlon < -np.pi: p2[1] = p2[1] + 2*np.pi 
-        if pdlon > np.pi: p2[1] = p2[1] - 2*np.pi 
- 
-        # If two adjacent vertices are close enough(coincident), do nothing. 
-        if np.abs(pdlon)  < 1e-6: continue 
-            
-        c1,c2,c3= integrate_coeffs(p1,p2)    
+def _polygon_inertia_analytic(vertices):
+    excess = polygon_excess(vertices)
+    first,second = edge_moments(latlon2xyz(vertices[:,0],vertices[:,1]))
+    area,first,second = region_moments(first.sum(axis=0),second.sum(axis=0),excess)
 
-        # Calculate the geometrical inertia tensor 
-        s11 = dblquad(f11, p1[1], p2[1], fs_low,fs_up)
-        s22 = dblquad(f22, p1[1], p2[1], fs_low,fs_up)
-        s33 = dblquad(f33, p1[1], p2[1], fs_low,fs_up)
-        s12 = dblquad(f12, p1[1], p2[1], fs_low,fs_up)
-        s13 = dblquad(f13, p1[1], p2[1], fs_low,fs_up)
-        s23 = dblquad(f23, p1[1], p2[1], fs_low,fs_up)
-        
-        sum11 += s11[0] 
-        sum22 += s22[0]
-        sum33 += s33[0] 
-        sum12 += s12[0] 
-        sum13 += s13[0] 
-        sum23 += s23[0] 
-        
+    inertia = -second
+    inertia[:3] += area
+    return inertia
+
+def _polygon_inertia_numeric(vertices,method,workers=1,executor=None,tol=None,order=None):
     excess = polygon_excess(vertices)    
+    area = np.mod(excess,4*np.pi)
+    area = min(area,4*np.pi - area)
+
+    # Each side and component is integrated independently, so they can be spread over a pool or vectorized.
+    integrands = [f11,f22,f33,f12,f13,f23]
+    if method == 'dblquad':
+        sums,errors = dblquad_sums(integrands,vertices,'polygon_inertia',workers,executor,tol)
+    else:
+        target = (1e-10 if tol is None else tol)*area if method == 'adaptive' else None
+        if order is None: order = 4 if method == 'adaptive' else 16
+        sums,errors = gauss_sums(integrands,vertices,'polygon_inertia',order,target)
+    sum11,sum22,sum33,sum12,sum13,sum23 = sums
   
     # For counterclockwise arrangement
     if excess > 0 and excess < 2*np.pi: 
@@ -92,4 +109,4 @@ def polygon_inertia(vertices):
         inertia13 = -sum13 
         inertia23 = -sum23 
     
-    return np.array([inertia11,inertia22,inertia33,inertia12,inertia13,inertia23])
\ No newline at end of file
+    return np.array([inertia11,inertia22,inertia33,inertia12,inertia13,inertia23]),errors
\ No newline at end of file
@@ -1,8 +1,13 @@
+import math
+
 import numpy as np
-from scipy.spatial.transform import Rotation
-from astropy.coordinates import spherical_to_cartesian,cartesian_to_spherical
-from astropy import units as u
+from .functions import latlon2xyz
+from . import instrument
+
+# Determinants of unit vectors in double precision smaller than this may have the wrong sign, and they are re-evaluated exactly.
+FILTER_BOUND = 1e-13
 
+@instrument.timed('inside_polygon',lambda point,vertices,arrangement: {'points':1,'edges':len(vertices) - 1})
 def inside_polygon(point,vertices,arrangement):
     '''
     Determine if a single point is inside a spherical polygon.
@@ -20,16 +25,22 @@ def inside_polygon(point,vertices,arrangement):
 
     Note: The spherical polygon has a latitude range of [-90°,90°] and a longitude range of [-180°,180°] or [0°,360°].
     '''
+    # scipy and astropy are only needed by this reference implementation, so they are imported on call.
+    from scipy.spatial.transform import Rotation
+    from astropy.coordinates import spherical_to_cartesian,cartesian_to_spherical
+    from astropy import units as u
+
     N = len(vertices)
     lat0,lon0 = point[0],point[1]
     lats,lons = vertices[:,0],vertices[:,1]
 
     # Rotate the single point and polygon so that the North Pole axis passes through the single point.
-    transform = Rotation.from_euler('zy', [-lon0,lat0 - 90], degrees=True)
-    polygon_cartesian = spherical_to_cartesian(np.ones(N),lats*u.deg,lons*u.deg)
-    polygon_cartesian_transformed = transform.apply(np.stack(polygon_cartesian).T)
-    xs,ys,zs = [polygon_cartesian_transformed[:,i] for i in range(3)]
-    polygon_spherical_transformed = cartesian_to_spherical(xs,ys,zs)
+    with instrument.timing('inside_polygon.astropy'):
+        transform = Rotation.from_euler('zy', [-lon0,lat0 - 90], degrees=True)
+        polygon_cartesian = spherical_to_cartesian(np.ones(N),lats*u.deg,lons*u.deg)
+        polygon_cartesian_transformed = transform.apply(np.stack(polygon_cartesian).T)
+        xs,ys,zs = [polygon_cartesian_transformed[:,i] for i in range(3)]
+        polygon_spherical_transformed = cartesian_to_spherical(xs,ys,zs)
 
     lons_transformed = polygon_spherical_transformed[2].value # unit in rad
     
@@ -52,3 +63,554 @@ def inside_polygon(point,vertices,arrangement):
     else:
     	raise Exception('Arrangement of the vertices can either be Counterclockwise or Clockwise.')
     return flag
+
+@instrument.timed('inside_polygon_batch',lambda points,vertices_xyz,*args,**kwargs: {'points':len(np.atleast_2d(points)),'edges':len(np.atleast_2d(points))*(len(vertices_xyz) - 1)})
+def inside_polygon_batch(points,vertices_xyz,arrangement,chunk_elements=2**22):
+    '''
+    Determine if multiple points are inside a spherical polygon in vectorized chunks.
+
+    Usage: 
+    flags = inside_polygon_batch(points,vertices_xyz,arrangement)
+
+    Inputs:
+    points -> [float 2d array] Points to be determined in form of [[lat_0,lon_0],..,[lat_m,lon_m]] with unit of degrees.
+    vertices_xyz -> [float 2d array] Unit vectors of the vertices of a closed spherical polygon in form of [[x_0,y_0,z_0],..,[x_n,y_n,z_n]].
+    arrangement -> [str] Arrangement of the vertices. Avaliable options are Counterclockwise and Clockwise.
+
+    Parameters:
+    chunk_elements -> [int, optional, default = 2**22] upper bound of the number of point-edge pairs evaluated at a time, which bounds the memory usage.
+
+    Outputs:
+    flags -> [bool array] If True, the point is inside the polygon, otherwise, it is outside.
+
+    Note: The opposite angle at the single point of the spherical triangle formed by the point and a side of the polygon is 
+    the azimuth difference between the two vertices seen from the point, which equals the longitude difference used in inside_polygon.
+    '''
+    if arrangement == 'Counterclockwise':
+        target = 2*np.pi
+    elif arrangement == 'Clockwise':
+        target = -2*np.pi
+    else:
+        raise Exception('Arrangement of the vertices can either be Counterclockwise or Clockwise.')
+
+    points = np.atleast_2d(points)
+    M = len(points)
+    xyz_a,xyz_b = vertices_xyz[:-1],vertices_xyz[1:]
+    
+    # Quantities depending only on the sides of the polygon are computed once.
+    cross_ab = np.cross(xyz_a,xyz_b)
+    dot_ab = np.sum(xyz_a*xyz_b,axis=1)
+
+    flags = np.zeros(M,dtype=bool)
+    step = max(1,chunk_elements//len(vertices_xyz))
+
+    for i in range(0,M,step):
+        points_xyz = latlon2xyz(points[i:i+step,0],points[i:i+step,1])
+        dot_pv = points_xyz @ vertices_xyz.T
+        sin_angle = points_xyz @ cross_ab.T
+        cos_angle = dot_ab - dot_pv[:,:-1]*dot_pv[:,1:]
+        sum_angle = np.arctan2(sin_angle,cos_angle).sum(axis=1)
+        flags[i:i+step] = np.abs(sum_angle - target) < 0.1
+
+    return flags
+
+@instrument.timed('meridian_index',lambda vertices,*args,**kwargs: {'edges':len(vertices) - 1})
+def meridian_index(vertices,n_bins=None):
+    '''
+    Build an index of the sides of a spherical polygon over bins of longitude, which accelerates inside_polygon_indexed.
+
+    Usage: 
+    index = meridian_index(vertices)
+
+    Inputs:
+    vertices -> [float 2d array] Vertices of a closed spherical polygon in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+
+    Parameters:
+    n_bins -> [int, optional, default = None] number of longitude bins; if None, it equals the number of sides.
+
+    Outputs:
+    index -> [dict] for each side, its position among the sides of the polygon, the normal of its great circle, the bounds, span and direction of its longitude interval 
+    and the pole it passes through, together with the sides overlapping each longitude bin in the compressed form of bin_offsets and bin_sides.
+    '''
+    lons = np.radians(vertices[:,1])
+    xyz = latlon2xyz(vertices[:,0],vertices[:,1])
+    dlon = np.diff(lons)
+    dlon[dlon < -np.pi] += 2*np.pi
+    dlon[dlon > np.pi] -= 2*np.pi
+
+    # Sides along meridians never cross a meridian. A side through a pole crosses every meridian at the pole; 
+    # it is taken as passing just beside the pole eastward, so that it crosses the meridians from its first vertex to its second one next to the pole.
+    polar = np.abs(dlon) == np.pi
+    z_sum = xyz[:-1,2] + xyz[1:,2]
+    sides = np.nonzero((dlon != 0) & ~(polar & (z_sum == 0)))[0]
+    pole = np.where(polar[sides],np.sign(z_sum[sides]),0).astype(int)
+    direction = np.where(pole != 0,1,np.sign(dlon[sides])).astype(int)
+    normals = np.cross(xyz[sides],xyz[sides+1])
+    # The ends of the intervals are taken from the same longitudes of the vertices, so that a meridian through a vertex is crossed by exactly one of its sides.
+    ends = np.radians(np.mod(vertices[:,1],360))
+    low = np.where(direction > 0,ends[sides],ends[sides+1])
+    high = np.where(direction > 0,ends[sides+1],ends[sides])
+    span = np.mod(high - low,2*np.pi)
+
+    if n_bins is None: n_bins = max(1,len(sides))
+    width = 2*np.pi/n_bins
+    first_bin = np.minimum((low/width).astype(int),n_bins - 1)
+    last_bin = np.minimum((high/width).astype(int),n_bins - 1) + np.where(high < low,n_bins,0)
+    counts = last_bin - first_bin + 1
+    bins = (np.repeat(first_bin - np.cumsum(counts) + counts,counts) + np.arange(counts.sum())) % n_bins
+    order = np.argsort(bins,kind='stable')
+
+    return {'sides':sides,'normals':normals,'low':low,'high':high,'span':span,'direction':direction,'pole':pole,'n_bins':n_bins,
+            'bin_offsets':np.searchsorted(bins[order],np.arange(n_bins+1)),'bin_sides':np.repeat(np.arange(len(sides)),counts)[order]}
+
+def _ray_pairs(lon,index):
+    # Pairs of points and sides in the longitude bins of the rays, and whether each side crosses the meridian of the ray
+    n_bins,bin_offsets,bin_sides,low,high = index['n_bins'],index['bin_offsets'],index['bin_sides'],index['low'],index['high']
+    bins = np.minimum((lon/(2*np.pi/n_bins)).astype(int),n_bins - 1)
+    starts,counts = bin_offsets[bins],bin_offsets[bins+1] - bin_offsets[bins]
+    pair_points = np.repeat(np.arange(len(lon)),counts)
+    pair_sides = bin_sides[np.repeat(starts - np.cumsum(counts) + counts,counts) + np.arange(counts.sum())]
+
+    # The side crosses the meridian of the ray if the longitude falls in its half-open interval.
+    lon_pair,low_pair,high_pair = lon[pair_points],low[pair_sides],high[pair_sides]
+    crosses = np.where(low_pair <= high_pair,(lon_pair >= low_pair) & (lon_pair < high_pair),(lon_pair >= low_pair) | (lon_pair < high_pair))
+    return pair_points,pair_sides,crosses
+
+@instrument.timed('inside_polygon_indexed',lambda points,*args,**kwargs: {'points':len(np.atleast_2d(points))})
+def inside_polygon_indexed(points,index,arrangement,chunk_elements=2**22):
+    '''
+    Determine if multiple points are inside a spherical polygon by counting the crossings of the sides with a ray for each point.
+
+    Usage: 
+    flags = inside_polygon_indexed(points,meridian_index(vertices),arrangement)
+
+    Inputs:
+    points -> [float 2d array] Points to be determined in form of [[lat_0,lon_0],..,[lat_m,lon_m]] with unit of degrees.
+    index -> [dict] index of the sides of the polygon built by meridian_index
+    arrangement -> [str] Arrangement of the vertices. Avaliable options are Counterclockwise and Clockwise.
+
+    Parameters:
+    chunk_elements -> [int, optional, default = 2**22] upper bound of the number of point-side pairs evaluated at a time, which bounds the memory usage.
+
+    Outputs:
+    flags -> [bool array] If True, the point is inside the polygon, otherwise, it is outside.
+
+    Note: The ray runs from the point northward along its meridian over the North Pole and down the opposite meridian to the antipode of the point.
+    The signed number of crossings is the winding number of the sides around the point, namely the sum of opposite angles used in inside_polygon divided by 2π.
+    Only the sides in the longitude bins of the two meridians are visited, so that the cost per point is about the number of crossings rather than the number of vertices.
+    '''
+    if arrangement == 'Counterclockwise':
+        target = 1
+    elif arrangement == 'Clockwise':
+        target = -1
+    else:
+        raise Exception('Arrangement of the vertices can either be Counterclockwise or Clockwise.')
+
+    points = np.atleast_2d(points)
+    M = len(points)
+    normals,direction,pole = index['normals'],index['direction'],index['pole']
+    step = max(1,chunk_elements//max(1,2*len(index['bin_sides'])//index['n_bins'] + 1))
+    flags = np.zeros(M,dtype=bool)
+    pairs = 0
+
+    for i in range(0,M,step):
+        points_xyz = latlon2xyz(points[i:i+step,0],points[i:i+step,1])
+        m = len(points_xyz)
+        winding = np.zeros(m,dtype=int)
+
+        # A side crossing westward over the northward part of the ray, or eastward over the southward part, winds counterclockwise around the point.
+        points_lon = np.radians(np.mod(points[i:i+step,1],360))
+        for ray_xyz,sense,lon in ((points_xyz,-1,points_lon),(-points_xyz,1,np.mod(points_lon + np.pi,2*np.pi))):
+            pair_points,pair_sides,crosses = _ray_pairs(lon,index)
+            pairs += len(pair_points)
+
+            # The crossing lies north of the ray origin if the origin and the North Pole are on opposite sides of the great circle,
+            # and a side through the North Pole crosses north of all points, while one through the South Pole crosses south of them.
+            dot = np.sum(normals[pair_sides]*ray_xyz[pair_points],axis=1)
+            above = np.where(pole[pair_sides] != 0,pole[pair_sides] > 0,dot*normals[pair_sides,2] < 0)
+            winding += sense*np.bincount(pair_points,weights=direction[pair_sides]*(crosses & above),minlength=m).astype(int)
+
+        flags[i:i+step] = winding == target
+
+    if instrument.active: instrument.record('inside_polygon_indexed',edges=pairs)
+    return flags
+
+def _exact_vector(lat,lon):
+    # Unit vector of a point with the exact products of the rounded cosines and sines of its latitude and its longitude in [0°,360°), 
+    # so that the points on a meridian lie exactly in a plane through the poles. 
+    # The coordinates are integers scaled by a power of 2, which does not change the signs of determinants as they are linear in each vector.
+    lat,lon = math.radians(lat),math.radians(lon)
+    ratios = [value.as_integer_ratio() for value in (math.cos(lat),math.sin(lat),math.cos(lon),math.sin(lon))]
+    bits = max(denominator.bit_length() for numerator,denominator in ratios)
+    cos_lat,sin_lat,cos_lon,sin_lon = [numerator << (bits - denominator.bit_length()) for numerator,denominator in ratios]
+    return cos_lat*cos_lon,cos_lat*sin_lon,sin_lat << (bits - 1)
+
+def _exact_sign(a,b,p):
+    # Sign of the determinant of three unit vectors from _exact_vector, namely the side of the great circle through a and b on which p lies
+    det = a[0]*(b[1]*p[2] - b[2]*p[1]) - a[1]*(b[0]*p[2] - b[2]*p[0]) + a[2]*(b[0]*p[1] - b[1]*p[0])
+    return (det > 0) - (det < 0)
+
+@instrument.timed('boundary_index',lambda vertices,index: {'edges':len(vertices) - 1})
+def boundary_index(vertices,index):
+    '''
+    Complement the index of the sides of a spherical polygon with what classify_points_indexed needs to locate points on the boundary exactly.
+
+    Usage: 
+    boundary = boundary_index(vertices,meridian_index(vertices))
+
+    Inputs:
+    vertices -> [float 2d array] Vertices of a closed spherical polygon in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+    index -> [dict] index of the sides of the polygon built by meridian_index
+
+    Outputs:
+    boundary -> [dict] for each indexed side, the exact sign of the z component of its normal and how it passes a pole, 
+    together with the vertices, the sides along meridians sorted by longitude and the poles on the boundary.
+    '''
+    lats,lons = vertices[:,0],np.mod(vertices[:,1],360)
+    sides,normals = index['sides'],index['normals']
+
+    # The direction of a side relative to the North Pole is re-evaluated exactly if it is nearly a meridian.
+    side_z = np.sign(normals[:,2]).astype(int)
+    for k in np.nonzero(np.abs(normals[:,2]) < FILTER_BOUND)[0]:
+        a,b = _exact_vector(lats[sides[k]],lons[sides[k]]),_exact_vector(lats[sides[k]+1],lons[sides[k]+1])
+        z = a[0]*b[1] - a[1]*b[0]
+        side_z[k] = (z > 0) - (z < 0)
+
+    # Sides through a pole, including those whose great circle passes exactly through it, cross all meridians next to the pole.
+    xyz = latlon2xyz(lats,lons)
+    pole_rule = (index['pole'] != 0) | (side_z == 0)
+    north = np.where(index['pole'] != 0,index['pole'] > 0,xyz[sides,2] + xyz[sides+1,2] > 0)
+
+    # Parts of the boundary along meridians in form of [lon,lat_low,lat_high], from the sides along meridians, 
+    # the two halves of the sides through a pole, and the sides from a vertex at a pole.
+    dlon = np.diff(np.radians(vertices[:,1]))
+    dlon[dlon < -np.pi] += 2*np.pi
+    dlon[dlon > np.pi] -= 2*np.pi
+    a,b = np.arange(len(vertices) - 1),np.arange(1,len(vertices))
+    at_pole = np.abs(lats) == 90
+    polar = np.abs(dlon) == np.pi
+    pole_lat = 90*np.sign(lats[a] + lats[b])
+    parts = [np.column_stack([lons[a],np.minimum(lats[a],lats[b]),np.maximum(lats[a],lats[b])])[(dlon == 0) | at_pole[a] & at_pole[b]]]
+    for end in (a,b):
+        parts.append(np.column_stack([lons[end],np.minimum(lats[end],pole_lat),np.maximum(lats[end],pole_lat)])[polar & (pole_lat != 0)])
+    for end,other in ((a,b),(b,a)):
+        parts.append(np.column_stack([lons[other],np.minimum(lats[other],lats[end]),np.maximum(lats[other],lats[end])])[at_pole[end] & ~at_pole[other]])
+    meridians = np.vstack(parts)
+    meridians = meridians[np.argsort(meridians[:,0],kind='stable')]
+
+    poles = lats[at_pole].tolist() + (90*np.sign(lats[a] + lats[b]))[polar & (pole_lat != 0)].tolist()
+    return {'side_z':side_z,'pole_rule':pole_rule,'north':north,'lats':lats,'lons':lons,'keys':np.unique(_point_keys(lats,lons)),
+            'meridians':meridians,'north_pole':90.0 in poles,'south_pole':-90.0 in poles}
+
+def _point_keys(lats,lons):
+    # Keys identifying the points by their latitudes and longitudes in [0°,360°), where all longitudes of a pole are the same
+    return lats + 1j*np.where(np.abs(lats) == 90,0,lons)
+
+@instrument.timed('classify_points_indexed',lambda points,*args,**kwargs: {'points':len(np.atleast_2d(points))})
+def classify_points_indexed(points,index,boundary,arrangement,chunk_elements=2**22):
+    '''
+    Classify multiple points as inside, outside or on the boundary of a spherical polygon by the signs of determinants, evaluated exactly where the rounding errors may change them.
+
+    Usage: 
+    index = meridian_index(vertices)
+    classes = classify_points_indexed(points,index,boundary_index(vertices,index),arrangement)
+
+    Inputs:
+    points -> [float 2d array] Points to be classified in form of [[lat_0,lon_0],..,[lat_m,lon_m]] with unit of degrees.
+    index -> [dict] index of the sides of the polygon built by meridian_index
+    boundary -> [dict] exact signs and parts of the boundary built by boundary_index
+    arrangement -> [str] Arrangement of the vertices. Avaliable options are Counterclockwise and Clockwise.
+
+    Parameters:
+    chunk_elements -> [int, optional, default = 2**22] upper bound of the number of point-side pairs evaluated at a time, which bounds the memory usage.
+
+    Outputs:
+    classes -> [int8 array] 1 if the point is inside the polygon, -1 if it is outside, and 0 if it is on the boundary.
+
+    Note: The crossings are counted along the same rays as in inside_polygon_indexed, and whether a crossing lies north of the point is the sign of a determinant.
+    The point and the vertices are taken as the unit vectors with the exact products of their rounded cosines and sines, 
+    and a determinant is re-evaluated in integer arithmetic only if its magnitude in double precision is below FILTER_BOUND, which bounds its rounding error.
+    A point is on the boundary if its determinant with a side crossing its meridian is exactly 0, if it is a vertex, or if it lies on a side along a meridian, 
+    so the classes involve no tolerance and are the same on every run.
+    '''
+    if arrangement == 'Counterclockwise':
+        target = 1
+    elif arrangement == 'Clockwise':
+        target = -1
+    else:
+        raise Exception('Arrangement of the vertices can either be Counterclockwise or Clockwise.')
+
+    points = np.atleast_2d(points)
+    M = len(points)
+    normals,direction,sides = index['normals'],index['direction'],index['sides']
+    side_z,pole_rule,north = boundary['side_z'],boundary['pole_rule'],boundary['north']
+    lats,lons,meridians = boundary['lats'],boundary['lons'],boundary['meridians']
+    step = max(1,chunk_elements//max(1,2*len(index['bin_sides'])//index['n_bins'] + 1))
+    classes = np.zeros(M,dtype=np.int8)
+    vectors = {}
+    pairs = exact = 0
+
+    for i in range(0,M,step):
+        points_lat,points_lon = points[i:i+step,0],np.mod(points[i:i+step,1],360)
+        points_xyz = latlon2xyz(points_lat,points_lon)
+        m = len(points_xyz)
+        winding = np.zeros(m,dtype=int)
+
+        # Vertices, sides along meridians and poles on the boundary are found by comparing the coordinates.
+        on_boundary = np.isin(_point_keys(points_lat,points_lon),boundary['keys'])
+        starts = np.searchsorted(meridians[:,0],points_lon,'left')
+        counts = np.searchsorted(meridians[:,0],points_lon,'right') - starts
+        if counts.any():
+            pair_points = np.repeat(np.arange(m),counts)
+            pair_parts = np.repeat(starts - np.cumsum(counts) + counts,counts) + np.arange(counts.sum())
+            lat_pair = points_lat[pair_points]
+            on_boundary[pair_points[(lat_pair >= meridians[pair_parts,1]) & (lat_pair <= meridians[pair_parts,2])]] = True
+        if boundary['north_pole']: on_boundary |= points_lat == 90
+        if boundary['south_pole']: on_boundary |= points_lat == -90
+
+        # A side crossing westward over the northward part of the ray, or eastward over the southward part, winds counterclockwise around the point.
+        ray_lon = np.radians(points_lon)
+        for ray,sense,lon in ((1,-1,ray_lon),(-1,1,np.mod(ray_lon + np.pi,2*np.pi))):
+            pair_points,pair_sides,crosses = _ray_pairs(lon,index)
+            pairs += len(crosses)
+            pair_points,pair_sides = pair_points[crosses],pair_sides[crosses]
+            dot = ray*np.sum(normals[pair_sides]*points_xyz[pair_points],axis=1)
+            signs = np.sign(dot).astype(int)
+
+            # The filter: only the determinants within the bound of their rounding errors are evaluated exactly.
+            uncertain = np.nonzero((np.abs(dot) < FILTER_BOUND) & ~pole_rule[pair_sides])[0]
+            exact += len(uncertain)
+            for k in uncertain:
+                side,point = sides[pair_sides[k]],i + pair_points[k]
+                for vertex in (side,side + 1):
+                    if vertex not in vectors: vectors[vertex] = _exact_vector(lats[vertex],lons[vertex])
+                p = _exact_vector(points[point,0],points_lon[pair_points[k]])
+                signs[k] = ray*_exact_sign(vectors[side],vectors[side + 1],p)
+
+            # A point is on a side crossing its meridian if their determinant vanishes; the antipode of a point on a side is not counted as a crossing.
+            regular = ~pole_rule[pair_sides]
+            if ray == 1: on_boundary[pair_points[regular & (signs == 0)]] = True
+            above = np.where(regular,signs*side_z[pair_sides] < 0,north[pair_sides])
+            winding += sense*np.bincount(pair_points,weights=direction[pair_sides]*above,minlength=m).astype(int)
+
+        classes[i:i+step] = np.where(on_boundary,0,np.where(winding == target,1,-1))
+
+    if instrument.active: instrument.record('classify_points_indexed',edges=pairs,exact_evaluations=exact)
+    return classes
+
+@instrument.timed('lean_index',lambda vertices,*args,**kwargs: {'edges':len(vertices) - 1})
+def lean_index(vertices,n_bins=None):
+    '''
+    Build an index of the sides of a spherical polygon over bins of longitude for inside_polygon_lean, with unit normals and longitude bounds in single precision.
+
+    Inputs:
+    vertices -> [float 2d array] Vertices of a closed spherical polygon in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+
+    Parameters:
+    n_bins -> [int, optional, default = None] number of longitude bins; if None, it equals the number of sides.
+
+    Outputs:
+    index -> [dict] for each side, a row of the unit normal, the sign of its z component, the bounds and span of the longitude interval, the direction and whether it passes through the North Pole,
+    together with the sides overlapping each longitude bin in the compressed form of bin_offsets and bin_sides. 
+    The sides along meridians are included with a direction of 0, so that they mark the points near them as uncertain without being counted.
+    '''
+    lons = np.radians(vertices[:,1])
+    xyz = latlon2xyz(vertices[:,0],vertices[:,1])
+    dlon = np.diff(lons)
+    dlon[dlon < -np.pi] += 2*np.pi
+    dlon[dlon > np.pi] -= 2*np.pi
+
+    # A side through a pole is taken as passing just beside the pole eastward as in meridian_index, and only one through the North Pole is ever counted.
+    normals = np.cross(xyz[:-1],xyz[1:])
+    norm = np.linalg.norm(normals,axis=1)
+    sides = np.nonzero(norm > 0)[0]
+    dlon = dlon[sides]
+    polar = np.abs(dlon) >= np.pi
+    north = polar & (xyz[sides,2] + xyz[sides+1,2] > 0)
+    direction = np.where(polar,north,np.sign(dlon))
+
+    ends = np.radians(np.mod(vertices[:,1],360))
+    westward = (dlon < 0) & ~polar
+    low = np.where(westward,ends[sides+1],ends[sides])
+    high = np.where(westward,ends[sides],np.where(dlon == 0,low,ends[sides+1]))
+    span = np.mod(high - low,2*np.pi)
+
+    # The bins are found in single precision by the same operations as for the points, so that a point within the interval of a side always visits its bins.
+    if n_bins is None: n_bins = max(1,len(sides))
+    scale = np.float32(n_bins/(2*np.pi))
+    low32,high32 = low.astype(np.float32),high.astype(np.float32)
+    first_bin = np.minimum((low32*scale).astype(int),n_bins - 1)
+    last_bin = np.minimum((high32*scale).astype(int),n_bins - 1) + np.where(high32 < low32,n_bins,0)
+    counts = last_bin - first_bin + 1
+    bins = (np.repeat(first_bin - np.cumsum(counts) + counts,counts) + np.arange(counts.sum())) % n_bins
+    order = np.argsort(bins,kind='stable')
+
+    # The attributes of each side are kept in a row, so that they are gathered at once.
+    normals = normals[sides]/norm[sides][:,None]
+    table = np.column_stack([normals,np.sign(normals[:,2]),low,high,span,direction,north]).astype(np.float32)
+    return {'table':table,'n_bins':n_bins,'scale':scale,
+            'bin_offsets':np.searchsorted(bins[order],np.arange(n_bins+1)).astype(np.int32),
+            'bin_sides':np.repeat(np.arange(len(sides)),counts)[order].astype(np.int32)}
+
+def _order_by_counts(counts):
+    # A stable sort of the points by the numbers of sides in their bins, on 16-bit keys, which numpy sorts by radix, if the numbers fit into them
+    keys = counts.astype(np.uint16) if counts.max(initial=0) < 2**16 else counts
+    return np.argsort(keys,kind='stable')
+
+def _buffer(scratch,name,n,dtype):
+    # A view of length n of a reusable scratch array, which is enlarged when needed
+    array = scratch.get(name)
+    if array is None or len(array) < n or array.dtype != dtype:
+        array = scratch[name] = np.empty(max(n,0 if array is None else len(array)),dtype=dtype)
+    return array[:n]
+
+@instrument.timed('inside_polygon_lean',lambda points,*args,**kwargs: {'points':len(points)})
+def inside_polygon_lean(points,index,lean,arrangement,box=None,tolerance=1e-5,chunk_size=2**20,packing='bits',out=None,scratch=None):
+    '''
+    Determine if a massive number of points are inside a spherical polygon in single precision with reusable scratch buffers, and pack the flags.
+
+    Usage: 
+    bits = inside_polygon_lean(points,meridian_index(vertices),lean_index(vertices),arrangement)
+
+    Inputs:
+    points -> [float 2d array] Points to be determined in form of [[lat_0,lon_0],..,[lat_m,lon_m]] with unit of degrees, in single or double precision, including numpy.memmap.
+    index -> [dict] index of the sides of the polygon built by meridian_index
+    lean -> [dict] index of the sides of the polygon in single precision built by lean_index
+    arrangement -> [str] Arrangement of the vertices. Avaliable options are Counterclockwise and Clockwise.
+
+    Parameters:
+    box -> [tuple of 4 floats, optional, default = None] bounding box of the polygon in form of (lat_min,lat_max,lon_west,lon_east); the points outside of it are rejected at once.
+    tolerance -> [float, optional, default = 1e-5] width in radians of the band along the boundary where the points are re-evaluated in double precision; it should not be less than 1e-6.
+    chunk_size -> [int, optional, default = 2**20] number of points processed at a time, rounded up to a multiple of 8
+    packing -> [str, optional, default = 'bits'] Avaliable options are 'bits' and 'uint8'. 
+    If 'bits', the flags are packed 8 per byte with the first point in the lowest bit, as numpy.packbits with bitorder='little'; if 'uint8', each flag takes a byte of 0 or 1.
+    out -> [uint8 array, optional, default = None] output array of ceil(m/8) or m elements to be filled
+    scratch -> [dict, optional, default = None] scratch buffers, which are kept and reused across calls if a dict is given
+
+    Outputs:
+    flags -> [uint8 array] packed flags. If 1, the point is inside the polygon, otherwise, it is outside.
+
+    Note: The memory usage is a few tens of bytes per point of a chunk, instead of hundreds in double precision, and the buffers are allocated once.
+    The rounding errors of the coordinates and of the tests in single precision are below 1e-6 radians, so they can only change the flag of a point closer than that to the boundary.
+    A point is uncertain if it lies within tolerance of the great circle of a side whose longitude range, widened by tolerance, contains the meridian of its ray, 
+    or if its ray is that close to the edge of a longitude bin, which holds for all points within about 0.1° of the poles. This includes every point within tolerance of the boundary, and the uncertain points are re-evaluated by inside_polygon_indexed 
+    from their original coordinates, so all flags equal those of inside_polygon_indexed in double precision.
+    '''
+    if arrangement == 'Counterclockwise':
+        target = 1
+    elif arrangement == 'Clockwise':
+        target = -1
+    else:
+        raise Exception('Arrangement of the vertices can either be Counterclockwise or Clockwise.')
+    if packing not in ('bits','uint8'):
+        raise Exception("Packing can either be 'bits' or 'uint8'.")
+
+    M = len(points)
+    size = -(-M//8) if packing == 'bits' else M
+    if out is None: out = np.zeros(size,dtype=np.uint8)
+    if scratch is None: scratch = {}
+    step = max(8,-(-chunk_size//8)*8)
+    f4 = np.float32
+
+    table = lean['table']
+    n_bins,bin_offsets,bin_sides = lean['n_bins'],lean['bin_offsets'],lean['bin_sides']
+    scale,band = lean['scale'],f4(np.sin(tolerance))
+    if box is not None:
+        widening = np.degrees(tolerance)
+        lat_min,lat_max,lon_west,lon_east = box
+        full = lon_east - lon_west == 360 or (lon_east - lon_west) % 360 + 2*widening >= 360
+        lat_min,lat_max = f4(lat_min - widening),f4(lat_max + widening)
+        lon_west,lon_span = f4(lon_west - widening),f4((lon_east - lon_west) % 360 + 2*widening)
+
+    for i in range(0,M,step):
+        m = min(step,M - i)
+        lat,lon = _buffer(scratch,'lat',m,f4),_buffer(scratch,'lon',m,f4)
+        lat[:],lon[:] = points[i:i+m,0],points[i:i+m,1]
+        flags = _buffer(scratch,'flags',m,bool)
+
+        # Points outside of the bounding box by more than tolerance are rejected at once.
+        if box is None:
+            candidates = np.arange(m)
+        else:
+            np.greater_equal(lat,lat_min,out=flags)
+            flags &= lat <= lat_max
+            if not full: flags &= np.mod(lon - lon_west,f4(360)) <= lon_span
+            candidates = np.flatnonzero(flags)
+        n = len(candidates)
+
+        # Unit vectors and longitudes of the candidates in radians
+        x,y,z,t = [_buffer(scratch,name,n,f4) for name in ('x','y','z','t')]
+        ray_lon = [_buffer(scratch,'ray_lon0',n,f4),_buffer(scratch,'ray_lon1',n,f4)]
+        np.radians(np.take(lat,candidates,out=t),out=t)
+        np.sin(t,out=z)
+        np.cos(t,out=t)
+        np.radians(np.mod(np.take(lon,candidates,out=x),f4(360),out=x),out=ray_lon[0])
+        np.multiply(t,np.cos(ray_lon[0],out=x),out=x)
+        np.multiply(t,np.sin(ray_lon[0],out=y),out=y)
+        np.mod(ray_lon[0] + f4(np.pi),f4(2*np.pi),out=ray_lon[1])
+
+        winding = _buffer(scratch,'winding',n,np.int32)
+        winding[:] = 0
+        # Longitude margins equivalent to the band, which exceed half a bin within about 0.1° of the poles, so that all points there are uncertain.
+        margin = _buffer(scratch,'margin',n,f4)
+        np.divide(band,np.maximum(t,band),out=margin)
+        uncertain = _buffer(scratch,'uncertain',n,bool)
+        uncertain[:] = False
+        bins,starts,counts = [_buffer(scratch,name,n,np.int32) for name in ('bins','starts','counts')]
+        sorted_lon,sorted_x,sorted_y,sorted_z,sorted_margin = [_buffer(scratch,'sorted_' + name,n,f4) for name in ('lon','x','y','z','margin')]
+        sorted_starts = _buffer(scratch,'sorted_starts',n,np.int32)
+        sorted_winding = _buffer(scratch,'sorted_winding',n,np.int32)
+        sorted_uncertain = _buffer(scratch,'sorted_uncertain',n,bool)
+
+        # A side crossing westward over the northward part of the ray, or eastward over the southward part, winds counterclockwise around the point.
+        for ray,sense in ((0,-1),(1,1)):
+            np.multiply(ray_lon[ray],scale,out=t)
+            np.copyto(bins,t,casting='unsafe')
+            np.minimum(bins,n_bins - 1,out=bins)
+
+            # Sides within the band of a point may lie in the next bin if the point is near the edge of its bin.
+            t -= bins
+            uncertain |= (t < margin*scale) | (t > 1 - margin*scale)
+            np.take(bin_offsets,bins,out=starts)
+            np.take(bin_offsets,bins + 1,out=counts)
+            counts -= starts
+
+            # The points are sorted by the number of sides in their bins, so that the points whose bins have more than k sides are the last ones.
+            order = _order_by_counts(counts)
+            for source,target_buffer in ((ray_lon[ray],sorted_lon),(x,sorted_x),(y,sorted_y),(z,sorted_z),(margin,sorted_margin),(starts,sorted_starts)):
+                np.take(source,order,out=target_buffer)
+            remaining = n - np.cumsum(np.bincount(counts,minlength=1))
+            sorted_winding[:] = 0
+            sorted_uncertain[:] = False
+
+            for k in range(len(remaining) - 1):
+                a = n - remaining[k]
+                sides = bin_sides[sorted_starts[a:] + k]
+                nx,ny,nz,side_z,low,high,span,direction,north = table[sides].T
+                lon_pair = sorted_lon[a:]
+                crosses = np.where(low <= high,(lon_pair >= low) & (lon_pair < high),(lon_pair >= low) | (lon_pair < high))
+                dot = nx*sorted_x[a:] + ny*sorted_y[a:] + nz*sorted_z[a:]
+                if ray == 1: dot = -dot
+
+                # A point near the great circle of a side is uncertain if its meridian, moved by the band, crosses the side.
+                widened = np.mod(lon_pair - low + sorted_margin[a:],f4(2*np.pi)) < span + 2*sorted_margin[a:]
+                sorted_uncertain[a:] |= widened & (np.abs(dot) < band)
+                sorted_winding[a:] += (sense*direction*(crosses & ((dot*side_z < 0) | (north > 0)))).astype(np.int32)
+
+            winding[order] += sorted_winding
+            uncertain[order] |= sorted_uncertain
+
+        flags[:] = False
+        flags[candidates] = winding == target
+
+        # Points in the band along the boundary are re-evaluated in double precision from their original coordinates.
+        if uncertain.any():
+            near = candidates[uncertain]
+            if instrument.active: instrument.record('inside_polygon_lean',fallbacks=len(near))
+            flags[near] = inside_polygon_indexed(np.asarray(points[i + near],dtype=float),index,arrangement)
+
+        if packing == 'bits':
+            out[i//8:i//8 + -(-m//8)] = np.packbits(flags,bitorder='little')
+        else:
+            out[i:i+m] = flags
+    return out
@@ -0,0 +1,150 @@
+'''
+Opt-in instrumentation of the stages of the package.
+
+The instrumented functions count their calls, the sides and points they process and the quadrature evaluations, and record their wall times.
+Nothing is recorded unless a profile is open or a callback is registered, in which case each instrumented function costs a single check of the flag active.
+
+Usage:
+with instrument.profile() as stats:
+    polygon = Sphericalpolygon.from_file(filename,skiprows=1)
+    polygon.inertia(method='dblquad')
+print(stats['polygon_inertia'])
+
+instrument.add_callback(lambda stage,elapsed,counts: exporter.observe(stage,elapsed,**counts))
+'''
+import time
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+# True while a profile is open or a callback is registered
+active = False
+_profiles = []
+_callbacks = []
+_lock = threading.Lock()
+
+class Stats(dict):
+    '''
+    class Stats
+
+    Totals of the stages recorded in a profile, keyed by the name of the stage, each a dict of the wall time in seconds under 'time'
+    and of the counts, such as 'calls', 'edges', 'points' and 'evaluations'.
+    '''
+    def add(self,stage,elapsed,counts):
+        totals = self.setdefault(stage,{'time':0.0})
+        totals['time'] += elapsed
+        for key,value in counts.items(): totals[key] = totals.get(key,0) + value
+
+    def __repr__(self):
+        return 'Stats(' + dict.__repr__(self) + ')'
+
+def _update():
+    global active
+    active = bool(_profiles or _callbacks)
+
+def record(stage,elapsed=0.0,**counts):
+    '''
+    Add the wall time and counts of a stage to the open profiles and pass them to the callbacks.
+
+    Usage:
+    if instrument.active: instrument.record('polygon_inertia',evaluations=n)
+
+    Inputs:
+    stage -> [str] name of the stage
+
+    Parameters:
+    elapsed -> [float, optional, default = 0.0] wall time in seconds
+    counts -> keyword counts, such as calls, edges, points and evaluations
+    '''
+    if not active: return
+    with _lock:
+        for stats in _profiles: stats.add(stage,elapsed,counts)
+    for callback in list(_callbacks): callback(stage,elapsed,counts)
+
+def timed(stage,counts=None):
+    '''
+    Decorate a function as a stage, whose calls and wall times are recorded while instrumentation is active.
+
+    Inputs:
+    stage -> [str] name of the stage
+
+    Parameters:
+    counts -> [function, optional, default = None] function of the same arguments as the decorated one, which returns a dict of counts such as {'edges':n}
+    '''
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args,**kwargs):
+            if not active: return func(*args,**kwargs)
+            start = time.perf_counter()
+            result = func(*args,**kwargs)
+            record(stage,time.perf_counter() - start,calls=1,**(counts(*args,**kwargs) if counts else {}))
+            return result
+        return wrapper
+    return decorate
+
+class timing(object):
+    '''
+    Context manager that records the wall time of a block as a stage while instrumentation is active.
+
+    Usage:
+    with instrument.timing('inside_polygon.astropy'):
+        ...
+    '''
+    def __init__(self,stage,**counts):
+        self.stage,self.counts = stage,counts
+
+    def __enter__(self):
+        if active: self.start = time.perf_counter()
+        return self
+
+    def __exit__(self,*exc):
+        if active and hasattr(self,'start'): record(self.stage,time.perf_counter() - self.start,**self.counts)
+        return False
+
+@contextmanager
+def profile(callback=None):
+    '''
+    Record the stages run within a block, including those in other threads.
+
+    Usage:
+    with instrument.profile() as stats:
+        flags = polygon.contains_points(points)
+    print(stats['inside_polygon_indexed']['points'])
+
+    Parameters:
+    callback -> [function, optional, default = None] function of (stage,elapsed,counts) that is also called for each record within the block
+
+    Outputs:
+    stats -> instance of class Stats, filled as the stages run
+
+    Note: The stages run in other processes, as with workers > 1, are not recorded, except the quadrature evaluations of the 'dblquad' methods, which are returned by the workers.
+    '''
+    stats = Stats()
+    with _lock:
+        _profiles.append(stats)
+        if callback is not None: _callbacks.append(callback)
+        _update()
+    try:
+        yield stats
+    finally:
+        with _lock:
+            _profiles.remove(stats)
+            if callback is not None: _callbacks.remove(callback)
+            _update()
+
+def add_callback(callback):
+    '''
+    Register a function of (stage,elapsed,counts), such as a metrics exporter, that is called for each record until it is removed.
+    Instrumentation stays active while any callback is registered.
+    '''
+    with _lock:
+        _callbacks.append(callback)
+        _update()
+
+def remove_callback(callback):
+    '''
+    Unregister a function registered by add_callback.
+    '''
+    with _lock:
+        _callbacks.remove(callback)
+        _update()
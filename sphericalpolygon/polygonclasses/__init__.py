@@ -12,12 +12,69 @@ Class structure:
             - lats: latitudes of the spherical polygon in degrees
             - lons: longitudes of the spherical polygon in degrees
             - orientation: vertices arrangement; it can be counterclockwise or clockwise
+            - xyz: unit vectors of the vertices in form of [[x_0,y_0,z_0],...,[x_n,y_n,z_n]]
+            - excess: signed area of the spherical polygon over a unit sphere
 
             - methods:
             - contains_points: determine if a single point or multiple points are inside a spherical polygon.
+            - contains_points_stream: determine chunk by chunk if points from a file or an iterator are inside a spherical polygon.
+            - contains_points_packed: determine in single precision if a massive number of points are inside a spherical polygon, with packed flags.
+            - classify_points: classify points as inside, outside or on the boundary of a spherical polygon exactly.
             - area: calculate the area of a spherical polygon.
             - perimeter: calculate the perimeter of a spherical polygon.
             - centroid: identify the location of the centroid of a spherical polygon.
             - inertia: calculate the inertia tensor of a spherical polygon.
-            
-'''
\ No newline at end of file
+            - mass_properties: integrate the mass, center of mass and inertia tensor with a variable area density.
+            - precompute: compute and cache all properties over a unit sphere in one pass.
+            - simplify: remove vertices within a tolerance by the Douglas-Peucker algorithm on the sphere.
+            - densify: insert vertices along the sides longer than a given length.
+            - bounding_cap: find the smallest spherical cap containing the spherical polygon.
+            - bounding_box: find the latitude and longitude range of the spherical polygon.
+            - caps_overlap: coarsely test whether two spherical polygons may overlap.
+            - intersection, union, difference: clip two spherical polygons with each other.
+            - rasterize, rasterize_healpix: fill a latitude-longitude grid or a HEALPix map with the spherical polygon.
+            - rotate: rotate the spherical polygon rigidly, carrying over the cached properties.
+            - centroid_series, inertia_series: centroids and inertia tensors under a stack of rotations.
+            - contains_points_rotated: determine if points are inside the spherical polygon under a stack of rotations.
+
+    PolygonCollection
+
+        - attributes:
+            - names: names of the spherical polygons
+            - vertices: vertices of all closed spherical polygons packed in form of [[lat_0,lon_0],...,[lat_n,lon_n]]
+            - offsets: the k-th polygon takes the vertices from offsets[k] to offsets[k+1]-1
+            - excess: signed areas of the spherical polygons over a unit sphere
+            - orientations: vertices arrangements; they can be counterclockwise or clockwise
+
+        - methods:
+            - area: calculate the areas or masses of all spherical polygons.
+            - perimeter: calculate the perimeters of all spherical polygons.
+            - centroid: identify the locations of the centroids of all spherical polygons.
+            - inertia: compute the inertia tensors of all spherical polygons.
+            - properties: collect the above properties in columns keyed by name.
+            - save_store: save the polygons and their properties to a memory-mappable binary store.
+            - rasterize, rasterize_healpix: label the cells of a latitude-longitude grid or a HEALPix map by the polygon containing them.
+
+    MutableSphericalpolygon
+
+        - attributes:
+            - vertices: vertices of the closed spherical polygon in form of [[lat_0,lon_0],...,[lat_n,lon_n]]
+            - excess: signed area of the spherical polygon over a unit sphere
+            - orientation: vertices arrangement; it can be counterclockwise or clockwise
+
+        - methods:
+            - move_vertex, insert_vertex, append_vertex, remove_vertex: edit one vertex, re-evaluating only its adjacent sides.
+            - area, perimeter, centroid, inertia: properties from the running sums over the sides in constant time.
+            - refresh: re-evaluate all sides.
+            - to_polygon: freeze the current vertices into an instance of class Sphericalpolygon.
+
+    PolygonCache
+
+        - attributes:
+            - max_bytes: upper bound of the memory held by the cached polygons
+
+        - methods:
+            - get: return the cached polygon for the vertices, creating it on a miss.
+            - stats: numbers of hits, misses and evictions, together with the number of entries and their bytes.
+            - clear: remove all polygons and reset the statistics.
+'''
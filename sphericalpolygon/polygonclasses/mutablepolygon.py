@@ -0,0 +1,266 @@
+import numpy as np
+
+from .sphericalpolygon import Sphericalpolygon
+from ..excess_area import side_excess
+from ..functions import latlon2xyz,xyz2latlon,edge_moments,region_moments
+
+def _side_terms(vertices):
+    '''
+    Contributions of each side to the signed excess, perimeter, first moment and second moment, stacked in 11 columns.
+    '''
+    first,second = edge_moments(latlon2xyz(vertices[:,0],vertices[:,1]))
+    return np.column_stack([side_excess(vertices),2*np.linalg.norm(first,axis=1),first,second])
+
+class MutableSphericalpolygon(object):
+    '''
+    class MutableSphericalpolygon
+
+    A spherical polygon whose vertices can be moved, inserted and removed one at a time.
+    The signed excess, perimeter and moments are sums over the sides, so the contribution of each side is kept and a change of one vertex only re-evaluates its two adjacent sides.
+    The area, perimeter, centroid, inertia tensor and orientation are then available in constant time.
+    An edit thus costs a constant number of side evaluations, while inserting or removing a vertex also shifts the lists of vertices and side terms,
+    which is linear in the number of vertices but only moves pointers, and is far cheaper than re-evaluating all sides.
+
+    - attributes:
+        - vertices: vertices of the closed spherical polygon in form of [[lat_0,lon_0],...,[lat_n,lon_n]]
+        - excess: signed area of the spherical polygon over a unit sphere
+        - orientation: vertices arrangement; it can be counterclockwise or clockwise
+
+    - methods:
+        - move_vertex: move a vertex to a new location.
+        - insert_vertex: insert a vertex before a given one.
+        - append_vertex: add a vertex after the last one.
+        - remove_vertex: remove a vertex.
+        - area: calculate the area or mass of the spherical polygon.
+        - perimeter: calculate the perimeter of the spherical polygon.
+        - centroid: identify the location of the centroid of the spherical polygon.
+        - inertia: compute the geometrial or physical moment of inertia tensor of the spherical polygon.
+        - refresh: re-evaluate all sides, discarding the rounding errors accumulated over many updates.
+        - to_polygon: freeze the current vertices into an instance of class Sphericalpolygon.
+
+    The sums are re-evaluated from scratch every refresh_interval updates to bound the accumulated rounding errors.
+    '''
+
+    def __init__(self,vertices,refresh_interval=100000):
+
+        vertices = np.array(getattr(vertices,'vertices',vertices),dtype=float)
+        # The vertices are kept as an open ring; the closing side joins the last vertex to the first one.
+        if len(vertices) > 1 and (vertices[0] == vertices[-1]).all(): vertices = vertices[:-1]
+        if len(vertices) < 3:
+            raise Exception('A spherical polygon needs at least three distinct vertices.')
+
+        self._points = [tuple(vertex) for vertex in vertices]
+        self.refresh_interval = refresh_interval
+        self.refresh()
+
+    def __repr__(self):
+
+        return 'instance of class MutableSphericalpolygon with {:d} vertices'.format(len(self))
+
+    def __len__(self):
+
+        return len(self._points)
+
+    @property
+    def vertices(self):
+
+        return np.array(self._points + self._points[:1])
+
+    @property
+    def excess(self):
+
+        return self._sums[0]
+
+    @property
+    def orientation(self):
+
+        excess = self.excess
+        if 0 < excess < 2*np.pi or excess < -2*np.pi: return 'Counterclockwise'
+        return 'Clockwise'
+
+    def refresh(self):
+        '''
+        Re-evaluate the contributions of all sides and their sums.
+        '''
+        self._terms = list(_side_terms(self.vertices))
+        self._sums = np.sum(self._terms,axis=0)
+        self._updates = 0
+
+    def _replace(self,start,stop,points):
+        # Replace the contributions of the sides start,...,stop-1 by those of the sides through the given points.
+        new = list(_side_terms(np.array(points)))
+        self._sums += np.sum(new,axis=0) - np.sum(self._terms[start:stop],axis=0)
+        self._terms[start:stop] = new
+
+    def _updated(self):
+        self._updates += 1
+        if self._updates >= self.refresh_interval: self.refresh()
+
+    def move_vertex(self,i,lat,lon):
+        '''
+        Move the i-th vertex to a new location.
+
+        Usage:
+        polygon.move_vertex(3,-75.2,151.4)
+
+        Inputs:
+        i -> [int] index of the vertex; negative indices count from the end
+        lat,lon -> [float] new location with unit of degrees
+        '''
+        points = self._points
+        n = len(points)
+        i = i % n
+        points[i] = (lat,lon)
+        if i == 0:
+            # The sides around vertex 0 are the closing side and the first one.
+            self._replace(n-1,n,[points[-1],points[0]])
+            self._replace(0,1,[points[0],points[1]])
+        else:
+            self._replace(i-1,i+1,[points[i-1],points[i],points[(i+1) % n]])
+        self._updated()
+
+    def insert_vertex(self,i,lat,lon):
+        '''
+        Insert a vertex before the i-th vertex, splitting the side that ends at it.
+
+        Usage:
+        polygon.insert_vertex(3,-75.2,151.4)
+
+        Inputs:
+        i -> [int] index of the vertex before which the new vertex is inserted; negative indices count from the end.
+        An index of 0 splits the closing side, so the new vertex becomes the last one.
+
+        Note: Two sides are evaluated; the following vertices are shifted in the lists, which is linear in the number of vertices.
+        '''
+        points = self._points
+        n = len(points)
+        i = i % n or n
+        self._replace(i-1,i,[points[i-1],(lat,lon),points[i % n]])
+        points.insert(i,(lat,lon))
+        self._updated()
+
+    def append_vertex(self,lat,lon):
+        '''
+        Add a vertex after the last one, splitting the closing side.
+
+        Usage:
+        polygon.append_vertex(-75.2,151.4)
+
+        Inputs:
+        lat,lon -> [float] location of the new vertex with unit of degrees
+        '''
+        self.insert_vertex(0,lat,lon)
+
+    def remove_vertex(self,i):
+        '''
+        Remove the i-th vertex, merging its two adjacent sides.
+
+        Usage:
+        polygon.remove_vertex(3)
+
+        Inputs:
+        i -> [int] index of the vertex; negative indices count from the end
+
+        Note: One side is evaluated; the following vertices are shifted in the lists, which is linear in the number of vertices.
+        '''
+        points = self._points
+        n = len(points)
+        if n <= 3:
+            raise Exception('A spherical polygon needs at least three distinct vertices.')
+        i = i % n
+        if i == 0:
+            # The first side is dropped and the closing side then ends at vertex 1, which becomes vertex 0.
+            self._sums -= self._terms.pop(0)
+            self._replace(n-2,n-1,[points[-1],points[1]])
+        else:
+            self._replace(i-1,i+1,[points[i-1],points[(i+1) % n]])
+        del points[i]
+        self._updated()
+
+    def area(self, R = 1, rho = 1):
+        '''
+        Calculate the area or mass(if the area density is given) of the spherical polygon over a sphere with a radius of R.
+
+        Usage:
+        area = polygon.area()
+        mass = polygon.area(6378.137,81)
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+        rho -> [optional, float, default = 1] area density of the spherical polygon
+
+        Outputs:
+        area -> [float] Area of the spherical polygon. It is independent of how the vertices are arranged.
+        '''
+        area = np.abs(self.excess)
+        if area > 2*np.pi: area = 4*np.pi - area
+        return area*R**2*rho
+
+    def perimeter(self, R = 1):
+        '''
+        Calculate the perimeter of the spherical polygon over a sphere with a radius of R.
+
+        Usage:
+        peri = polygon.perimeter()
+        peri = polygon.perimeter(6378.137)
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+
+        Outputs:
+        perimeter -> [float] Perimeter of the spherical polygon.
+        '''
+        return self._sums[1]*R
+
+    def _moments(self):
+        return region_moments(self._sums[2:5],self._sums[5:],self.excess)
+
+    def centroid(self, R = 1):
+        '''
+        Identify the location of the centroid of the spherical polygon over a sphere with a radius of R.
+
+        Usage:
+        lat,lon,depth = polygon.centroid()
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+
+        Outputs:
+        lat,lon,depth -> [float] coordinate of the centroid.
+        Lat and lon are both in degrees; depth should be always positive, which implies the centroid is beneath the 'ground'.
+        '''
+        area,first,second = self._moments()
+        lat,lon,r = xyz2latlon(first/area)
+        return lat,lon,(1 - r)*R
+
+    def inertia(self, R = 1, rho = 1):
+        '''
+        Calculate the geometrical or physical(if the area density is given) moment of inertia tensor of the spherical polygon over a sphere with a radius of R.
+
+        Usage:
+        inertia = polygon.inertia()
+        inertia = polygon.inertia(6378.137,81)
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+        rho -> [optional, float, default = 1] area density of the spherical polygon
+
+        Outputs:
+        inertia -> [float array with 6 elements] symmetrical inertia tensor with six independent components M_{11}, M_{22}, M_{33}, M_{12}, M_{13}, and M_{23}.
+        '''
+        area,first,second = self._moments()
+        inertia = -second
+        inertia[:3] += area
+        return inertia*R**4*rho
+
+    def to_polygon(self):
+        '''
+        Freeze the current vertices into an instance of class Sphericalpolygon.
+
+        Usage:
+        polygon = mutable.to_polygon()
+
+        Outputs:
+        polygon -> an instance of class Sphericalpolygon
+        '''
+        return Sphericalpolygon(self.vertices)
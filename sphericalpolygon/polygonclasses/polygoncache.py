@@ -0,0 +1,142 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .sphericalpolygon import Sphericalpolygon
+from ..functions import close_ring
+
+# Bytes counted for each entry in addition to its arrays, for the instance and its dicts
+ENTRY_OVERHEAD = 1024
+
+def _nbytes(value):
+    # Bytes of the arrays held by a cached value, looking into dicts, tuples and lists
+    if isinstance(value,np.ndarray): return value.nbytes
+    if isinstance(value,dict): return sum(_nbytes(item) for item in value.values())
+    if isinstance(value,(tuple,list)): return sum(_nbytes(item) for item in value)
+    return 0
+
+class PolygonCache(object):
+    '''
+    class PolygonCache
+
+    A bounded cache of spherical polygons keyed by a hash of the content of their vertices, which returns the same instance of class Sphericalpolygon,
+    with the properties and indices computed so far, whenever the same vertices are given again. The least recently used polygons are evicted
+    when the arrays held by the cached polygons exceed max_bytes.
+
+    Usage:
+    cache = PolygonCache(max_bytes=2**28)
+    polygon = Sphericalpolygon.from_array(vertices,cache=cache)
+    polygon = cache.get(vertices)
+    print(cache.stats())
+    cache.clear()
+
+    - attributes:
+        - max_bytes: upper bound of the memory held by the cached polygons
+
+    - methods:
+        - get: return the cached polygon for the vertices, creating it on a miss.
+        - stats: numbers of hits, misses and evictions, together with the number of entries and their bytes.
+        - clear: remove all polygons and reset the statistics.
+
+    Note: The cached polygons are shared by all callers, so their vertices should not be reassigned; a polygon whose vertices were reassigned is rebuilt on the next request.
+    The cache is safe to use from multiple threads.
+    '''
+
+    def __init__(self,max_bytes=2**28):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.clear()
+
+    def __repr__(self):
+        return 'instance of class PolygonCache'
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _key(self,vertices):
+        # Hash of the closed vertices given by get, so that an open ring and its closed form share an entry.
+        vertices = np.ascontiguousarray(vertices,dtype=float)
+        digest = hashlib.blake2b(vertices.tobytes(),digest_size=16)
+        digest.update(str(vertices.shape).encode())
+        return digest.digest()
+
+    def _size(self,polygon):
+        return polygon.vertices.nbytes + polygon.xyz.nbytes + _nbytes(polygon._cache) + ENTRY_OVERHEAD
+
+    def get(self,vertices):
+        '''
+        Return the cached polygon with the given vertices, or create it as Sphericalpolygon.from_array and cache it.
+
+        Usage:
+        polygon = cache.get(vertices)
+
+        Inputs:
+        vertices -> [float 2d array] Vertices that make up the polygon in form of [[lat_0,lon_0],...,[lat_n,lon_n]] with unit of degrees.
+        As in Sphericalpolygon.from_array, the first vertex is appended to the end if it is not equal to the last one, so that open and closed rings share an entry.
+
+        Outputs:
+        polygon -> an instance of class Sphericalpolygon
+        '''
+        vertices = close_ring(np.asarray(vertices,dtype=float))
+        key = self._key(vertices)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0].vertices is entry[1]:
+                self._entries.move_to_end(key)
+                self._hits += 1
+
+                # The properties and indices computed since the last request are accounted for.
+                polygon = entry[0]
+                size = self._size(polygon)
+                self._bytes += size - entry[2]
+                self._entries[key] = (polygon,entry[1],size)
+                self._evict(key)
+                return polygon
+            self._misses += 1
+
+        # The polygon is created outside of the lock, so that other requests are not held up.
+        polygon = Sphericalpolygon(vertices)
+        size = self._size(polygon)
+        if size > self.max_bytes: return polygon
+        with self._lock:
+            previous = self._entries.pop(key,None)
+            if previous is not None: self._bytes -= previous[2]
+            self._entries[key] = (polygon,polygon.vertices,size)
+            self._bytes += size
+            self._evict(key)
+        return polygon
+
+    def _evict(self,keep):
+        # Remove the least recently used polygons other than keep until the bytes are within the bound.
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep: break
+            self._bytes -= self._entries.pop(key)[2]
+            self._evictions += 1
+
+    def stats(self):
+        '''
+        Collect the statistics of the cache.
+
+        Usage:
+        stats = cache.stats()
+
+        Outputs:
+        stats -> [dict] 'hits', 'misses' and 'evictions' since the creation or the last clear, the number of cached polygons 'entries',
+        the bytes held by them 'bytes' and the bound 'max_bytes'
+        '''
+        with self._lock:
+            return {'hits':self._hits,'misses':self._misses,'evictions':self._evictions,
+                    'entries':len(self._entries),'bytes':self._bytes,'max_bytes':self.max_bytes}
+
+    def clear(self):
+        '''
+        Remove all cached polygons and reset the statistics.
+        '''
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = 0
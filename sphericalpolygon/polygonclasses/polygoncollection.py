@@ -0,0 +1,317 @@
+import numpy as np
+
+from .sphericalpolygon import Sphericalpolygon
+from ..excess_area import side_excess
+from ..store import read_store,write_store
+from ..raster import rasterize_latlon,rasterize_healpix
+from ..functions import latlon2xyz,xyz2latlon,side_lengths,segment_sum,edge_moments,region_moments
+
+class PolygonCollection(object):
+    '''
+    class PolygonCollection
+
+    - attributes:
+        - names: names of the spherical polygons
+        - vertices: vertices of all closed spherical polygons packed in form of [[lat_0,lon_0],...,[lat_n,lon_n]]
+        - offsets: the k-th polygon takes the vertices from offsets[k] to offsets[k+1]-1
+        - xyz: unit vectors of all vertices, computed on first use
+        - excess: signed areas of the spherical polygons over a unit sphere
+        - orientations: vertices arrangements; they can be counterclockwise or clockwise
+
+    - methods:
+        - area: calculate the areas or masses of all spherical polygons.
+        - perimeter: calculate the perimeters of all spherical polygons.
+        - centroid: identify the locations of the centroids of all spherical polygons.
+        - inertia: compute the geometrial or physical moment of inertia tensors of all spherical polygons.
+        - properties: collect the above properties in columns keyed by name.
+        - save_store: save the polygons and their properties to a memory-mappable binary store, which can be reopened with PolygonCollection.from_store.
+    '''
+
+    def __init__(self,names,vertices,offsets,excess=None):
+
+        self.names = list(names)
+        self.vertices = vertices
+        self.offsets = offsets
+
+        if excess is None: excess = segment_sum(side_excess(vertices),offsets)
+        counterclockwise = ((0 < excess) & (excess < 2*np.pi)) | (excess < -2*np.pi)
+        self.excess = excess
+        self.orientations = np.where(counterclockwise,'Counterclockwise','Clockwise')
+
+        # Unit vectors of the vertices and properties over a unit sphere are filled on first use.
+        self._cache = {}
+
+    @property
+    def xyz(self):
+
+        if 'xyz' not in self._cache: self._cache['xyz'] = latlon2xyz(self.vertices[:,0],self.vertices[:,1])
+        return self._cache['xyz']
+
+    def __repr__(self):
+
+        return 'instance of class PolygonCollection with {:d} polygons'.format(len(self))
+
+    def __len__(self):
+
+        return len(self.names)
+
+    def __getitem__(self,key):
+        '''
+        Extract a spherical polygon by its name or index as an instance of class Sphericalpolygon.
+        For a collection opened from a binary store, the vertices of the polygon are a view into the memory-mapped file; otherwise, they are copied.
+        '''
+        k = self.names.index(key) if isinstance(key,str) else key
+        return Sphericalpolygon._from_view(self.vertices[self.offsets[k]:self.offsets[k+1]])
+
+    def from_polygons(polygons,names=None):
+        '''
+        Create an instance of class PolygonCollection from a sequence of spherical polygons.
+
+        Usage:
+        collection = PolygonCollection.from_polygons([polygon_a,polygon_b],['a','b'])
+
+        Inputs:
+        polygons -> [list] instances of class Sphericalpolygon, or float 2d arrays of closed polygons in form of [[lat_0,lon_0],...,[lat_n,lon_n]] with unit of degrees.
+
+        Parameters:
+        names -> [list of str, optional] names of the polygons; default: their indices.
+
+        Outputs:
+        collection -> an instance of class PolygonCollection
+        '''
+        polygons = [np.asarray(getattr(polygon,'vertices',polygon),dtype=float) for polygon in polygons]
+        if names is None: names = [str(k) for k in range(len(polygons))]
+        offsets = np.cumsum([0] + [len(polygon) for polygon in polygons])
+
+        return PolygonCollection(names,np.concatenate(polygons),offsets)
+
+    def from_file(filename):
+        '''
+        Create an instance of class PolygonCollection from a file listing multiple polygons, such as NnrMRVL_PltBndsLatLon/All_boundaries.
+
+        Usage:
+        collection = PolygonCollection.from_file(filename)
+
+        Inputs:
+        filename -> [str] input file that lists vertices of polygons in form of
+
+            name_0
+            lat_0,lon_0
+            ...
+            lat_n,lon_n
+            name_1
+            ...
+
+        with unit of degrees. If the first vertex of a polygon is not equal to the last one, a point is automatically added to the end of its vertices sequence to form a closed polygon.
+        Vertices can be arranged either counterclockwise or clockwise. Blank lines and lines starting with # are skipped; a polygon without vertices raises ValueError.
+
+        Outputs:
+        collection -> an instance of class PolygonCollection
+
+        Note: The spherical polygons have a latitude range of [-90°,90°] and a longitude range of [-180°,180°] or [0°,360°].
+        '''
+        names,offsets,coords = [],[],[]
+
+        def close_ring():
+            # create a closed spherical polygon
+            start = 2*offsets[-1]
+            if start == len(coords):
+                raise ValueError('Polygon {} in {} has no vertices.'.format(names[-1],filename))
+            if coords[start] != coords[-2] or coords[start+1] != coords[-1]:
+                coords.extend(coords[start:start+2])
+
+        # Parse the file in a single pass, where a line starting with a letter opens a new polygon and a line starting with # is a comment.
+        # The checks are kept off the path of the vertex lines, which make up nearly all of the file.
+        with open(filename) as f:
+            for line in f:
+                fields = line.replace(',',' ').split()
+                if not fields: continue
+                first = fields[0][0]
+                if first.isalpha():
+                    if names: close_ring()
+                    elif coords: raise ValueError('{} lists vertices before the name of the first polygon.'.format(filename))
+                    names.append(fields[0])
+                    offsets.append(len(coords)//2)
+                elif first == '#':
+                    continue
+                else:
+                    try:
+                        coords.extend((float(fields[0]),float(fields[1])))
+                    except IndexError:
+                        raise ValueError('Line {!r} of {} is neither a name nor a vertex of a polygon.'.format(line.strip(),filename))
+        if not names: raise ValueError('{} lists no polygons.'.format(filename))
+        close_ring()
+        offsets.append(len(coords)//2)
+
+        return PolygonCollection(names,np.array(coords).reshape(-1,2),np.array(offsets))
+
+    def from_store(filename):
+        '''
+        Open a binary store created by save_store or convert_to_store. The vertices and the stored properties are memory-mapped rather than read,
+        so that opening takes constant time and polygons extracted from the collection are zero-copy views into the file.
+
+        Usage:
+        collection = PolygonCollection.from_store('plates.sphp')
+
+        Inputs:
+        filename -> [str] binary store
+
+        Outputs:
+        collection -> an instance of class PolygonCollection
+        '''
+        names,arrays = read_store(filename)
+        collection = PolygonCollection(names,arrays['vertices'],arrays['offsets'],arrays['excess'])
+        for key in ('perimeter','centroid','inertia'):
+            collection._cache[key] = arrays[key]
+        return collection
+
+    def save_store(self,filename):
+        '''
+        Save the polygons and their properties over a unit sphere to a binary store, which can be reopened with PolygonCollection.from_store.
+
+        Usage:
+        collection.save_store('plates.sphp')
+
+        Inputs:
+        filename -> [str] output binary store
+        '''
+        write_store(filename,self)
+
+    def _moments(self):
+        first,second = edge_moments(self.xyz)
+        return region_moments(segment_sum(first,self.offsets),segment_sum(second,self.offsets),self.excess)
+
+    def area(self, R = 1, rho = 1):
+        '''
+        Calculate the areas or masses(if the area density is given) of all spherical polygons over a sphere with a radius of R.
+
+        Usage:
+        areas = collection.area()
+        masses = collection.area(6378.137,81)
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+        rho -> [optional, float, default = 1] area density of the spherical polygons
+
+        Outputs:
+        areas -> [float array] Areas of the spherical polygons in order of names.
+        '''
+        areas = np.abs(self.excess)
+        areas = np.where(areas > 2*np.pi,4*np.pi - areas,areas)
+        return areas*R**2*rho
+
+    def perimeter(self, R = 1):
+        '''
+        Calculate the perimeters of all spherical polygons over a sphere with a radius of R.
+
+        Usage:
+        peris = collection.perimeter()
+        peris = collection.perimeter(6378.137)
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+
+        Outputs:
+        perimeters -> [float array] Perimeters of the spherical polygons in order of names.
+        '''
+        if 'perimeter' not in self._cache: self._cache['perimeter'] = segment_sum(side_lengths(self.xyz),self.offsets)
+        return self._cache['perimeter']*R
+
+    def centroid(self, R = 1):
+        '''
+        Identify the locations of the centroids of all spherical polygons over a sphere with a radius of R.
+
+        Usage:
+        centroids = collection.centroid()
+        centroids = collection.centroid(6378.137)
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+
+        Outputs:
+        centroids -> [float 2d array] coordinates of the centroids in form of [[lat_0,lon_0,depth_0],...] in order of names.
+        Lat and lon are both in degrees; depth should be always positive, which implies the centroid is beneath the 'ground'.
+        '''
+        if 'centroid' not in self._cache:
+            area,first,second = self._moments()
+            lats,lons,r = xyz2latlon(first/area[:,None])
+            self._cache['centroid'] = np.stack([lats,lons,1 - r],axis=1)
+        centroids = self._cache['centroid'].copy()
+        centroids[:,2] *= R
+        return centroids
+
+    def inertia(self, R = 1, rho = 1):
+        '''
+        Calculate the geometrical or physical(if the area density is given) moment of inertia tensors of all spherical polygons over a sphere with a radius of R.
+
+        Usage:
+        inertias = collection.inertia()
+        inertias = collection.inertia(6378.137,81)
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+        rho -> [optional, float, default = 1] area density of the spherical polygons
+
+        Outputs:
+        inertias -> [float 2d array] inertia tensors in order of names, each with six components M_{11}, M_{22}, M_{33}, M_{12}, M_{13}, and M_{23}.
+        '''
+        if 'inertia' not in self._cache:
+            area,first,second = self._moments()
+            inertia = -second
+            inertia[:,:3] += area[:,None]
+            self._cache['inertia'] = inertia
+        return self._cache['inertia']*R**4*rho
+
+    def properties(self, R = 1, rho = 1):
+        '''
+        Collect the orientations, areas, perimeters, centroids and inertia tensors of all spherical polygons in columns.
+
+        Usage:
+        props = collection.properties()
+        props = collection.properties(6378.137,81)
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+        rho -> [optional, float, default = 1] area density of the spherical polygons
+
+        Outputs:
+        props -> [dict] columns 'name', 'orientation', 'area', 'perimeter', 'centroid' and 'inertia', each aligned with the names of the polygons;
+        the area and inertia are masses and physical inertia tensors if rho is given.
+        '''
+        return {'name':np.array(self.names),'orientation':self.orientations,
+                'area':self.area(R,rho),'perimeter':self.perimeter(R),
+                'centroid':self.centroid(R),'inertia':self.inertia(R,rho)}
+
+    def rasterize(self,resolution=1,fraction=False,subsamples=4,lon_start=-180):
+        '''
+        Rasterize all spherical polygons onto a global regular latitude-longitude grid, such as a map of plate labels.
+
+        Usage:
+        labels = collection.rasterize(0.5)
+
+        Parameters:
+        resolution -> [float or 2 floats, optional, default = 1] cell size in degrees, or cell sizes in latitude and longitude; they should divide 180 and 360.
+        fraction -> [bool, optional, default = False] If True, the covered fractions of the cells are computed for each polygon.
+        subsamples -> [int, optional, default = 4] number of parallels per row of cells to compute the fractions
+        lon_start -> [float, optional, default = -180] western longitude of the first column
+
+        Outputs:
+        cells -> [int 2d array with shape (n_lat,n_lon)] index of the first polygon containing the center of each cell, or -1 if none;
+        with fraction, [float 3d array with shape (n_polygons,n_lat,n_lon)] covered fractions of the cells for each polygon.
+        '''
+        return rasterize_latlon(self,resolution,fraction,subsamples,lon_start)
+
+    def rasterize_healpix(self,nside):
+        '''
+        Rasterize all spherical polygons onto a HEALPix map in RING ordering.
+
+        Usage:
+        labels = collection.rasterize_healpix(64)
+
+        Inputs:
+        nside -> [int] resolution parameter of the HEALPix map, which has 12*nside**2 pixels
+
+        Outputs:
+        pixels -> [int array with 12*nside**2 elements] index of the first polygon containing the center of each pixel, or -1 if none
+        '''
+        return rasterize_healpix(self,nside)
@@ -0,0 +1,185 @@
+import numpy as np
+
+from .polygoncollection import PolygonCollection
+from ..stream import stream_map
+from ..functions import latlon2xyz,cube_cells,cube_cell_grid
+
+class PolygonLocator(object):
+    '''
+    class PolygonLocator
+
+    A spatial index that finds which of many spherical polygons contains each point.
+    The sphere is divided into equiangular cube-face cells. A cell that no polygon boundary passes through lies entirely in one polygon or in none, so points in it are labeled directly;
+    points in the other cells are tested exactly only against the few polygons whose boundary passes nearby or which contain the cell center.
+
+    - attributes:
+        - collection: the indexed spherical polygons as an instance of class PolygonCollection
+        - names: names of the spherical polygons
+        - resolution: number of cells along each side of a cube face
+        - owner: for each cell without polygon boundaries, index of the polygon containing it, or -1 if none; for other cells, -1
+        - cell_offsets, cell_polygons: candidate polygons of the k-th cell are cell_polygons[cell_offsets[k]:cell_offsets[k+1]]
+
+    - methods:
+        - locate: find the index of the polygon containing each point.
+        - locate_stream: find chunk by chunk the polygons containing points from a file or an iterator.
+        - save: save the locator to a .npz file, which can be reloaded with PolygonLocator.load.
+    '''
+
+    def __init__(self,collection,resolution=32,index=None):
+
+        self.collection = collection
+        self.names = collection.names
+        self.resolution = resolution
+        self.polygons = [collection[k] for k in range(len(collection))]
+
+        if index is None: index = self._build()
+        self.owner,self.cell_offsets,self.cell_polygons = index
+
+    def __repr__(self):
+
+        return 'instance of class PolygonLocator with {:d} polygons over {:d} cells'.format(len(self.polygons),len(self.owner))
+
+    def from_polygons(polygons,names=None,resolution=32):
+        '''
+        Create an instance of class PolygonLocator from a sequence of spherical polygons.
+
+        Usage:
+        locator = PolygonLocator.from_polygons([polygon_a,polygon_b],['a','b'])
+
+        Inputs:
+        polygons -> [list] instances of class Sphericalpolygon, or float 2d arrays of closed polygons in form of [[lat_0,lon_0],...,[lat_n,lon_n]] with unit of degrees.
+
+        Parameters:
+        names -> [list of str, optional] names of the polygons; default: their indices.
+        resolution -> [int, optional, default = 32] number of cells along each side of a cube face
+
+        Outputs:
+        locator -> an instance of class PolygonLocator
+        '''
+        return PolygonLocator(PolygonCollection.from_polygons(polygons,names),resolution)
+
+    def load(filename):
+        '''
+        Load an instance of class PolygonLocator saved by the method save, without rebuilding the index.
+
+        Usage:
+        locator = PolygonLocator.load('plates_locator.npz')
+
+        Inputs:
+        filename -> [str] .npz file created by the method save
+
+        Outputs:
+        locator -> an instance of class PolygonLocator
+        '''
+        with np.load(filename) as data:
+            collection = PolygonCollection(data['names'].tolist(),data['vertices'],data['offsets'])
+            index = data['owner'],data['cell_offsets'],data['cell_polygons']
+            return PolygonLocator(collection,int(data['resolution']),index)
+
+    def save(self,filename):
+        '''
+        Save the polygons and the index to a .npz file.
+
+        Usage:
+        locator.save('plates_locator.npz')
+
+        Inputs:
+        filename -> [str] output .npz file
+        '''
+        collection = self.collection
+        np.savez(filename,names=np.array(self.names),vertices=collection.vertices,offsets=collection.offsets,resolution=self.resolution,
+                 owner=self.owner,cell_offsets=self.cell_offsets,cell_polygons=self.cell_polygons)
+
+    def _build(self,chunk_elements=2**22):
+        centers,corners = cube_cell_grid(self.resolution)
+        n_cells = len(centers)
+
+        # Angular radius of each cell, which is attained at one of its corners since cells are bounded by great-circle arcs.
+        cos_radii = np.min(np.sum(corners*centers[:,None],axis=-1),axis=1)
+        radii = np.arccos(np.clip(cos_radii,-1,1))
+
+        near = np.zeros((len(self.polygons),n_cells),dtype=bool)
+        inside = np.zeros((len(self.polygons),n_cells),dtype=bool)
+
+        for k,polygon in enumerate(self.polygons):
+            a,b = polygon.xyz[:-1],polygon.xyz[1:]
+            mids = a + b
+            mids /= np.linalg.norm(mids,axis=1,keepdims=True)
+            half_lengths = np.arccos(np.clip(np.sum(a*mids,axis=1),-1,1))
+
+            # A side passes within the cell only if its midpoint is closer to the cell center than the half length of the side plus the cell radius.
+            step = max(1,chunk_elements//len(mids))
+            for i in range(0,n_cells,step):
+                angles = np.arccos(np.clip(centers[i:i+step] @ mids.T,-1,1))
+                near[k,i:i+step] = np.any(angles < half_lengths + radii[i:i+step,None],axis=1)
+
+            inside[k] = polygon.contains_points(np.degrees(np.stack([np.arcsin(np.clip(centers[:,2],-1,1)),np.arctan2(centers[:,1],centers[:,0])],axis=1)))
+
+        touched = near.any(axis=0)
+        owner = np.where(inside.any(axis=0) & ~touched,np.argmax(inside,axis=0),-1)
+
+        candidates = (near | inside) & touched
+        cell_offsets = np.concatenate([[0],np.cumsum(candidates.sum(axis=0))])
+        cell_polygons = np.nonzero(candidates.T)[1]
+        return owner,cell_offsets,cell_polygons
+
+    def locate(self,points):
+        '''
+        Find the index of the polygon containing each point. If several polygons contain a point, the first one in order is taken.
+
+        Usage:
+        labels = locator.locate([[30,102],[-75,33]])
+        names = np.array(locator.names)[labels]
+
+        Inputs:
+        points -> [float array with 2 elements or float 2d array] single point or multiple points in form of [lat,lon] or [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+
+        Outputs:
+        labels -> [int or int array] indices of the polygons containing the points, or -1 if no polygon contains a point.
+        '''
+        points = np.asarray(points,dtype=float)
+        single = points.ndim == 1
+        points = np.atleast_2d(points)
+
+        cells = cube_cells(latlon2xyz(points[:,0],points[:,1]),self.resolution)
+        labels = self.owner[cells]
+
+        # Expand the points in cells crossed by polygon boundaries into pairs of point and candidate polygon.
+        starts,counts = self.cell_offsets[cells],np.diff(self.cell_offsets)[cells]
+        pair_points = np.repeat(np.arange(len(points)),counts)
+        pair_polygons = self.cell_polygons[np.repeat(starts - np.cumsum(counts) + counts,counts) + np.arange(counts.sum())]
+
+        order = np.argsort(pair_polygons,kind='stable')
+        pair_points,pair_polygons = pair_points[order],pair_polygons[order]
+        bounds = np.searchsorted(pair_polygons,np.arange(len(self.polygons)+1))
+
+        for k in range(len(self.polygons)):
+            idx = pair_points[bounds[k]:bounds[k+1]]
+            if len(idx) == 0: continue
+            idx = idx[labels[idx] < 0]
+            labels[idx[self.polygons[k].contains_points(points[idx])]] = k
+
+        if single: return int(labels[0])
+        return labels
+
+    def locate_stream(self,source,chunk_size=2**20,buffered=True,**kwargs):
+        '''
+        Find chunk by chunk the polygons containing points from a large file, a memory-mapped array or an iterator, with constant memory.
+
+        Usage:
+        for labels in locator.locate_stream('catalog.npy'): ...
+        for labels in locator.locate_stream('catalog.csv',skiprows=1,delimiter=','): ...
+
+        Inputs:
+        source -> [str, float 2d array or iterable] a .npy file, which is memory-mapped; a text file listing lat and lon of a point per line; 
+        a float 2d array, including numpy.memmap; or an iterable of float 2d arrays of points in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+
+        Parameters:
+        chunk_size -> [int, optional, default = 2**20] number of points per chunk for files and arrays
+        buffered -> [bool, optional, default = True] If True, the next chunk is read in a background thread while the current one is located.
+        kwargs -> keyword arguments skiprows, delimiter and usecols for text files
+
+        Outputs:
+        labels -> [generator] int arrays for each chunk in order, with the indices of the polygons containing the points, or -1 if no polygon contains a point.
+        '''
+        return stream_map(self.locate,source,chunk_size,buffered,**kwargs)
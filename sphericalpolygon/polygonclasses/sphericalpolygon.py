@@ -1,11 +1,29 @@
 import numpy as np
-from astropy import units as u
 
-from ..inside_polygon import inside_polygon
-from ..excess_area import polygon_excess,polygon_area
-from ..perimeter import polygon_perimeter
+from ..inside_polygon import inside_polygon_batch,meridian_index,inside_polygon_indexed,boundary_index,classify_points_indexed,lean_index,inside_polygon_lean
+from ..excess_area import polygon_excess
 from ..centroid import polygon_centroid
 from ..inertia import polygon_inertia
+from ..stream import stream_map
+from ..simplify import simplify_vertices,densify_vertices
+from ..boolean import boolean_rings
+from ..raster import rasterize_latlon,rasterize_healpix
+from ..rotation import rotation_matrices,rotate_tensors
+from ..density import density_moments
+from ..functions import latlon2xyz,xyz2latlon,side_lengths,edge_moments,region_moments,angles_between,minimal_cap,arc_lat_ranges,close_ring
+
+def _variable(rho):
+    # A density given as a function or on a grid, rather than as a scalar or an astropy Quantity
+    return callable(rho) or np.ndim(rho) == 2
+
+def _density_rule(method,workers,order,tol):
+    # Order and tolerance of the Gauss-Legendre rules of density_moments for the method of centroid and inertia; there is no closed form or dblquad path for a variable density.
+    if workers != 1:
+        raise ValueError('workers is only used by the dblquad method, which is not available for a variable density.')
+    if method == 'analytic': return order,tol
+    if method == 'gauss': return order,None
+    if method == 'adaptive': return order,1e-10 if tol is None else tol
+    raise ValueError("Method for a variable density can either be 'analytic', 'gauss' or 'adaptive'.")
 
 class Sphericalpolygon(object):
     '''
@@ -16,62 +34,115 @@ class Sphericalpolygon(object):
         - lats: latitudes of the spherical polygon in degrees
         - lons: longitudes of the spherical polygon in degrees
         - orientation: vertices arrangement; it can be counterclockwise or clockwise
+        - xyz: unit vectors of the vertices in form of [[x_0,y_0,z_0],...,[x_n,y_n,z_n]]
+        - excess: signed area of the spherical polygon over a unit sphere
 
     - methods:
         - contains_points: determine if a single point or multiple points are inside a spherical polygon.
+        - contains_points_stream: determine chunk by chunk if points from a file or an iterator are inside a spherical polygon.
+        - classify_points: classify points as inside, outside or on the boundary of a spherical polygon exactly.
         - area: calculate the area or mass of a spherical polygon.
         - perimeter: calculate the perimeter of a spherical polygon.
         - centroid: identify the location of the centroid of a spherical polygon.
         - inertia: compute the geometrial or physical moment of inertia tensor of a spherical polygon.
-        
+        - mass_properties: integrate the mass, center of mass and inertia tensor with a variable area density.
+        - precompute: compute and cache all properties over a unit sphere in one pass.
+        - bounding_cap: find the smallest spherical cap containing the spherical polygon.
+        - bounding_box: find the latitude and longitude range of the spherical polygon.
+        - caps_overlap: coarsely test whether two spherical polygons may overlap.
+        - intersection, union, difference: clip two spherical polygons with each other.
+        - simplify: remove vertices within a tolerance by the Douglas-Peucker algorithm on the sphere.
+        - densify: insert vertices along the sides longer than a given length.
+        - rotate: rotate the spherical polygon rigidly, carrying over the cached properties.
+        - centroid_series, inertia_series: centroids and inertia tensors under a stack of rotations.
+        - contains_points_rotated: determine if points are inside the spherical polygon under a stack of rotations.
+
+    Properties over a unit sphere are computed on first use and cached; R and rho are applied afterwards. 
+    Assigning new vertices to the attribute vertices clears the cache, while the vertices array itself is read-only.
     ''' 
 
     def __init__(self,vertices):
 
         self.vertices = vertices
+
+    @property
+    def vertices(self):
+
+        return self._vertices
+
+    @vertices.setter
+    def vertices(self,vertices):
+
+        # Store a read-only copy owned by the instance, so that the cached properties can only be invalidated through this setter,
+        # and not by later changes to the array of the caller.
+        vertices = np.array(vertices,dtype=float)
+        vertices.flags.writeable = False
+        self._set_vertices(vertices)
+
+    def _set_vertices(self,vertices):
+
+        self._vertices = vertices
         self.lats = vertices[:,0]
         self.lons = vertices[:,1]
+        self.xyz = latlon2xyz(self.lats,self.lons)
 
         excess = polygon_excess(vertices)
         if 0 < excess < 2*np.pi or excess < -2*np.pi: flag = 'Counterclockwise'
         if -2*np.pi < excess < 0 or excess > 2*np.pi: flag = 'Clockwise'
 
+        self.excess = excess
         self.orientation = flag
 
+        # Properties over a unit sphere and the index of the sides for contains_points are filled on first use.
+        self._cache = {}
 
     def __repr__(self):
     
         return 'instance of class Sphericalpolygon'
 
-    def from_array(vertices):   
+    def _from_view(vertices):
+        '''
+        Create an instance of class Sphericalpolygon on the vertices of a closed polygon as they are, without copying them or closing the ring,
+        such as a slice of the memory-mapped vertices of a binary store. Writeable or non-float64 vertices are copied as by the constructor,
+        since later changes to them would leave the cached properties stale.
+        '''
+        if vertices.flags.writeable or vertices.dtype != np.float64: return Sphericalpolygon(vertices)
+        polygon = Sphericalpolygon.__new__(Sphericalpolygon)
+        polygon._set_vertices(vertices)
+        return polygon
+
+    def from_array(vertices,cache=None):   
         '''
         Create an instance of class Sphericalpolygon from numpy array.
     
         Usage:
         polygon = Sphericalpolygon.from_array(vertices)
+        polygon = Sphericalpolygon.from_array(vertices,cache=cache)
 
         Inputs:
         vertices -> [float 2d array] Vertices that make up the polygon in form of [[lat_0,lon_0],...,[lat_n,lon_n]] with unit of degrees. 
         If the first vertex is not equal to the last one, a point is automatically added to the end of the vertices sequence to form a closed polygon. 
         Vertices can be arranged either counterclockwise or clockwise.
 
+        Parameters:
+        cache -> [PolygonCache, optional, default = None] If given, the polygon with the same vertices is taken from the cache with its computed properties, 
+        or created and added to it.
+
         Outputs:
         polygon -> an instance of class Sphericalpolygon 
 
         Note: The spherical polygon has a latitude range of [-90°,90°] and a longitude range of [-180°,180°] or [0°,360°].
         '''
-        vertices = np.array(vertices)
-        if (vertices[0] != vertices[-1]).all():
-            vertices = np.append(vertices,[vertices[0]],axis=0) # create a closed spherical polygon
+        if cache is not None: return cache.get(vertices)
 
-        return Sphericalpolygon(vertices)
+        return Sphericalpolygon(close_ring(np.array(vertices)))
     
-    def from_file(filename,skiprows=0):
+    def from_file(filename,skiprows=0,cache=None):
         '''
         Create an instance of class Sphericalpolygon from a file.
     
         Usage:
-        polygon = Sphericalpolygon.from_file(filename,[skiprows])
+        polygon = Sphericalpolygon.from_file(filename,[skiprows,cache])
 
         Inputs:
         filename -> [str] input file that lists vertices of a polygon in form of 
@@ -88,6 +159,8 @@ class Sphericalpolygon(object):
 
         Parameters:
         skiprows -> [int, optional] skip the first `skiprows` lines, including comments; default: 0.
+        cache -> [PolygonCache, optional, default = None] If given, the polygon with the same vertices is taken from the cache with its computed properties, 
+        or created and added to it.
 
         Outputs:
         polygon -> an instance of class Sphericalpolygon 
@@ -95,13 +168,12 @@ class Sphericalpolygon(object):
         Note: The spherical polygon has a latitude range of [-90°,90°] and a longitude range of [-180°,180°] or [0°,360°].
         '''
         vertices = np.loadtxt(filename,skiprows=skiprows) 
-        if (vertices[0] != vertices[-1]).all():
-            vertices = np.append(vertices,[vertices[0]],axis=0) # create a closed spherical polygon
+        if cache is not None: return cache.get(vertices)
 
-        return Sphericalpolygon(vertices)
+        return Sphericalpolygon(close_ring(vertices))
 
 
-    def contains_points(self,points):
+    def contains_points(self,points,method='index',chunk_elements=2**22):
         '''
         Determine if a single point or multiple points are inside the given spherical polygon.
 
@@ -112,20 +184,265 @@ class Sphericalpolygon(object):
         Inputs:
         points -> [float array with 2 elements or float 2d array] single point or multiple points to be determined in form of [lat,lon] or [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
 
+        Parameters:
+        method -> [optional, str, default = 'index'] Avaliable options are 'index', 'exact' and 'winding'. 
+        If 'index', the crossings of a ray from each point are counted over an index of the sides by longitude, which is built on first use and costs about the number of crossings per point;
+        if 'exact', the points are classified by classify_points, and those on the boundary are taken as inside;
+        if 'winding', the opposite angles of all sides are summed for each point, which costs the number of vertices per point.
+        chunk_elements -> [int, optional, default = 2**22] upper bound of the number of point-side pairs evaluated at a time, which bounds the memory usage.
+
         Outputs:
         flags -> [bool or bool array] If True, the point is inside the polygon, otherwise, it is outside.
         '''
-        vertices = self.vertices
-        orientation = self.orientation
-        if np.ndim(points) == 1:
-            return inside_polygon(points,vertices,orientation)
+        points = np.asarray(points,dtype=float)
+        if method not in ('index','exact','winding'):
+            raise Exception("Method for contains_points can either be 'index', 'exact' or 'winding'.")
+        if method == 'exact':
+            flags = self.classify_points(np.atleast_2d(points),chunk_elements) >= 0
+            return bool(flags[0]) if points.ndim == 1 else flags
+
+        # Points outside of the bounding box or the bounding cap are rejected at once; only the others are tested exactly.
+        candidates = np.atleast_2d(points)
+        flags = self._within_bounds(candidates)
+        candidates = candidates[flags]
+        if method == 'index':
+            flags[flags] = inside_polygon_indexed(candidates,self._meridian_index(),self.orientation,chunk_elements)
         else:
-            flags = []
-            for point in points:
-                flag = inside_polygon(point,vertices,orientation)
-                flags.append(flag)
-            np.array(flags)
-            return flags   	
+            flags[flags] = inside_polygon_batch(candidates,self.xyz,self.orientation,chunk_elements)
+        if points.ndim == 1: return bool(flags[0])
+        return flags
+
+    def _meridian_index(self):
+        if 'meridian_index' not in self._cache: self._cache['meridian_index'] = meridian_index(self.vertices)
+        return self._cache['meridian_index']
+
+    def classify_points(self,points,chunk_elements=2**22):
+        '''
+        Classify a single point or multiple points as inside, outside or on the boundary of the given spherical polygon, without any tolerance.
+
+        Usage: 
+        c = polygon.classify_points([30,102])
+        classes = polygon.classify_points([[30,102],[-75,33]])
+
+        Inputs:
+        points -> [float array with 2 elements or float 2d array] single point or multiple points to be classified in form of [lat,lon] or [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+
+        Parameters:
+        chunk_elements -> [int, optional, default = 2**22] upper bound of the number of point-side pairs evaluated at a time, which bounds the memory usage.
+
+        Outputs:
+        classes -> [int or int8 array] 1 if the point is inside the polygon, -1 if it is outside, and 0 if it is on the boundary.
+
+        Note: The crossings of a ray from each point with the sides are decided by the signs of determinants, which are evaluated in double precision 
+        and re-evaluated exactly in integer arithmetic only where the rounding errors may change them. 
+        The classes are thus exact for the points and vertices as given in degrees, and the same on every run.
+        '''
+        points = np.asarray(points,dtype=float)
+        candidates = np.atleast_2d(points)
+        if 'boundary_index' not in self._cache: self._cache['boundary_index'] = boundary_index(self.vertices,self._meridian_index())
+
+        # Points outside of the bounding box or the bounding cap, widened against their rounding errors, are outside.
+        within = self._within_bounds(candidates,1e-9)
+        classes = np.full(len(candidates),-1,dtype=np.int8)
+        classes[within] = classify_points_indexed(candidates[within],self._meridian_index(),self._cache['boundary_index'],self.orientation,chunk_elements)
+        if points.ndim == 1: return int(classes[0])
+        return classes
+
+    def contains_points_packed(self,points,packing='bits',tolerance=1e-5,chunk_size=2**20,out=None,scratch=None):
+        '''
+        Determine if a massive number of points are inside the given spherical polygon in single precision with reusable scratch buffers, and return packed flags.
+
+        Usage: 
+        bits = polygon.contains_points_packed(points)
+        flags = np.unpackbits(bits,count=len(points),bitorder='little').astype(bool)
+        scratch = {}
+        for points in batches: flags = polygon.contains_points_packed(points,'uint8',scratch=scratch)
+
+        Inputs:
+        points -> [float 2d array] Points to be determined in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees, in single or double precision, including numpy.memmap.
+
+        Parameters:
+        packing -> [str, optional, default = 'bits'] Avaliable options are 'bits' and 'uint8'. 
+        If 'bits', the flags are packed 8 per byte with the first point in the lowest bit, as numpy.packbits with bitorder='little'; if 'uint8', each flag takes a byte of 0 or 1.
+        tolerance -> [float, optional, default = 1e-5] width in radians of the band along the boundary where the points are re-evaluated in double precision; 
+        1e-5 is about 64 m over the Earth. It should not be less than 1e-6.
+        chunk_size -> [int, optional, default = 2**20] number of points processed at a time
+        out -> [uint8 array, optional, default = None] output array of ceil(n/8) or n elements to be filled
+        scratch -> [dict, optional, default = None] scratch buffers, which are kept and reused across calls if a dict is given
+
+        Outputs:
+        flags -> [uint8 array] packed flags. If 1, the point is inside the polygon, otherwise, it is outside.
+
+        Note: The flag of any point farther than tolerance from the boundary equals that of contains_points, as the rounding errors in single precision are below 1e-6 radians;
+        the points within tolerance of the great circle of a side crossed by their rays are re-evaluated in double precision from their original coordinates.
+        '''
+        if tolerance < 1e-6:
+            raise Exception('The tolerance band should not be narrower than 1e-6 radians.')
+        if 'lean_index' not in self._cache: self._cache['lean_index'] = lean_index(self.vertices)
+        return inside_polygon_lean(points,self._meridian_index(),self._cache['lean_index'],self.orientation,self.bounding_box(),tolerance,chunk_size,packing,out,scratch)
+
+    def _within_bounds(self,points,margin=0):
+        lat_min,lat_max,lon_west,lon_east = self.bounding_box()
+        flags = (points[:,0] >= lat_min - margin) & (points[:,0] <= lat_max + margin)
+        if lon_east - lon_west != 360: flags &= (points[:,1] - lon_west + margin) % 360 <= (lon_east - lon_west) % 360 + 2*margin
+
+        center,radius = self._bounding_cap()
+        if radius < np.pi and flags.any():
+            # The chord length to the center keeps full precision for small caps.
+            xyz = latlon2xyz(points[flags,0],points[flags,1])
+            flags[flags] = np.linalg.norm(xyz - center,axis=1) <= 2*np.sin(radius/2)*(1 + 1e-9) + 1e-12
+        return flags
+
+    def _bounding_cap(self):
+        if 'cap' not in self._cache: self._cache['cap'] = minimal_cap(self.xyz[:-1])
+        return self._cache['cap']
+
+    def bounding_cap(self):
+        '''
+        Find the smallest spherical cap containing the spherical polygon, which is computed on first use and cached.
+
+        Usage:
+        lat,lon,radius = polygon.bounding_cap()
+
+        Outputs:
+        lat,lon,radius -> [float] center and angular radius of the cap in degrees, with lon within [-180°,180°) as in bounding_box. 
+        If the vertices do not lie in a hemisphere, the cap is the whole sphere with a radius of 180°.
+        '''
+        center,radius = self._bounding_cap()
+        lat,lon,r = xyz2latlon(center)
+        return float(lat),float((lon + 180) % 360 - 180),float(np.degrees(radius))
+
+    def bounding_box(self):
+        '''
+        Find the latitude and longitude range of the spherical polygon, accounting for sides that bulge poleward beyond their vertices, the antimeridian and the poles. 
+        It is computed on first use and cached.
+
+        Usage:
+        lat_min,lat_max,lon_west,lon_east = polygon.bounding_box()
+
+        Outputs:
+        lat_min,lat_max -> [float] latitude range in degrees
+        lon_west,lon_east -> [float] longitude range in degrees from west to east within [-180°,180°]; if the box crosses the antimeridian, lon_west is greater than lon_east.
+        If the polygon contains a pole, the longitude range is [-180°,180°].
+        '''
+        if 'box' not in self._cache:
+            lats_low,lats_high = arc_lat_ranges(self.xyz[:-1],self.xyz[1:])
+            lat_min,lat_max = lats_low.min(),lats_high.max()
+
+            # The longitudes along the boundary are unwrapped, so that the boundary covers their range unless it goes around a pole.
+            dlon = (np.diff(self.lons) + 180) % 360 - 180
+            lons = self.lons[0] + np.concatenate([[0],np.cumsum(dlon)])
+            lon_west,lon_east = lons.min(),lons.max()
+
+            # A polygon containing a pole covers all longitudes, even if its boundary does not go around the pole.
+            north,south = inside_polygon_batch(np.array([[90.0,0],[-90.0,0]]),self.xyz,self.orientation)
+            if north: lat_max = 90
+            if south: lat_min = -90
+            if north or south or lon_east - lon_west >= 360 - 1e-9:
+                lon_west,lon_east = -180,180
+            else:
+                lon_west = (lon_west + 180) % 360 - 180
+                lon_east = lon_west + (lon_east - lons.min())
+                if lon_east > 180: lon_east -= 360
+            self._cache['box'] = (float(lat_min),float(lat_max),float(lon_west),float(lon_east))
+        return self._cache['box']
+
+    def _boolean(self,other,operation):
+        # Polygons whose bounding caps are apart do not intersect.
+        if not self.caps_overlap(other):
+            if operation == 'intersection': return []
+            if operation == 'difference': return [Sphericalpolygon(self.vertices)]
+        return [Sphericalpolygon(vertices) for vertices in boolean_rings(self,other,operation)]
+
+    def intersection(self,other):
+        '''
+        Clip the spherical polygon with another one along their great-circle sides, keeping the region covered by both.
+
+        Usage:
+        pieces = polygon.intersection(other)
+        area = sum(piece.area() for piece in pieces)
+
+        Inputs:
+        other -> an instance of class Sphericalpolygon
+
+        Outputs:
+        pieces -> [list] boundaries of the result as instances of class Sphericalpolygon, which may be empty. 
+        Each boundary is arranged with the result on its left, so an outer boundary is counterclockwise and the boundary of a hole is clockwise.
+        The area, centroid and inertia of the result follow from those of the outer boundaries minus those of the holes.
+        '''
+        return self._boolean(other,'intersection')
+
+    def union(self,other):
+        '''
+        Merge the spherical polygon with another one along their great-circle sides, keeping the region covered by either.
+
+        Usage:
+        pieces = polygon.union(other)
+
+        Inputs:
+        other -> an instance of class Sphericalpolygon
+
+        Outputs:
+        pieces -> [list] boundaries of the result as instances of class Sphericalpolygon; see intersection. 
+        Disjoint polygons are returned as they are.
+        '''
+        return self._boolean(other,'union')
+
+    def difference(self,other):
+        '''
+        Remove the region covered by another spherical polygon from this one along their great-circle sides.
+
+        Usage:
+        pieces = polygon.difference(other)
+
+        Inputs:
+        other -> an instance of class Sphericalpolygon
+
+        Outputs:
+        pieces -> [list] boundaries of the result as instances of class Sphericalpolygon; see intersection. 
+        A polygon lying inside this one leaves a hole with a clockwise boundary.
+        '''
+        return self._boolean(other,'difference')
+
+    def caps_overlap(self,other):
+        '''
+        Coarsely test whether the bounding caps of two spherical polygons overlap. If not, the polygons are disjoint; if so, they may or may not intersect.
+
+        Usage:
+        flag = polygon.caps_overlap(other)
+
+        Inputs:
+        other -> an instance of class Sphericalpolygon
+
+        Outputs:
+        flag -> [bool] If False, the two polygons do not overlap.
+        '''
+        center,radius = self._bounding_cap()
+        other_center,other_radius = other._bounding_cap()
+        return bool(angles_between(center,other_center) <= (radius + other_radius)*(1 + 1e-9) + 1e-12)
+
+    def contains_points_stream(self,source,chunk_size=2**20,buffered=True,method='index',**kwargs):
+        '''
+        Determine chunk by chunk if points from a large file, a memory-mapped array or an iterator are inside the given spherical polygon, with constant memory.
+
+        Usage: 
+        for flags in polygon.contains_points_stream('catalog.npy'): ...
+        for flags in polygon.contains_points_stream('catalog.csv',skiprows=1,delimiter=','): ...
+
+        Inputs:
+        source -> [str, float 2d array or iterable] a .npy file, which is memory-mapped; a text file listing lat and lon of a point per line; 
+        a float 2d array, including numpy.memmap; or an iterable of float 2d arrays of points in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+
+        Parameters:
+        chunk_size -> [int, optional, default = 2**20] number of points per chunk for files and arrays
+        buffered -> [bool, optional, default = True] If True, the next chunk is read in a background thread while the current one is classified.
+        method -> [optional, str, default = 'index'] method of contains_points
+        kwargs -> keyword arguments skiprows, delimiter and usecols for text files
+
+        Outputs:
+        flags -> [generator] bool arrays for each chunk in order. If True, the point is inside the polygon, otherwise, it is outside.
+        '''
+        return stream_map(lambda points: self.contains_points(points,method),source,chunk_size,buffered,**kwargs)
 
     def area(self, R = 1,rho = 1):
         '''
@@ -135,15 +452,20 @@ class Sphericalpolygon(object):
         area = polygon.area()
         area = polygon.area(6378.137)
         mass = polygon.area(6378.137,81)
+        mass = polygon.area(6378.137,lambda lat,lon: 81 + 2*np.cos(np.radians(lat)))
 
         Parameters:
         R -> [optional, float, default = 1] sphere radius
-        rho -> [optional, float, default = 1] area density of the spherical polygon
+        rho -> [optional, float, function or float 2d array, default = 1] area density of the spherical polygon; 
+        a variable density, given as a function of lat and lon in degrees or on a latitude-longitude grid, is integrated as in mass_properties.
         
         Outputs:
         area -> [float] Area of the spherical polygon. It is independent of how the vertices are arranged.
         ''' 
-        return polygon_area(self.vertices)*R**2*rho
+        if _variable(rho): return self.mass_properties(rho,R)['mass']
+        area = np.abs(self.excess)
+        if area > 2*np.pi: area = 4*np.pi - area
+        return area*R**2*rho
 
     def perimeter(self, R = 1):
         '''
@@ -159,7 +481,8 @@ class Sphericalpolygon(object):
         Outputs:
         perimeter -> [float] Perimeter of the spherical polygon. It is independent of how the vertices are arranged.
         ''' 
-        return polygon_perimeter(self.vertices)*R   
+        if 'perimeter' not in self._cache: self._cache['perimeter'] = side_lengths(self.xyz).sum()
+        return self._cache['perimeter']*R   
 
     def compactness(self):
         '''
@@ -175,41 +498,349 @@ class Sphericalpolygon(object):
         perimeter = self.perimeter()
         return area/perimeter**2*(4*np.pi-area)
         
-    def centroid(self, R = 1):
+    def centroid(self, R = 1, method = 'analytic', workers = 1, quantity = True, tol = None, order = None, error = False, rho = None):
         '''
         Identify the location of the centroid of a spherical polygon over a sphere with a radius of R. 
     
         Usage: 
         peri = polygon.centroid()
         peri = polygon.centroid(6378.137)
+        lat,lon,depth,err = polygon.centroid(method='adaptive',tol=1e-4,error=True)
 
         Parameters:
         R -> [optional, float, default = 1] sphere radius
+        method -> [optional, str, default = 'analytic'] 'analytic' for the closed-form side integrals, 'gauss' for a fixed-order Gauss-Legendre rule, 
+        'adaptive' for Gauss-Legendre rules refined until tol is met, or 'dblquad' for the legacy numerical integration
+        workers -> [optional, int, default = 1] number of processes for the 'dblquad' method; the other methods are vectorized over the sides and ignore it.
+        quantity -> [optional, bool, default = True] If True, lat and lon are returned as astropy Quantities in degrees; if False, as plain floats, which avoids importing astropy.
+        tol -> [optional, float, default = None] error tolerance relative to the area for 'adaptive', or the tolerance of scipy for 'dblquad'
+        order -> [optional, int, default = None] number of Gauss-Legendre nodes per dimension for 'gauss', 16 if None; or the starting number for 'adaptive', 4 if None
+        error -> [optional, bool, default = False] If True, the estimated error is returned as well.
+        rho -> [optional, function or float 2d array, default = None] If given, the center of mass for a variable area density, integrated as in mass_properties;
+        'gauss' fixes the order, 'adaptive' refines it until tol is met, 1e-10 if None, and 'analytic' passes order and tol on as they are. 'dblquad' and workers raise ValueError.
         
         Outputs:
         lat,lon,depth -> [float array with 3 elements] coordinate of the centroid. 
         Lat and lon are both in degrees; depth should be always positive, which implies the centroid is beneath the 'ground'.
+        err -> [float] estimated distance from the computed centroid to the exact one over a sphere with a radius of R
         ''' 
-        lat,lon,depth = polygon_centroid(self.vertices)
+        if _variable(rho):
+            properties = self.mass_properties(rho,1,*_density_rule(method,workers,order,tol),error=True)
+            lat,lon,depth = properties['centroid']
+            err = properties['centroid_error']
+        elif method == 'analytic':
+            area,first,second = self._moments()
+            lat,lon,r = xyz2latlon(first/area)
+            depth = 1 - r
+            err = np.finfo(float).eps*len(self.vertices)
+        else:
+            (lat,lon,depth),err = polygon_centroid(self.vertices,method,workers,tol=tol,order=order,error=True)
+        if not quantity: 
+            if error: return lat,lon,depth*R,err*R
+            return lat,lon,depth*R
+
+        from astropy import units as u
+        if error: return lat*u.deg,lon*u.deg,depth*R,err*R
         return lat*u.deg,lon*u.deg,depth*R   
 
-    def inertia(self, R = 1, rho = 1):
+    def inertia(self, R = 1, rho = 1, method = 'analytic', workers = 1, tol = None, order = None, error = False):
         '''
         Calculate the geometrical or physical(if the area density is given) moment of inertia tensor of a specific spherical polygon over a sphere with a radius of R.
 
         Usage:
         inertia = polygon.inertia()
         inertia = polygon.inertia(6378.137,81)
+        inertia,err = polygon.inertia(method='gauss',order=8,error=True)
+        inertia = polygon.inertia(6378.137,grid,tol=1e-6)
 
         Parameters:
         R -> [optional, float, default = 1] sphere radius
-        rho -> [optional, float, default = 1] area density of the spherical polygon
+        rho -> [optional, float, function or float 2d array, default = 1] area density of the spherical polygon;
+        a variable density, given as a function of lat and lon in degrees or on a latitude-longitude grid, is integrated as in mass_properties,
+        where 'gauss' fixes the order, 'adaptive' refines it until tol is met, 1e-10 if None, and 'analytic' passes order and tol on as they are; 'dblquad' and workers raise ValueError.
+        method -> [optional, str, default = 'analytic'] 'analytic' for the closed-form side integrals, 'gauss' for a fixed-order Gauss-Legendre rule, 
+        'adaptive' for Gauss-Legendre rules refined until tol is met, or 'dblquad' for the legacy numerical integration
+        workers -> [optional, int, default = 1] number of processes for the 'dblquad' method; the other methods are vectorized over the sides and ignore it.
+        tol -> [optional, float, default = None] error tolerance relative to the area for 'adaptive', or the tolerance of scipy for 'dblquad'
+        order -> [optional, int, default = None] number of Gauss-Legendre nodes per dimension for 'gauss', 16 if None; or the starting number for 'adaptive', 4 if None
+        error -> [optional, bool, default = False] If True, the estimated errors are returned as well.
 
         Outputs:
         inertia -> [float array with 6 elements] symmetrical inertia tensor with six independent components.
         The first three components are located diagonally, corresponding to M_{11}, M_{22}, and M_{33}; the last three components correspond to M_{12}, M_{13}, and M_{23}.
+        err -> [float array with 6 elements] estimated absolute errors of the components
+        '''
+        if _variable(rho):
+            properties = self.mass_properties(rho,R,*_density_rule(method,workers,order,tol),error=True)
+            if error: return properties['inertia'],properties['inertia_error']
+            return properties['inertia']
+        if method == 'analytic':
+            area,first,second = self._moments()
+            inertia = -second
+            inertia[:3] += area
+            err = np.full(6,np.finfo(float).eps*len(self.vertices)*np.abs(inertia).max())
+        else:
+            inertia,err = polygon_inertia(self.vertices,method,workers,tol=tol,order=order,error=True)
+        if error: return inertia*R**4*rho,err*R**4*rho
+        return inertia*R**4*rho
+
+    def mass_properties(self, rho, R = 1, order = None, tol = None, error = False):
         '''
-        return polygon_inertia(self.vertices)*R**4*rho 	
+        Calculate the mass, center of mass and inertia tensor of the spherical polygon with a variable area density over a sphere with a radius of R,
+        integrated together by Gauss-Legendre rules over the regions between the sides and the North Pole, vectorized over all sides.
 
+        Usage:
+        properties = polygon.mass_properties(lambda lat,lon: 3.3 - 0.3*np.sin(np.radians(lat))**2,6378.137)
+        properties = polygon.mass_properties(grid,tol=1e-6,error=True)
 
-            
+        Inputs:
+        rho -> [float, function, or float 2d array] area density as a scalar; a vectorized function of arrays of lat and lon in degrees, with lon in [-180,180); 
+        or the densities of the cells of a global latitude-longitude grid laid out as in rasterize_latlon with lon_start = -180, which are interpolated bilinearly. 
+        Grids with other layouts can be given by density_field.
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+        order -> [optional, int, default = None] number of Gauss-Legendre nodes in longitude and latitude; 16 if None, or the starting number if tol is given, 4 if None.
+        tol -> [optional, float, default = None] If given, the order is refined until the estimated errors are within tol relative to the mass.
+        error -> [optional, bool, default = False] If True, the estimated errors are included as well.
+
+        Outputs:
+        properties -> [dict] 'mass'; 'centroid', the center of mass as lat and lon in degrees and depth; 'inertia', the inertia tensor with six independent components.
+        With error, 'mass_error', 'centroid_error', the estimated distance from the computed center of mass to the exact one, and 'inertia_error'.
+
+        Note: The density should be smooth over the polygon for the rules to converge quickly; the order for a grid should resolve its cells.
+        There is no closed form for a variable density, so centroid and inertia with rho only accept the methods 'analytic', 'gauss' and 'adaptive', which all use these rules.
+        '''
+        mass,first,second,errors = density_moments(self.vertices,rho,order,tol)
+        lat,lon,r = xyz2latlon(first/mass)
+        inertia = -second
+        inertia[:3] += mass
+
+        properties = {'mass':mass*R**2,'centroid':np.array([lat,lon,(1 - r)*R]),'inertia':inertia*R**4}
+        if error:
+            properties['mass_error'] = errors[0]*R**2
+            properties['centroid_error'] = (np.linalg.norm(errors[1:4]) + errors[0])/np.abs(mass)*R
+            properties['inertia_error'] = (errors[4:] + np.where(np.arange(6) < 3,errors[0],0))*R**4
+        return properties
+
+    def _moments(self):
+        if 'moments' not in self._cache: self.precompute()
+        return self._cache['moments']
+
+    def precompute(self):
+        '''
+        Compute the perimeter, centroid and inertia tensor over a unit sphere in one pass over the sides and cache them; the area follows from the signed excess.
+
+        Usage:
+        polygon = Sphericalpolygon.from_file(filename,skiprows=1).precompute()
+
+        Outputs:
+        polygon -> the instance itself
+        '''
+        first,second = edge_moments(self.xyz)
+
+        # The first moment of each side is half of its arc length times the unit normal, so the perimeter comes for free.
+        self._cache['perimeter'] = 2*np.linalg.norm(first,axis=1).sum()
+        self._cache['moments'] = region_moments(first.sum(axis=0),second.sum(axis=0),self.excess)
+        return self 	
+
+    def rotate(self,rotation):
+        '''
+        Rotate the spherical polygon rigidly. The signed area and the perimeter are carried over, and the cached centroid and inertia tensor are rotated instead of recomputed.
+
+        Usage:
+        rotated = polygon.rotate([pole_lat,pole_lon,angle])
+        rotated = polygon.rotate(Rotation.from_rotvec([0,0,0.1]))
+
+        Inputs:
+        rotation -> [scipy.spatial.transform.Rotation, or float array] a single rotation as accepted by rotation_matrices, 
+        namely a scipy Rotation, a rotation matrix, or an Euler pole with a rotation angle in form of [pole_lat,pole_lon,angle] with unit of degrees.
+
+        Outputs:
+        rotated -> instance of class Sphericalpolygon
+        '''
+        matrices,single = rotation_matrices(rotation)
+        if not single:
+            raise Exception('A single rotation is expected; use centroid_series, inertia_series or contains_points_rotated for a stack of rotations.')
+        lats,lons,r = xyz2latlon(self.xyz @ matrices[0].T)
+        polygon = Sphericalpolygon(np.column_stack([lats,lons]))
+
+        # The branch of the excess depends on whether the South Pole is inside the rotated polygon, while the area is carried over,
+        # so that it agrees with the carried moments instead of being recomputed from the rotated vertices.
+        area = self.area()
+        polygon.excess = np.sign(polygon.excess)*(area if np.abs(polygon.excess) <= 2*np.pi else 4*np.pi - area)
+
+        if 'perimeter' in self._cache: polygon._cache['perimeter'] = self._cache['perimeter']
+        if 'moments' in self._cache:
+            area,first,second = self._cache['moments']
+            polygon._cache['moments'] = (area,matrices[0] @ first,rotate_tensors(second,matrices)[0])
+        return polygon
+
+    def centroid_series(self,rotations,R = 1,quantity = True):
+        '''
+        Identify the locations of the centroid of the spherical polygon under a stack of rotations, such as those of a plate reconstruction over time, by rotating the cached first moment.
+
+        Usage:
+        lats,lons,depths = polygon.centroid_series(Rotation.from_rotvec(rotvecs))
+        lats,lons,depths = polygon.centroid_series([[pole_lat_0,pole_lon_0,angle_0],..,[pole_lat_t,pole_lon_t,angle_t]])
+
+        Inputs:
+        rotations -> [scipy.spatial.transform.Rotation, or float array] rotations as accepted by rotation_matrices
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+        quantity -> [optional, bool, default = True] If True, lats and lons are returned as astropy Quantities in degrees; if False, as plain float arrays.
+
+        Outputs:
+        lats,lons,depths -> [float arrays] coordinates of the centroid for each rotation, as given by centroid.
+        '''
+        matrices,single = rotation_matrices(rotations)
+        area,first,second = self._moments()
+        lats,lons,r = xyz2latlon(matrices @ first/area)
+        depths = (1 - r)*R
+        if not quantity: return lats,lons,depths
+
+        from astropy import units as u
+        return lats*u.deg,lons*u.deg,depths
+
+    def inertia_series(self,rotations,R = 1,rho = 1):
+        '''
+        Calculate the inertia tensors of the spherical polygon under a stack of rotations by rotating the cached tensor as I' = R I R^T.
+
+        Usage:
+        inertias = polygon.inertia_series(Rotation.from_rotvec(rotvecs))
+        inertias = polygon.inertia_series([[pole_lat_0,pole_lon_0,angle_0],..,[pole_lat_t,pole_lon_t,angle_t]],6378.137,81)
+
+        Inputs:
+        rotations -> [scipy.spatial.transform.Rotation, or float array] rotations as accepted by rotation_matrices
+
+        Parameters:
+        R -> [optional, float, default = 1] sphere radius
+        rho -> [optional, float, default = 1] area density of the spherical polygon
+
+        Outputs:
+        inertias -> [float 2d array] inertia tensors for each rotation, each with six components M_{11}, M_{22}, M_{33}, M_{12}, M_{13}, and M_{23}.
+        '''
+        matrices,single = rotation_matrices(rotations)
+        return rotate_tensors(self.inertia(),matrices)*R**4*rho
+
+    def contains_points_rotated(self,points,rotations,method = 'index',chunk_elements = 2**22):
+        '''
+        Determine if points are inside the spherical polygon under a single rotation or a stack of rotations. 
+        The points are rotated back instead, so that the polygon, its bounds and its index of the sides are not rebuilt.
+
+        Usage:
+        flags = polygon.contains_points_rotated([[30,102],[-75,33]],[pole_lat,pole_lon,angle])
+        flags = polygon.contains_points_rotated([[30,102],[-75,33]],Rotation.from_rotvec(rotvecs))
+
+        Inputs:
+        points -> [float array with 2 elements or float 2d array] single point or multiple points to be determined in form of [lat,lon] or [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+        rotations -> [scipy.spatial.transform.Rotation, or float array] rotations as accepted by rotation_matrices
+
+        Parameters:
+        method -> [optional, str, default = 'index'] method of contains_points
+        chunk_elements -> [int, optional, default = 2**22] upper bound of the number of point-side pairs evaluated at a time, which bounds the memory usage.
+
+        Outputs:
+        flags -> [bool, bool array or bool 2d array] If True, the point is inside the rotated polygon, otherwise, it is outside. 
+        For a stack of rotations, the flags have one row per rotation.
+        '''
+        points = np.asarray(points,dtype=float)
+        matrices,single = rotation_matrices(rotations)
+        xyz = latlon2xyz(np.atleast_2d(points)[:,0],np.atleast_2d(points)[:,1])
+
+        # The rotation R maps the polygon onto the rotated one, so a point p is inside the latter if R^T p is inside the former.
+        lats,lons,r = xyz2latlon(xyz @ matrices)
+        flags = self.contains_points(np.stack([lats,lons],axis=-1).reshape(-1,2),method,chunk_elements).reshape(len(matrices),-1)
+        if single: flags = flags[0]
+        if points.ndim == 1: return flags[...,0] if not single else bool(flags[0])
+        return flags
+
+    def _changes(self,polygon):
+        # Changes of the number of vertices, area and inertia tensor over a unit sphere from this polygon to another one
+        return {'vertices':len(polygon.vertices) - len(self.vertices),'area':polygon.area() - self.area(),'inertia':polygon.inertia() - self.inertia()}
+
+    def simplify(self,tolerance,report=False):
+        '''
+        Simplify the spherical polygon by the Douglas-Peucker algorithm on the sphere, removing the vertices within a great-circle distance of tolerance from the simplified boundary.
+        Removed vertices are restored where needed to keep the sides of the simplified polygon from crossing each other.
+
+        Usage:
+        simplified = polygon.simplify(0.1)
+        simplified,changes = polygon.simplify(0.1,report=True)
+
+        Inputs:
+        tolerance -> [float] maximal great-circle distance in degrees from a removed vertex to the simplified boundary
+
+        Parameters:
+        report -> [optional, bool, default = False] If True, the changes caused by the simplification are returned as well.
+
+        Outputs:
+        simplified -> an instance of class Sphericalpolygon with a subset of the vertices
+        changes -> [dict] 'vertices', 'area' and 'inertia': changes of the number of vertices, the area and the inertia tensor over a unit sphere;
+        'max_distance': maximal great-circle distance in degrees from the removed vertices to the simplified boundary, not greater than tolerance.
+        '''
+        vertices,max_distance = simplify_vertices(self.vertices,tolerance)
+        simplified = Sphericalpolygon(vertices)
+        if not report: return simplified
+
+        changes = self._changes(simplified)
+        changes['max_distance'] = max_distance
+        return simplified,changes
+
+    def densify(self,max_edge,report=False):
+        '''
+        Densify the spherical polygon by inserting vertices evenly along the sides longer than max_edge. The sides are great-circle arcs, so the shape is unchanged.
+
+        Usage:
+        densified = polygon.densify(1)
+        densified,changes = polygon.densify(1,report=True)
+
+        Inputs:
+        max_edge -> [float] maximal side length in degrees
+
+        Parameters:
+        report -> [optional, bool, default = False] If True, the changes caused by the densification, which are only rounding errors, are returned as well.
+
+        Outputs:
+        densified -> an instance of class Sphericalpolygon including all original vertices
+        changes -> [dict] 'vertices', 'area' and 'inertia': changes of the number of vertices, the area and the inertia tensor over a unit sphere
+        '''
+        densified = Sphericalpolygon(densify_vertices(self.vertices,max_edge))
+        if not report: return densified
+        return densified,self._changes(densified)
+
+    def rasterize(self,resolution=1,fraction=False,subsamples=4,lon_start=-180):
+        '''
+        Rasterize the spherical polygon onto a global regular latitude-longitude grid.
+
+        Usage:
+        mask = polygon.rasterize(0.1)
+        coverage = polygon.rasterize(1,fraction=True)
+
+        Parameters:
+        resolution -> [float or 2 floats, optional, default = 1] cell size in degrees, or cell sizes in latitude and longitude; they should divide 180 and 360.
+        fraction -> [bool, optional, default = False] If False, a cell is covered if its center is inside the polygon; if True, the covered fractions of the areas of the cells are computed.
+        subsamples -> [int, optional, default = 4] number of parallels per row of cells to compute the fractions
+        lon_start -> [float, optional, default = -180] western longitude of the first column
+
+        Outputs:
+        cells -> [bool or float 2d array with shape (n_lat,n_lon)] covering flags or fractions of the cells;
+        the cell (i,j) is centered at lat = -90 + (i+0.5)*dlat and lon = lon_start + (j+0.5)*dlon.
+        '''
+        return rasterize_latlon(self,resolution,fraction,subsamples,lon_start)
+
+    def rasterize_healpix(self,nside):
+        '''
+        Rasterize the spherical polygon onto a HEALPix map in RING ordering.
+
+        Usage:
+        mask = polygon.rasterize_healpix(64)
+
+        Inputs:
+        nside -> [int] resolution parameter of the HEALPix map, which has 12*nside**2 pixels
+
+        Outputs:
+        pixels -> [bool array with 12*nside**2 elements] If True, the center of the pixel is inside the polygon.
+        '''
+        return rasterize_healpix(self,nside)
@@ -0,0 +1,248 @@
+import numpy as np
+from . import instrument
+
+def _monotonic_pieces(xyz):
+    '''
+    Split the sides of a closed polygon at their northernmost and southernmost points, so that the latitude changes monotonically along each piece.
+    Each piece is given by the unit vector a of the start of its side, the unit vector u normal to a in the plane of the side, the angles from a to the ends of the piece and the z of the ends.
+    '''
+    a,b = xyz[:-1],xyz[1:]
+    n = np.cross(a,b)
+    norm = np.linalg.norm(n,axis=1)
+    valid = norm > 0
+    a,b,n,norm = a[valid],b[valid],n[valid],norm[valid]
+    n /= norm[:,None]
+    u = np.cross(n,a)
+    length = np.arctan2(norm,np.sum(a*b,axis=1))
+
+    # z along a side is R*cos(theta - phi), which is extreme at theta = phi and phi + π.
+    phi = np.arctan2(u[:,2],a[:,2])
+    extreme = np.mod(np.stack([phi,phi + np.pi],axis=1),2*np.pi)
+    inner = (extreme > 0) & (extreme < length[:,None])
+    split = np.where(inner.any(axis=1),np.max(np.where(inner,extreme,0),axis=1),np.nan)
+
+    has_split = ~np.isnan(split)
+    side = np.concatenate([np.arange(len(a)),np.nonzero(has_split)[0]])
+    start = np.concatenate([np.zeros(len(a)),split[has_split]])
+    end = np.concatenate([np.where(has_split,split,length),length[has_split]])
+
+    # The ends of the pieces at the vertices take the z of the vertices, so that a vertex on a parallel is counted by exactly one of its sides.
+    z_split = a[:,2]*np.cos(split) + u[:,2]*np.sin(split)
+    z_start = np.concatenate([a[:,2],z_split[has_split]])
+    z_end = np.concatenate([np.where(has_split,z_split,b[:,2]),b[has_split,2]])
+    return a[side],u[side],start,end,z_start,z_end
+
+def _row_crossings(xyz,rows_z):
+    '''
+    Crossings of the boundary of a polygon with the parallels at given z, which are sorted in ascending order.
+    A piece crosses a parallel at z0 if z0 is in (z_min,z_max] of the piece, so that a vertex on a parallel is counted consistently.
+
+    Outputs:
+    rows -> [int array] indices of the parallels for each crossing
+    lons -> [float array] longitudes of the crossings in degrees
+    '''
+    a,u,start,end,z_start,z_end = _monotonic_pieces(xyz)
+    low,high = np.minimum(z_start,z_end),np.maximum(z_start,z_end)
+
+    first,last = np.searchsorted(rows_z,low,'right'),np.searchsorted(rows_z,high,'right')
+    counts = last - first
+    piece = np.repeat(np.arange(len(a)),counts)
+    rows = np.repeat(first - np.cumsum(counts) + counts,counts) + np.arange(counts.sum())
+
+    # Solve R*cos(theta - phi) = z0 for the root within the piece.
+    a,u,start,end = a[piece],u[piece],start[piece],end[piece]
+    R = np.hypot(a[:,2],u[:,2])
+    phi = np.arctan2(u[:,2],a[:,2])
+    delta = np.arccos(np.clip(rows_z[rows]/np.where(R > 0,R,1),-1,1))
+    roots = np.mod(phi[:,None] + np.stack([delta,-delta],axis=1),2*np.pi)
+    # Distances of the roots to the piece, allowing for roots just below 0 that wrap around 2π
+    roots = np.where(roots > np.pi + end[:,None],roots - 2*np.pi,roots)
+    distance = np.maximum(start[:,None] - roots,0) + np.maximum(roots - end[:,None],0)
+    theta = np.take_along_axis(roots,np.argmin(distance,axis=1)[:,None],axis=1)[:,0]
+
+    points = a*np.cos(theta)[:,None] + u*np.sin(theta)[:,None]
+    return rows,np.degrees(np.arctan2(points[:,1],points[:,0]))
+
+def scan_rows(polygon,lats,lon_start,dlon,ncols,fraction=False):
+    '''
+    Fill rows of cells along parallels with a spherical polygon by the crossings of its boundary with the parallels.
+
+    Inputs:
+    polygon -> an instance of class Sphericalpolygon
+    lats -> [float array] latitudes of the rows in degrees
+    lon_start -> [float array] western longitudes of the first cells of the rows in degrees
+    dlon -> [float array] widths of the cells of the rows in degrees
+    ncols -> [int array] numbers of cells of the rows
+
+    Parameters:
+    fraction -> [bool, optional, default = False] If False, a cell is covered if its center on the parallel is inside the polygon;
+    if True, the covered fractions of the cells along the parallels are computed exactly.
+
+    Outputs:
+    cells -> [bool or float array] covering flags or fractions of all cells, with the rows concatenated in order
+    '''
+    lats,lon_start,dlon = np.asarray(lats,dtype=float),np.asarray(lon_start,dtype=float),np.asarray(dlon,dtype=float)
+    ncols = np.asarray(ncols,dtype=int)
+    offsets = np.concatenate([[0],np.cumsum(ncols + 1)])
+
+    order = np.argsort(lats,kind='stable')
+    rows,lons = _row_crossings(polygon.xyz,np.sin(np.radians(lats[order])))
+    rows = order[rows]
+
+    # Whether the west end of each row is inside the polygon
+    state = np.asarray(polygon.contains_points(np.column_stack([lats,lon_start])),dtype=bool).reshape(-1)
+    x = np.mod(lons - lon_start[rows],360)
+
+    if not fraction:
+        # Each crossing toggles the cells whose centers lie east of it.
+        columns = np.clip(np.ceil(x/dlon[rows] - 0.5),0,ncols[rows]).astype(int)
+        toggles = np.zeros(offsets[-1],dtype=np.int64)
+        np.add.at(toggles,offsets[rows] + columns,1)
+        toggles[offsets[:-1]] += state
+        parity = _row_cumsum(toggles,offsets) % 2 == 1
+        return np.delete(parity,offsets[1:] - 1)
+
+    # The covered length up to x is state*x + Σ delta_k*(x - x_k) over the crossings x_k <= x, where delta_k is +1 at an entry and -1 at an exit.
+    order = np.lexsort((x,rows))
+    rows,x = rows[order],x[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows,rows,'left')
+    inside_before = state[rows] ^ (rank % 2 == 1)
+    delta = np.where(inside_before,-1.0,1.0)
+
+    edges = np.clip(np.ceil(x/dlon[rows]),0,ncols[rows]).astype(int)
+    slope,intercept = np.zeros(offsets[-1]),np.zeros(offsets[-1])
+    np.add.at(slope,offsets[rows] + edges,delta)
+    np.add.at(intercept,offsets[rows] + edges,delta*x)
+    slope[offsets[:-1]] += state
+    slope,intercept = _row_cumsum(slope,offsets),_row_cumsum(intercept,offsets)
+
+    row_of = np.repeat(np.arange(len(ncols)),ncols + 1)
+    positions = (np.arange(offsets[-1]) - offsets[row_of])*dlon[row_of]
+    covered = slope*positions - intercept
+    coverage = (covered[1:] - covered[:-1])/dlon[row_of[:-1]]
+    return np.clip(np.delete(coverage,offsets[1:-1] - 1),0,1)
+
+def _row_cumsum(values,offsets):
+    # Cumulative sums restarting at each row
+    sums = np.cumsum(values)
+    starts = np.concatenate([[0],sums[offsets[1:-1] - 1]])
+    return sums - np.repeat(starts,np.diff(offsets))
+
+def _latlon_rows(polygon,dlat,dlon,n_lat,n_lon,fraction,subsamples,lon_start):
+    # Covering flags or fractions of the rows of a latitude-longitude grid that overlap the latitude range of a polygon, and the index of the first row
+    lat_min,lat_max,lon_west,lon_east = polygon.bounding_box()
+    i0 = max(0,int(np.floor((lat_min + 90)/dlat)))
+    i1 = min(n_lat,int(np.ceil((lat_max + 90)/dlat)))
+    if i1 <= i0: return i0,np.zeros((0,n_lon),dtype=float if fraction else bool)
+
+    # Parallels at the middles of k equal bands of each row, weighted by the areas of the bands
+    k = subsamples if fraction else 1
+    bands = -90 + i0*dlat + np.arange((i1 - i0)*k + 1)*dlat/k
+    lats = (bands[:-1] + bands[1:])/2
+    rows = len(lats)
+    values = scan_rows(polygon,lats,np.full(rows,float(lon_start)),np.full(rows,dlon),np.full(rows,n_lon),fraction).reshape(rows,n_lon)
+
+    if fraction:
+        weights = np.diff(np.sin(np.radians(bands))).reshape(-1,k)
+        values = np.einsum('ikj,ik->ij',values.reshape(-1,k,n_lon),weights/weights.sum(axis=1,keepdims=True))
+        values = np.minimum(values,1)
+    return i0,values
+
+def _healpix_rows(polygon,rings,offsets):
+    # Flags of the pixels of the rings that overlap the latitude range of a polygon, and the index of the first pixel
+    lat_min,lat_max,lon_west,lon_east = polygon.bounding_box()
+    selected = np.nonzero((rings[0] >= lat_min) & (rings[0] <= lat_max))[0]
+    if len(selected) == 0: return 0,np.zeros(0,dtype=bool)
+    r0,r1 = selected[0],selected[-1] + 1
+    return offsets[r0],scan_rows(polygon,*[ring[r0:r1] for ring in rings])
+
+def _label(blocks,shape):
+    # Index of the first polygon covering each cell, or -1 if none
+    labels = np.full(shape,-1,dtype=int)
+    for k,(start,mask) in enumerate(blocks):
+        block = labels[start:start + len(mask)]
+        block[mask & (block < 0)] = k
+    return labels
+
+@instrument.timed('rasterize_latlon')
+def rasterize_latlon(polygons,resolution=1,fraction=False,subsamples=4,lon_start=-180):
+    '''
+    Rasterize one or many spherical polygons onto a global regular latitude-longitude grid.
+    Each row of cells is filled between the crossings of the boundary with its parallel, so the cost is about the number of cells plus the number of sides.
+
+    Usage:
+    mask = rasterize_latlon(polygon,0.1)
+    coverage = rasterize_latlon(polygon,1,fraction=True)
+    labels = rasterize_latlon(collection,0.5)
+
+    Inputs:
+    polygons -> an instance of class Sphericalpolygon, or a sequence of them such as an instance of class PolygonCollection
+
+    Parameters:
+    resolution -> [float or 2 floats, optional, default = 1] cell size in degrees, or cell sizes in latitude and longitude; they should divide 180 and 360.
+    fraction -> [bool, optional, default = False] If False, a cell is covered if its center is inside the polygon; if True, the covered fractions of the areas of the cells are computed.
+    subsamples -> [int, optional, default = 4] number of parallels per row of cells to compute the fractions; along each parallel the covered length is exact.
+    lon_start -> [float, optional, default = -180] western longitude of the first column
+
+    Outputs:
+    cells -> [2d array with shape (n_lat,n_lon)] for one polygon, the covering flags or fractions;
+    for many polygons, the index of the first polygon covering each cell or -1 if none, or with fraction the fractions stacked in shape (n_polygons,n_lat,n_lon).
+    The cell (i,j) is centered at lat = -90 + (i+0.5)*dlat and lon = lon_start + (j+0.5)*dlon.
+    '''
+    dlat,dlon = np.broadcast_to(np.asarray(resolution,dtype=float),(2,))
+    n_lat,n_lon = int(round(180/dlat)),int(round(360/dlon))
+    args = (dlat,dlon,n_lat,n_lon,fraction,subsamples,lon_start)
+
+    single = hasattr(polygons,'orientation')
+    if single: polygons = [polygons]
+    blocks = (_latlon_rows(polygons[k],*args) for k in range(len(polygons)))
+    if not single and not fraction: return _label(blocks,(n_lat,n_lon))
+
+    cells = np.zeros((len(polygons),n_lat,n_lon),dtype=float if fraction else bool)
+    for k,(start,values) in enumerate(blocks):
+        cells[k,start:start + len(values)] = values
+    return cells[0] if single else cells
+
+def healpix_rings(nside):
+    '''
+    Latitudes, western longitudes, widths and numbers of pixels of the iso-latitude rings of a HEALPix map in RING ordering, from north to south.
+    '''
+    i = np.arange(1,4*nside)
+    polar = np.minimum(i,4*nside - i)
+    north = i < nside
+    south = i > 3*nside
+    z = np.where(north,1 - polar**2/(3*nside**2),np.where(south,-(1 - polar**2/(3*nside**2)),4/3 - 2*i/(3*nside)))
+    ncols = np.where(north | south,4*polar,4*nside)
+    dlon = 360/ncols
+
+    # The j-th pixel center of a ring is at (j - s/2)*dlon for j = 1,2,..., where s = 1 except on every other ring of the equatorial belt.
+    s = np.where(north | south,1,(i - nside + 1) % 2)
+    lon_start = (1 - s/2)*dlon - dlon/2
+    return np.degrees(np.arcsin(z)),lon_start,dlon,ncols
+
+@instrument.timed('rasterize_healpix')
+def rasterize_healpix(polygons,nside):
+    '''
+    Rasterize one or many spherical polygons onto a HEALPix map in RING ordering, which is filled ring by ring as the latitude-longitude grid.
+
+    Usage:
+    mask = rasterize_healpix(polygon,64)
+    labels = rasterize_healpix(collection,64)
+
+    Inputs:
+    polygons -> an instance of class Sphericalpolygon, or a sequence of them such as an instance of class PolygonCollection
+    nside -> [int] resolution parameter of the HEALPix map, which has 12*nside**2 pixels
+
+    Outputs:
+    pixels -> [array with 12*nside**2 elements] for one polygon, True if the center of the pixel is inside the polygon;
+    for many polygons, the index of the first polygon containing the center of each pixel or -1 if none.
+    '''
+    rings = healpix_rings(nside)
+    offsets = np.concatenate([[0],np.cumsum(rings[3])])
+    if not hasattr(polygons,'orientation'):
+        return _label((_healpix_rows(polygons[k],rings,offsets) for k in range(len(polygons))),12*nside**2)
+
+    pixels = np.zeros(12*nside**2,dtype=bool)
+    start,mask = _healpix_rows(polygons,rings,offsets)
+    pixels[start:start + len(mask)] = mask
+    return pixels
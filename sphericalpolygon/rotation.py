@@ -0,0 +1,64 @@
+import numpy as np
+from .functions import latlon2xyz
+
+def rotation_matrices(rotations):
+    '''
+    Convert a single rotation or a stack of rotations into rotation matrices.
+
+    Usage:
+    matrices,single = rotation_matrices(Rotation.from_euler('z',[10,20,30],degrees=True))
+    matrices,single = rotation_matrices([[pole_lat_0,pole_lon_0,angle_0],..,[pole_lat_t,pole_lon_t,angle_t]])
+
+    Inputs:
+    rotations -> [scipy.spatial.transform.Rotation, or float array] a single or stacked scipy Rotation; a stack of rotation matrices of shape (T,3,3);
+    or Euler poles with rotation angles in form of [pole_lat,pole_lon,angle] or [[pole_lat_0,pole_lon_0,angle_0],..,[pole_lat_t,pole_lon_t,angle_t]] with unit of degrees,
+    where a positive angle rotates counterclockwise seen from above the pole. A 2d array is always taken as Euler poles, so a single matrix is given as a scipy Rotation or with shape (1,3,3).
+
+    Outputs:
+    matrices -> [float 3d array] rotation matrices of shape (T,3,3), which rotate the unit vectors as column vectors.
+    single -> [bool] If True, a single rotation was given.
+    '''
+    if hasattr(rotations,'as_matrix'):
+        matrices = np.asarray(rotations.as_matrix(),dtype=float)
+        return matrices.reshape(-1,3,3),matrices.ndim == 2
+
+    rotations = np.asarray(rotations,dtype=float)
+    if rotations.ndim == 3 and rotations.shape[1:] == (3,3):
+        return rotations,False
+    if rotations.shape[-1] == 3 and rotations.ndim in (1,2):
+        poles = np.atleast_2d(rotations)
+        axes = latlon2xyz(poles[:,0],poles[:,1])
+        angles = np.radians(poles[:,2])
+
+        # Rodrigues' formula R = I cosθ + sinθ [k]x + (1 - cosθ) k k^T
+        cross = np.zeros((len(axes),3,3))
+        cross[:,0,1],cross[:,0,2],cross[:,1,2] = -axes[:,2],axes[:,1],-axes[:,0]
+        cross -= cross.transpose(0,2,1)
+        matrices = np.cos(angles)[:,None,None]*np.eye(3) + np.sin(angles)[:,None,None]*cross \
+                   + (1 - np.cos(angles))[:,None,None]*axes[:,:,None]*axes[:,None,:]
+        return matrices,rotations.ndim == 1
+    raise Exception('Rotations can either be scipy Rotations, rotation matrices of shape (T,3,3), or Euler poles in form of [pole_lat,pole_lon,angle].')
+
+def tensor_components(tensors):
+    # Six independent components xx, yy, zz, xy, xz, yz of symmetric 3x3 tensors stacked along the leading axes
+    return tensors[...,[0,1,2,0,0,1],[0,1,2,1,2,2]]
+
+def component_tensors(components):
+    # Symmetric 3x3 tensors from their six independent components xx, yy, zz, xy, xz, yz
+    return components[...,[[0,3,4],[3,1,5],[4,5,2]]]
+
+def rotate_tensors(components,matrices):
+    '''
+    Rotate a symmetric tensor given by its six independent components, such as an inertia tensor, by a stack of rotation matrices as I' = R I R^T.
+
+    Usage:
+    rotated = rotate_tensors(inertia,matrices)
+
+    Inputs:
+    components -> [float array with 6 elements] components in order of xx, yy, zz, xy, xz and yz
+    matrices -> [float 3d array] rotation matrices of shape (T,3,3)
+
+    Outputs:
+    rotated -> [float 2d array] components of the rotated tensors of shape (T,6)
+    '''
+    return tensor_components(np.einsum('tij,jk,tlk->til',matrices,component_tensors(np.asarray(components,dtype=float)),matrices))
@@ -0,0 +1,128 @@
+import numpy as np
+from .boolean import side_pairs,EPSILON
+from .functions import latlon2xyz,xyz2latlon,angles_between,arc_distances,arc_crossings,side_lengths
+
+def simplify_vertices(vertices,tolerance):
+    '''
+    Simplify a spherical polygon by the Douglas-Peucker algorithm on the sphere, where the distances are great-circle distances from the vertices to the sides of the simplified polygon.
+    Where the boundary comes back close to itself, dropping vertices can make sides of the simplified polygon cross each other; such sides are split again at their farthest removed vertex until none cross.
+
+    Usage:
+    simplified,max_distance = simplify_vertices(vertices,0.1)
+
+    Inputs:
+    vertices -> [float 2d array] Vertices of a closed spherical polygon in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+    tolerance -> [float] maximal great-circle distance in degrees from a removed vertex to the simplified boundary
+
+    Outputs:
+    simplified -> [float 2d array] vertices of the closed simplified polygon, which are a subset of the original ones in order; at least three distinct vertices are kept,
+    and its sides do not cross each other unless those of the original polygon do.
+    max_distance -> [float] maximal great-circle distance in degrees from the removed vertices to the simplified boundary
+    '''
+    ring = vertices[:-1] if (vertices[0] == vertices[-1]).all() else vertices
+    n = len(ring)
+    if n <= 3: return np.vstack([ring,ring[:1]]),0.0
+
+    # The vertex 0 appears at both ends, so that the ring is processed as an open chain.
+    xyz = latlon2xyz(ring[:,0],ring[:,1])
+    xyz = np.vstack([xyz,xyz[:1]])
+    tolerance = np.radians(tolerance)
+
+    # Split the ring at the vertex farthest from the vertex 0.
+    far = int(np.argmax(angles_between(xyz[:n],xyz[0])))
+    keep = np.zeros(n+1,dtype=bool)
+    keep[[0,far,n]] = True
+
+    # All segments between kept vertices are refined at once, level by level.
+    pending = np.ones(n+1,dtype=bool)
+    pending[[0,far,n]] = False
+    while pending.any():
+        kept = np.nonzero(keep)[0]
+        points = np.nonzero(pending)[0]
+        segments = np.searchsorted(kept,points)
+        distances = arc_distances(xyz[points],xyz[kept[segments-1]],xyz[kept[segments]])
+
+        # The farthest point of each segment, where points are grouped by segment in order.
+        starts = np.nonzero(np.diff(segments,prepend=-1))[0]
+        farthest = np.maximum.reduceat(distances,starts)
+        split = farthest > tolerance
+
+        sizes = np.diff(np.append(starts,len(points)))
+        candidates = np.nonzero((distances == np.repeat(farthest,sizes)) & np.repeat(split,sizes))[0]
+        keep[points[candidates[np.unique(segments[candidates],return_index=True)[1]]]] = True
+        pending[points] = np.repeat(split,sizes)
+        pending[keep] = False
+
+    # A polygon needs at least three vertices; keep the vertex farthest from the great circle through the first two.
+    if keep[:n].sum() < 3:
+        distances = arc_distances(xyz[:n],xyz[0],xyz[far])
+        distances[[0,far]] = -1
+        keep[int(np.argmax(distances))] = True
+
+    # Split crossing sides at their farthest removed vertex; each round keeps at least one more vertex, and sides without removed vertices are original sides.
+    while True:
+        kept = np.nonzero(keep)[0]
+        sides = _crossing_sides(xyz[kept[:-1]])
+        sides = sides[kept[sides+1] - kept[sides] > 1]
+        if len(sides) == 0: break
+        for side in sides:
+            points = np.arange(kept[side]+1,kept[side+1])
+            keep[points[np.argmax(arc_distances(xyz[points],xyz[kept[side]],xyz[kept[side+1]]))]] = True
+
+    # Distances from the removed vertices to the sides that replace them
+    kept = np.nonzero(keep)[0]
+    points = np.nonzero(~keep)[0]
+    segments = np.searchsorted(kept,points)
+    max_distance = arc_distances(xyz[points],xyz[kept[segments-1]],xyz[kept[segments]]).max(initial=0)
+
+    simplified = ring[keep[:n]]
+    return np.vstack([simplified,simplified[:1]]),np.degrees(max_distance)
+
+def _crossing_sides(xyz):
+    # Indices of the sides of a ring given by unit vectors, with side i from vertex i to i+1, that cross another side in their interiors.
+    n = len(xyz)
+    i,j = side_pairs(xyz,xyz)
+    # Adjacent sides meet at their common vertex.
+    pairs = (i < j) & ((j - i) % n != 1) & ((i - j) % n != 1)
+    i,j = i[pairs],j[pairs]
+    crossing,_ = arc_crossings(xyz[i],xyz[(i+1) % n],xyz[j],xyz[(j+1) % n],EPSILON)
+    return np.unique(np.concatenate([i[crossing],j[crossing]]))
+
+def densify_vertices(vertices,max_edge):
+    '''
+    Densify a spherical polygon by inserting vertices evenly along the great-circle sides longer than a given length, which leaves the shape unchanged.
+
+    Usage:
+    densified = densify_vertices(vertices,1)
+
+    Inputs:
+    vertices -> [float 2d array] Vertices of a closed spherical polygon in form of [[lat_0,lon_0],..,[lat_n,lon_n]] with unit of degrees.
+    max_edge -> [float] maximal side length in degrees
+
+    Outputs:
+    densified -> [float 2d array] vertices of the closed densified polygon with unit of degrees, including all original vertices
+    '''
+    if max_edge <= 0:
+        raise Exception('The maximal side length must be positive.')
+
+    xyz = latlon2xyz(vertices[:,0],vertices[:,1])
+    lengths = side_lengths(xyz)
+    pieces = np.maximum(np.ceil(lengths/np.radians(max_edge)).astype(int),1)
+
+    # Fractions along each side of the original vertex and the inserted vertices
+    side = np.repeat(np.arange(len(lengths)),pieces)
+    t = (np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces,pieces))/pieces[side]
+
+    # Spherical linear interpolation; sides that are not split keep their vertex as it is.
+    a,b,theta = xyz[side],xyz[side+1],lengths[side]
+    sin_theta = np.sin(theta)
+    split = (t > 0) & (sin_theta > 0)
+    wa = np.where(split,np.sin((1 - t)*theta)/np.where(split,sin_theta,1),1)
+    wb = np.where(split,np.sin(t*theta)/np.where(split,sin_theta,1),0)
+    lats,lons,_ = xyz2latlon(wa[:,None]*a + wb[:,None]*b)
+
+    # Keep the longitudes of the inserted vertices in the range of the first vertex of their side.
+    lons = vertices[side,1] + (lons - vertices[side,1] + 180) % 360 - 180
+    densified = np.column_stack([lats,lons])
+    densified[t == 0] = vertices[side[t == 0]]
+    return np.vstack([densified,vertices[-1:]])
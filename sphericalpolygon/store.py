@@ -0,0 +1,114 @@
+'''
+Binary store of spherical polygons.
+
+A store packs the vertices of many polygons together with their derived properties over a unit sphere into one little-endian file:
+
+    header      magic b'SPHPOLY1', then uint64 number of polygons K, number of vertices N, and byte length of the names
+    offsets     int64 [K+1]; the k-th polygon takes the vertices from offsets[k] to offsets[k+1]-1
+    vertices    float64 [N,2] in form of [[lat_0,lon_0],...,[lat_n,lon_n]] with unit of degrees
+    excess      float64 [K] signed areas
+    perimeter   float64 [K]
+    centroid    float64 [K,3] in form of [[lat_0,lon_0,depth_0],...]
+    inertia     float64 [K,6] geometrical inertia tensors
+    names       utf-8 names separated by newlines
+
+Every array is memory-mapped on reading, so that opening a store does not read the vertices until they are used,
+and the polygons extracted from the collection of a store are zero-copy views into the file.
+'''
+import os
+import numpy as np
+
+MAGIC = b'SPHPOLY1'
+HEADER = np.dtype([('magic','S8'),('n_polygons','<u8'),('n_vertices','<u8'),('names_nbytes','<u8')])
+
+def _sections(n_polygons,n_vertices):
+    # name, dtype and shape of the array sections in order
+    return [('offsets','<i8',(n_polygons+1,)),('vertices','<f8',(n_vertices,2)),('excess','<f8',(n_polygons,)),
+            ('perimeter','<f8',(n_polygons,)),('centroid','<f8',(n_polygons,3)),('inertia','<f8',(n_polygons,6))]
+
+def write_store(filename,collection):
+    '''
+    Write the polygons of a collection and their properties over a unit sphere to a binary store.
+
+    Usage:
+    write_store('plates.sphp',collection)
+
+    Inputs:
+    filename -> [str] output file
+    collection -> an instance of class PolygonCollection
+    '''
+    names = '\n'.join(collection.names).encode('utf-8')
+    arrays = {'offsets':collection.offsets,'vertices':collection.vertices,'excess':collection.excess,
+              'perimeter':collection.perimeter(),'centroid':collection.centroid(),'inertia':collection.inertia()}
+
+    header = np.array((MAGIC,len(collection),len(collection.vertices),len(names)),dtype=HEADER)
+    with open(filename,'wb') as f:
+        f.write(header.tobytes())
+        for name,dtype,shape in _sections(len(collection),len(collection.vertices)):
+            f.write(np.ascontiguousarray(arrays[name],dtype=dtype).reshape(shape).tobytes())
+        f.write(names)
+
+def read_store(filename):
+    '''
+    Memory-map the sections of a binary store.
+
+    Usage:
+    names,arrays = read_store('plates.sphp')
+
+    Inputs:
+    filename -> [str] binary store created by write_store
+
+    Outputs:
+    names -> [list of str] names of the polygons
+    arrays -> [dict] read-only numpy.memmap arrays of offsets, vertices, excess, perimeter, centroid and inertia
+    '''
+    header = np.fromfile(filename,dtype=HEADER,count=1)
+    if len(header) == 0 or header['magic'][0] != MAGIC:
+        raise Exception('{:s} is not a binary store of spherical polygons.'.format(filename))
+    n_polygons,n_vertices,names_nbytes = [int(header[key][0]) for key in ('n_polygons','n_vertices','names_nbytes')]
+
+    arrays = {}
+    offset = HEADER.itemsize
+    for name,dtype,shape in _sections(n_polygons,n_vertices):
+        nbytes = np.dtype(dtype).itemsize*int(np.prod(shape))
+        # np.memmap cannot map zero bytes
+        arrays[name] = np.memmap(filename,dtype=dtype,mode='r',offset=offset,shape=shape) if nbytes else np.zeros(shape,dtype)
+        offset += nbytes
+
+    with open(filename,'rb') as f:
+        f.seek(offset)
+        names = f.read(names_nbytes).decode('utf-8')
+    return names.split('\n') if n_polygons else [],arrays
+
+def convert_to_store(source,filename):
+    '''
+    Convert plate boundaries in text format, such as those in NnrMRVL_PltBndsLatLon, to a binary store.
+
+    Usage:
+    convert_to_store('NnrMRVL_PltBndsLatLon/All_boundaries','plates.sphp')
+    convert_to_store('NnrMRVL_PltBndsLatLon','plates.sphp')
+
+    Inputs:
+    source -> [str] a file listing one or more polygons, each headed by its name; or a directory of such files, excluding All_boundaries
+    filename -> [str] output binary store
+    '''
+    from .polygonclasses.polygoncollection import PolygonCollection
+
+    if os.path.isdir(source):
+        names,polygons = [],[]
+        for name in sorted(os.listdir(source)):
+            if name == 'All_boundaries' or name.startswith('.'): continue
+            collection = PolygonCollection.from_file(os.path.join(source,name))
+            names += collection.names
+            polygons += [collection.vertices[collection.offsets[k]:collection.offsets[k+1]] for k in range(len(collection))]
+        collection = PolygonCollection.from_polygons(polygons,names)
+    else:
+        collection = PolygonCollection.from_file(source)
+
+    write_store(filename,collection)
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) != 3:
+        sys.exit('Usage: python -m sphericalpolygon.store <text file or directory> <binary store>')
+    convert_to_store(sys.argv[1],sys.argv[2])
@@ -0,0 +1,118 @@
+import numpy as np
+from itertools import islice
+
+def point_chunks(source,chunk_size=2**20,skiprows=0,delimiter=None,usecols=(0,1)):
+    '''
+    Split a source of points into chunks, so that point sets larger than memory can be processed with constant memory.
+
+    Usage:
+    for chunk in point_chunks('catalog.npy'): ...
+    for chunk in point_chunks('catalog.csv',skiprows=1,delimiter=','): ...
+
+    Inputs:
+    source -> [str, float 2d array or iterable] One of
+        - a .npy file with a float 2d array in form of [[lat_0,lon_0],..,[lat_n,lon_n]], which is memory-mapped;
+        - a text file listing lat and lon of a point per line;
+        - a float 2d array, including numpy.memmap;
+        - an iterable of float 2d arrays, which are passed through as they are.
+
+    Parameters:
+    chunk_size -> [int, optional, default = 2**20] number of points per chunk for files and arrays
+    skiprows -> [int, optional, default = 0] skip the first `skiprows` lines of a text file, including comments
+    delimiter -> [str, optional, default = None] delimiter of the columns in a text file; None means whitespace
+    usecols -> [tuple of int, optional, default = (0,1)] columns of lat and lon in a text file
+
+    Outputs:
+    chunks -> [generator] float 2d arrays of points in form of [[lat_0,lon_0],..,[lat_m,lon_m]] with unit of degrees.
+    '''
+    if isinstance(source,str):
+        if source.endswith('.npy'):
+            source = np.load(source,mmap_mode='r')
+        else:
+            with open(source) as f:
+                for _ in range(skiprows): next(f,None)
+                while True:
+                    lines = list(islice(f,chunk_size))
+                    if not lines: return
+                    yield np.loadtxt(lines,delimiter=delimiter,usecols=usecols,ndmin=2)
+
+    if isinstance(source,np.ndarray):
+        for i in range(0,len(source),chunk_size):
+            yield np.asarray(source[i:i+chunk_size],dtype=float)
+        return
+
+    for chunk in source:
+        yield np.asarray(chunk,dtype=float)
+
+def prefetch(iterator,depth=1):
+    '''
+    Iterate over an iterator while a background thread reads up to `depth` items ahead, so that reading the next chunk overlaps the processing of the current one.
+
+    Usage:
+    for chunk in prefetch(point_chunks('catalog.csv')): ...
+
+    Inputs:
+    iterator -> [iterable] items to be read ahead
+
+    Parameters:
+    depth -> [int, optional, default = 1] number of items read ahead; 1 gives double buffering.
+
+    Outputs:
+    items -> [generator] the items of the iterator in order; an exception raised while reading is raised again here.
+    '''
+    import queue,threading
+
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def put(entry):
+        # Give up if the consumer has stopped, instead of blocking on a full buffer forever.
+        while not stop.is_set():
+            try:
+                buffer.put(entry,timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def reader():
+        try:
+            for item in iterator:
+                if not put((item,None)): return
+            put((done,None))
+        except BaseException as error:
+            put((done,error))
+
+    thread = threading.Thread(target=reader,daemon=True)
+    thread.start()
+    try:
+        while True:
+            item,error = buffer.get()
+            if error is not None: raise error
+            if item is done: return
+            yield item
+    finally:
+        # Let the reader finish if the consumer stops early.
+        stop.set()
+
+def stream_map(func,source,chunk_size=2**20,buffered=True,**kwargs):
+    '''
+    Apply a function of points to each chunk of a source of points, as used by the streaming methods of the polygon classes.
+
+    Inputs:
+    func -> [callable] function taking a float 2d array of points and returning an array of the same length
+    source -> [str, float 2d array or iterable] source of points; see point_chunks
+
+    Parameters:
+    chunk_size -> [int, optional, default = 2**20] number of points per chunk for files and arrays
+    buffered -> [bool, optional, default = True] If True, the next chunk is read in a background thread while the current one is processed.
+    kwargs -> keyword arguments skiprows, delimiter and usecols for text files; see point_chunks
+
+    Outputs:
+    results -> [generator] the results of func for each chunk in order
+    '''
+    chunks = point_chunks(source,chunk_size,**kwargs)
+    if buffered: chunks = prefetch(chunks)
+    for chunk in chunks:
+        yield func(chunk)
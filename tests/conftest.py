@@ -0,0 +1,25 @@
+import os
+
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon
+
+PLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),'NnrMRVL_PltBndsLatLon')
+
+def load_plate(name):
+    return Sphericalpolygon.from_file(os.path.join(PLATES_DIR,name),skiprows=1)
+
+@pytest.fixture(scope='session')
+def plates():
+    # Plates of different shapes: 'an' contains the South Pole, 'eu' and 'na' are large, 'nz' and 'jf' are small, 'pa' crosses the antimeridian.
+    return {name:load_plate(name) for name in ['an','eu','na','nz','pa','jf']}
+
+@pytest.fixture
+def square():
+    return Sphericalpolygon.from_array([[10,40],[10,50],[20,50],[20,40]])
+
+@pytest.fixture(scope='session')
+def points():
+    rng = np.random.default_rng(7)
+    return np.column_stack([np.degrees(np.arcsin(rng.uniform(-1,1,20000))),rng.uniform(-180,180,20000)])
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from sphericalpolygon import PolygonCollection,batch_properties
+
+NAMES = ['an','eu','nz','pa','jf']
+
+@pytest.fixture
+def polygons(plates):
+    return [plates[name] for name in NAMES]
+
+def test_batch_properties_match_single_polygons(polygons):
+    centroids,inertias = batch_properties(polygons,R=2,rho=[1,2,3,4,5],chunk_size=2)
+    for k,polygon in enumerate(polygons):
+        assert np.allclose(centroids[k],polygon.centroid(R=2,quantity=False),rtol=1e-10,atol=1e-8)
+        assert np.allclose(inertias[k],polygon.inertia(R=2,rho=k + 1),rtol=1e-10,atol=1e-12)
+
+def test_inputs_pools_and_progress(polygons):
+    centroids,inertias = batch_properties(polygons)
+    collection = PolygonCollection.from_polygons(polygons)
+    for result in (batch_properties(collection),batch_properties(collection.vertices,collection.offsets),
+                   batch_properties([polygon.vertices for polygon in polygons],chunk_size=3,workers=2)):
+        assert np.array_equal(result[0],centroids) and np.array_equal(result[1],inertias)
+
+    progress = []
+    with ThreadPoolExecutor(2) as executor:
+        result = batch_properties(polygons,chunk_size=2,executor=executor,progress=lambda done,total: progress.append((done,total)))
+        assert np.array_equal(result[1],inertias)
+    assert progress == [(2,5),(4,5),(5,5)]
+
+def test_numerical_methods(polygons):
+    inertias = batch_properties(polygons)[1]
+    assert np.allclose(batch_properties(polygons,method='gauss')[1],inertias,rtol=0,atol=1e-10)
+    assert np.allclose(batch_properties(polygons[2:3],method='dblquad')[1],inertias[2:3],rtol=0,atol=1e-10)
+    with pytest.raises(Exception):
+        batch_properties(polygons,method='simpson')
+
+def test_empty_batch():
+    centroids,inertias = batch_properties([])
+    assert centroids.shape == (0,3) and inertias.shape == (0,6)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon
+
+def net_area(pieces):
+    # Outer boundaries are counterclockwise with a positive excess, and the boundaries of holes are clockwise with a negative one.
+    return sum(np.sign(piece.excess)*piece.area() for piece in pieces)
+
+def covered(pieces,points):
+    # A point is in the result if it is inside an odd number of boundaries, counting those of holes as well.
+    inside = np.zeros(len(points),dtype=bool)
+    for piece in pieces:
+        inside ^= np.asarray(piece.contains_points(points),dtype=bool)
+    return inside
+
+PAIRS = {
+    'overlapping squares': ([[10,40],[10,50],[20,50],[20,40]],[[15,45],[15,55],[25,55],[25,45]]),
+    'across the antimeridian': ([[-10,170],[-10,-170],[10,-170],[10,170]],[[-5,175],[5,-160],[20,179]]),
+    'clockwise against counterclockwise': ([[30,0],[40,0],[40,20],[30,20]],[[25,10],[45,10],[35,-10]]),
+    'nested': ([[-20,-20],[-20,20],[20,20],[20,-20]],[[-5,-5],[-5,5],[5,5],[5,-5]]),
+}
+
+@pytest.fixture(params=list(PAIRS))
+def pair(request):
+    a,b = PAIRS[request.param]
+    return Sphericalpolygon.from_array(a),Sphericalpolygon.from_array(b)
+
+@pytest.fixture
+def near_points(pair):
+    # Points spread around the bounding cap of the first polygon, which the second one overlaps
+    rng = np.random.default_rng(11)
+    lat,lon,radius = pair[0].bounding_cap()
+    lats = rng.uniform(lat - radius - 20,lat + radius + 20,20000).clip(-90,90)
+    lons = np.mod(rng.uniform(lon - radius - 30,lon + radius + 30,20000) + 180,360) - 180
+    return np.column_stack([lats,lons])
+
+def test_area_identities(pair):
+    a,b = pair
+    both,either = net_area(a.intersection(b)),net_area(a.union(b))
+    assert both > 0
+    assert np.isclose(both + either,a.area() + b.area(),rtol=1e-10)
+    assert np.isclose(net_area(a.difference(b)),a.area() - both,rtol=1e-10)
+    assert np.isclose(net_area(b.intersection(a)),both,rtol=1e-10)
+
+def test_results_cover_the_right_points(pair,near_points):
+    a,b = pair
+    in_a,in_b = [np.asarray(polygon.contains_points(near_points),dtype=bool) for polygon in pair]
+    assert np.array_equal(covered(a.intersection(b),near_points),in_a & in_b)
+    assert np.array_equal(covered(a.union(b),near_points),in_a | in_b)
+    assert np.array_equal(covered(a.difference(b),near_points),in_a & ~in_b)
+
+def test_hole_is_clockwise():
+    outer = Sphericalpolygon.from_array(PAIRS['nested'][0])
+    inner = Sphericalpolygon.from_array(PAIRS['nested'][1])
+    pieces = outer.difference(inner)
+    assert sorted(piece.orientation for piece in pieces) == ['Clockwise','Counterclockwise']
+    assert np.isclose(net_area(pieces),outer.area() - inner.area(),rtol=1e-12)
+
+def test_disjoint_polygons(square):
+    far = Sphericalpolygon.from_array([[-60,-120],[-60,-110],[-50,-110]])
+    assert square.intersection(far) == []
+    assert np.isclose(net_area(square.union(far)),square.area() + far.area(),rtol=1e-12)
+    assert np.array_equal(square.difference(far)[0].vertices,square.vertices)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon
+
+def _distances(lat,lon,vertices):
+    lat,lon,lats,lons = np.radians(lat),np.radians(lon),np.radians(vertices[:,0]),np.radians(vertices[:,1])
+    return np.degrees(np.arccos(np.clip(np.sin(lat)*np.sin(lats) + np.cos(lat)*np.cos(lats)*np.cos(lons - lon),-1,1)))
+
+@pytest.mark.parametrize('name',['an','eu','na','nz','pa','jf'])
+def test_cap_and_box_contain_the_polygon(plates,points,name):
+    polygon = plates[name]
+    lat,lon,radius = polygon.bounding_cap()
+    lat_min,lat_max,lon_west,lon_east = polygon.bounding_box()
+    assert -180 <= lon < 180 and -180 <= lon_west <= 180 and -180 <= lon_east <= 180
+    assert (_distances(lat,lon,polygon.vertices) <= radius + 1e-9).all()
+
+    inside = points[polygon.contains_points(points)]
+    assert (_distances(lat,lon,inside) <= radius).all()
+    assert ((inside[:,0] >= lat_min) & (inside[:,0] <= lat_max)).all()
+    if lon_west <= lon_east:
+        assert ((inside[:,1] >= lon_west) & (inside[:,1] <= lon_east)).all()
+    else:
+        assert ((inside[:,1] >= lon_west) | (inside[:,1] <= lon_east)).all()
+
+def test_cap_and_box_share_the_longitude_range():
+    polygon = Sphericalpolygon.from_array([[10,-110],[10,-90],[30,-90],[30,-110]])
+    lat,lon,radius = polygon.bounding_cap()
+    lat_min,lat_max,lon_west,lon_east = polygon.bounding_box()
+    assert np.isclose(lon,-100)
+    assert (lon_west,lon_east) == (-110,-90)
+    assert lat_min == 10 and lat_max > 30
+
+def test_box_across_the_antimeridian_and_pole(plates):
+    lat_min,lat_max,lon_west,lon_east = Sphericalpolygon.from_array([[-10,170],[-10,-170],[10,-170],[10,170]]).bounding_box()
+    assert (lon_west,lon_east) == (170,-170)
+    assert plates['an'].bounding_box()[0] == -90 and plates['an'].bounding_box()[2:] == (-180,180)
+
+def test_caps_overlap(plates):
+    assert plates['pa'].caps_overlap(plates['na'])
+    assert not plates['jf'].caps_overlap(plates['an'])
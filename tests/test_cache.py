@@ -0,0 +1,87 @@
+import numpy as np
+
+from sphericalpolygon import Sphericalpolygon,PolygonCache
+
+def test_vertices_are_an_owned_read_only_copy():
+    vertices = np.array([[10,40],[10,50],[20,50],[20,40],[10,40]],dtype=float)
+    polygon = Sphericalpolygon(vertices)
+    area,inertia = polygon.area(),polygon.inertia()
+
+    # Changing the array of the caller leaves the polygon and its cached properties consistent.
+    vertices[:,1] += 50
+    vertices[:,0] *= 0.5
+    assert np.array_equal(polygon.vertices[1],[10,50])
+    assert polygon.area() == area
+    assert np.array_equal(polygon.inertia(),inertia)
+    assert not polygon.vertices.flags.writeable
+
+def test_assigning_vertices_clears_the_cache():
+    polygon = Sphericalpolygon.from_array([[10,40],[10,50],[20,50],[20,40]])
+    polygon.precompute()
+    polygon.contains_points([[15,45],[0,0]])
+    moved = [[5,90],[5,100],[10,100],[10,90],[5,90]]
+    polygon.vertices = moved
+
+    fresh = Sphericalpolygon(moved)
+    assert polygon.area() == fresh.area()
+    assert np.allclose(polygon.inertia(),fresh.inertia(),rtol=0,atol=1e-15)
+    assert np.allclose(polygon.centroid(quantity=False),fresh.centroid(quantity=False),rtol=0,atol=1e-12)
+    assert polygon.perimeter() == fresh.perimeter()
+    assert polygon.contains_points([[7,95],[15,45]]).tolist() == [True,False]
+
+def test_polygon_cache_hits_misses_and_eviction():
+    vertices = [[10,40],[10,50],[20,50],[20,40],[10,40]]
+    cache = PolygonCache()
+    polygon = Sphericalpolygon.from_array(vertices,cache=cache)
+    assert cache.get(np.array(vertices,dtype=float)) is polygon
+    assert cache.get([[10,40],[10,50],[20,50],[20,41],[10,40]]) is not polygon
+    stats = cache.stats()
+    assert (stats['hits'],stats['misses'],stats['evictions'],stats['entries']) == (1,2,0,2)
+
+    # The properties computed since the last request are accounted for on the next hit.
+    before = cache.stats()['bytes']
+    polygon.precompute()
+    polygon.contains_points([[15,45]])
+    cache.get(vertices)
+    assert cache.stats()['bytes'] > before
+
+    # The least recently used polygons are evicted beyond the bound.
+    small = PolygonCache(max_bytes=3*cache._size(Sphericalpolygon.from_array(vertices)))
+    shapes = [[[10,40 + k],[10,50 + k],[20,50 + k],[20,40 + k]] for k in range(5)]
+    for shape in shapes: small.get(shape)
+    assert small.stats()['evictions'] == 2 and len(small) == 3
+    assert small.get(shapes[4]) is small.get(shapes[4])
+    small.get(shapes[0])
+    assert small.stats()['misses'] == 6
+
+    cache.clear()
+    assert cache.stats() == {'hits':0,'misses':0,'evictions':0,'entries':0,'bytes':0,'max_bytes':cache.max_bytes}
+
+def test_polygon_cache_rebuilds_a_polygon_whose_vertices_were_reassigned():
+    vertices = [[10,40],[10,50],[20,50],[20,40],[10,40]]
+    cache = PolygonCache()
+    polygon = cache.get(vertices)
+    polygon.vertices = [[5,90],[5,100],[10,100],[10,90],[5,90]]
+
+    rebuilt = cache.get(vertices)
+    assert rebuilt is not polygon
+    assert np.array_equal(rebuilt.vertices,vertices)
+    assert rebuilt.area() == Sphericalpolygon(vertices).area()
+    assert cache.stats()['misses'] == 2
+
+def test_polygon_cache_shares_open_and_closed_rings(tmp_path):
+    cache = PolygonCache()
+    closed = [[10,40],[10,50],[20,50],[20,40],[10,40]]
+    polygon = cache.get(closed[:-1])
+    assert len(polygon.vertices) == 5
+    assert cache.get(closed) is polygon
+    assert Sphericalpolygon.from_array(np.array(closed[:-1],dtype=np.float32),cache=cache) is polygon
+
+    filename = str(tmp_path/'square')
+    np.savetxt(filename,closed[:-1])
+    assert Sphericalpolygon.from_file(filename,cache=cache) is polygon
+    assert cache.stats()['hits'] == 3 and len(cache) == 1
+
+    # A ring whose ends share only one coordinate is closed as well.
+    octant = cache.get([[0,0],[0,90],[90,0]])
+    assert cache.get([[0,0],[0,90],[90,0],[0,0]]) is octant and len(octant.vertices) == 4
@@ -0,0 +1,117 @@
+import os
+
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon,PolygonCollection
+from sphericalpolygon.store import convert_to_store
+from conftest import PLATES_DIR
+
+def test_rings_are_closed_when_the_ends_share_a_coordinate(tmp_path):
+    # The first and last vertices of the octant share the latitude 0, of the square the longitude 40.
+    octant = [[0,0],[0,90],[90,0]]
+    square = [[10,40],[10,50],[20,50],[20,40]]
+    filename = tmp_path/'boundaries'
+    filename.write_text('octant\n' + ''.join('{} {}\n'.format(*v) for v in octant) + 'square\n' + ''.join('{},{}\n'.format(*v) for v in square))
+
+    collection = PolygonCollection.from_file(str(filename))
+    assert collection.names == ['octant','square']
+    assert collection.offsets.tolist() == [0,4,9]
+    assert np.array_equal(collection.vertices[3],[0,0]) and np.array_equal(collection.vertices[8],[10,40])
+    assert np.isclose(collection.area()[0],np.pi/2,rtol=1e-15)
+    assert np.allclose(collection.inertia()[0,3:],-1/3,rtol=0,atol=1e-15)
+
+    np.savetxt(tmp_path/'octant',octant)
+    for polygon in (Sphericalpolygon.from_array(octant),Sphericalpolygon.from_file(str(tmp_path/'octant'),skiprows=0)):
+        assert len(polygon.vertices) == 4
+        assert np.isclose(polygon.area(),np.pi/2,rtol=1e-15)
+
+@pytest.mark.parametrize('vertices,closed',[
+    ([[0,0],[0,90],[90,0]],4),
+    ([[10,40],[10,50],[20,50],[20,40]],5),
+    ([[10,40],[10,50],[20,45],[10,40]],4),
+    ([[10,40],[15,50],[20,45]],4)])
+def test_from_array_closes_rings_sharing_one_coordinate(vertices,closed):
+    polygon = Sphericalpolygon.from_array(vertices)
+    assert len(polygon.vertices) == closed
+    assert np.array_equal(polygon.vertices[-1],polygon.vertices[0])
+    assert np.isclose(polygon.area(),Sphericalpolygon(polygon.vertices).area(),rtol=1e-15)
+
+def test_from_file_skips_comments_and_rejects_empty_polygons(tmp_path):
+    filename = tmp_path/'boundaries'
+    filename.write_text('# plate boundaries\n\nsquare\n# lat lon\n10 40\n10 50\n20 50\n20 40\n')
+    collection = PolygonCollection.from_file(filename)
+    assert collection.names == ['square']
+    assert len(collection.vertices) == 5
+
+    for text,message in [('empty\nsquare\n10 40\n10 50\n20 50\n','Polygon empty in .* has no vertices'),
+                         ('square\n10 40\n10 50\n20 50\nempty\n','Polygon empty in .* has no vertices'),
+                         ('10 40\nsquare\n10 50\n20 50\n','lists vertices before the name of the first polygon'),
+                         ('square\n10 40\n10\n20 50\n',"Line '10' of"),
+                         ('# nothing\n','lists no polygons'),
+                         ('10 40\n10 50\n','lists no polygons')]:
+        filename.write_text(text)
+        with pytest.raises(ValueError,match=message):
+            PolygonCollection.from_file(filename)
+
+def test_collection_matches_single_polygons():
+    collection = PolygonCollection.from_file(os.path.join(PLATES_DIR,'All_boundaries'))
+    for k in range(0,len(collection),5):
+        polygon = collection[k]
+        assert np.isclose(collection.area()[k],polygon.area(),rtol=1e-12)
+        assert np.isclose(collection.perimeter()[k],polygon.perimeter(),rtol=1e-12)
+        assert np.allclose(collection.centroid()[k],polygon.centroid(quantity=False),rtol=0,atol=1e-8)
+        assert np.allclose(collection.inertia()[k],polygon.inertia(),rtol=0,atol=1e-12)
+
+def test_store_round_trip(tmp_path):
+    collection = PolygonCollection.from_file(os.path.join(PLATES_DIR,'All_boundaries'))
+    filename = str(tmp_path/'plates.sphp')
+    collection.save_store(filename)
+    stored = PolygonCollection.from_store(filename)
+
+    assert stored.names == collection.names
+    assert np.array_equal(stored.offsets,collection.offsets)
+    assert np.array_equal(stored.vertices,collection.vertices)
+    assert np.array_equal(stored.orientations,collection.orientations)
+    for method in ('area','perimeter','centroid','inertia'):
+        assert np.array_equal(getattr(stored,method)(),getattr(collection,method)())
+    assert np.array_equal(stored['pa'].vertices,collection['pa'].vertices)
+    assert stored['pa'].area() == collection['pa'].area()
+
+def test_store_from_a_directory_and_empty_store(tmp_path):
+    filename = str(tmp_path/'plates.sphp')
+    convert_to_store(PLATES_DIR,filename)
+    stored = PolygonCollection.from_store(filename)
+    single = Sphericalpolygon.from_file(os.path.join(PLATES_DIR,'nz'),skiprows=1)
+    k = stored.names.index('nz')
+    assert np.array_equal(stored['nz'].vertices,single.vertices)
+    assert np.isclose(stored.area()[k],single.area(),rtol=1e-12)
+
+    empty = str(tmp_path/'empty.sphp')
+    PolygonCollection([],np.zeros((0,2)),np.array([0])).save_store(empty)
+    assert len(PolygonCollection.from_store(empty)) == 0
+
+def test_not_a_store(tmp_path):
+    filename = tmp_path/'text'
+    filename.write_text('nz\n0 0\n')
+    with pytest.raises(Exception,match='not a binary store'):
+        PolygonCollection.from_store(str(filename))
+
+def test_polygons_from_a_store_are_views_into_the_file(tmp_path):
+    filename = str(tmp_path/'plates.sphp')
+    PolygonCollection.from_file(os.path.join(PLATES_DIR,'All_boundaries')).save_store(filename)
+    stored = PolygonCollection.from_store(filename)
+    assert isinstance(stored.vertices,np.memmap)
+
+    polygon = stored['pa']
+    assert np.shares_memory(polygon.vertices,stored.vertices)
+    assert not polygon.vertices.flags.writeable
+    reference = Sphericalpolygon(np.array(polygon.vertices))
+    assert polygon.area() == reference.area()
+    assert polygon.orientation == reference.orientation
+    assert np.array_equal(polygon.inertia(),reference.inertia())
+    assert np.array_equal(polygon.contains_points([[0,-150],[0,0]]),[True,False])
+
+    # Polygons of a collection in memory own their vertices, since the packed array is writeable.
+    collection = PolygonCollection.from_file(os.path.join(PLATES_DIR,'All_boundaries'))
+    assert not np.shares_memory(collection['pa'].vertices,collection.vertices)
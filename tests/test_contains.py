@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon
+from sphericalpolygon.inside_polygon import _order_by_counts
+
+PLATES = ['an','eu','na','nz','pa','jf']
+
+@pytest.mark.parametrize('name',['an','nz','pa'])
+def test_batch_matches_single_points(plates,points,name):
+    polygon = plates[name]
+    sample = points[:200]
+    flags = polygon.contains_points(sample,method='winding')
+    assert flags.dtype == bool and flags.shape == (len(sample),)
+    assert flags.tolist() == [polygon.contains_points(point,method='winding') for point in sample]
+    assert np.array_equal(polygon.contains_points(sample,method='winding',chunk_elements=1000),flags)
+
+def test_single_point_and_pole(plates):
+    polygon = plates['an']
+    assert polygon.contains_points([-90,0]) is True
+    assert polygon.contains_points([90,0]) is False
+    assert polygon.contains_points([[-89,10],[0,0]],method='winding').tolist() == [True,False]
+    with pytest.raises(Exception):
+        polygon.contains_points([0,0],method='ray')
+
+@pytest.mark.parametrize('name',PLATES)
+def test_index_matches_winding(plates,points,name):
+    polygon = plates[name]
+    flags = polygon.contains_points(points)
+    assert flags.dtype == bool and flags.shape == (len(points),)
+    assert np.array_equal(flags[:3000],polygon.contains_points(points[:3000],method='winding'))
+    assert np.array_equal(polygon.contains_points(points,chunk_elements=5000),flags)
+
+@pytest.mark.parametrize('name',PLATES)
+def test_exact_matches_index(plates,points,name):
+    polygon = plates[name]
+    assert np.array_equal(polygon.contains_points(points,method='exact'),polygon.contains_points(points))
+
+@pytest.mark.parametrize('name',['nz','pa'])
+def test_boundary_classification(plates,name):
+    polygon = plates[name]
+    vertices = polygon.vertices[:-1]
+    assert (polygon.classify_points(vertices) == 0).all()
+    assert polygon.contains_points(vertices,method='exact').all()
+
+    points = np.array([[-89,10],[0,0],[40,-100]])
+    classes = polygon.classify_points(points)
+    assert np.array_equal(classes == 1,polygon.contains_points(points))
+    assert set(classes.tolist()) <= {-1,1}
+    assert polygon.classify_points(vertices[0]) == 0
+
+def test_classification_on_meridian_sides(square):
+    # Sides along meridians are great circles, so points on them lie exactly on the boundary.
+    assert square.classify_points([[15,40],[15,50],[12.5,40]]).tolist() == [0,0,0]
+    assert square.classify_points([[15,45],[15,39.999999],[15,50.000001]]).tolist() == [1,-1,-1]
+    assert square.contains_points([15,40],method='exact') is True
+
+def test_index_on_a_polygon_with_many_vertices(points):
+    # A star-shaped polygon with 20000 vertices across the antimeridian
+    theta = np.linspace(0,2*np.pi,20000,endpoint=False)
+    r = 30*(1 + 0.3*np.sin(40*theta))
+    polygon = Sphericalpolygon.from_array(np.column_stack([10 + r*np.sin(theta),170 + r*np.cos(theta)]))
+    sample = points[:1000]
+    assert np.array_equal(polygon.contains_points(sample),polygon.contains_points(sample,method='winding'))
+
+@pytest.mark.parametrize('name',PLATES)
+def test_packed_matches_index(plates,points,name):
+    polygon = plates[name]
+    flags = polygon.contains_points(points)
+    assert np.array_equal(flags,polygon.contains_points_packed(points,packing='uint8').astype(bool))
+    assert np.array_equal(np.packbits(flags,bitorder='little'),polygon.contains_points_packed(points))
+
+def test_packed_inputs_and_buffers(plates,points,tmp_path):
+    polygon = plates['eu']
+    flags = polygon.contains_points(points).astype(np.uint8)
+
+    # Single-precision and memory-mapped inputs, in chunks that leave a partial byte
+    filename = str(tmp_path/'points.npy')
+    np.save(filename,points.astype(np.float32))
+    points32 = np.load(filename,mmap_mode='r')
+    expected = polygon.contains_points(points32.astype(float)).astype(np.uint8)
+    assert np.array_equal(polygon.contains_points_packed(points32,'uint8',chunk_size=3001),expected)
+    assert (expected != flags).sum() < 5
+
+    # Output and scratch buffers are filled and reused across calls.
+    out,scratch = np.zeros(len(points),dtype=np.uint8),{}
+    assert polygon.contains_points_packed(points,'uint8',out=out,scratch=scratch) is out
+    assert np.array_equal(out,flags) and scratch
+    buffers = {key:id(value) for key,value in scratch.items()}
+    assert np.array_equal(polygon.contains_points_packed(points[::-1],'uint8',scratch=scratch),flags[::-1])
+    assert {key:id(value) for key,value in scratch.items()} == buffers
+
+    with pytest.raises(Exception):
+        polygon.contains_points_packed(points,tolerance=1e-7)
+
+def test_order_by_counts_beyond_16_bits():
+    counts = np.array([70000,6000,3,70000,0,65536,65535],dtype=np.int32)
+    assert np.array_equal(_order_by_counts(counts),np.argsort(counts,kind='stable'))
+    small = np.array([5,1,5,0,2],dtype=np.int32)
+    assert np.array_equal(_order_by_counts(small),[3,1,4,0,2])
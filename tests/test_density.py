@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon,density_field
+
+OCTANT = [[0,0],[0,90],[90,0]]
+
+@pytest.fixture
+def octant():
+    return Sphericalpolygon.from_array(OCTANT)
+
+def test_variable_density(octant):
+    # A density of 1 + z over the octant gives a mass of π/2 + π/4.
+    properties = octant.mass_properties(lambda lat,lon: 1 + np.sin(np.radians(lat)),error=True)
+    assert np.isclose(properties['mass'],3*np.pi/4,rtol=1e-12)
+    assert properties['mass_error'] < 1e-8
+    assert np.isclose(octant.area(rho=lambda lat,lon: 1 + np.sin(np.radians(lat))),3*np.pi/4,rtol=1e-12)
+
+def test_constant_density_and_grid(octant):
+    constant = octant.mass_properties(2.5)
+    assert np.isclose(constant['mass'],2.5*octant.area(),rtol=1e-13)
+    assert np.allclose(constant['inertia'],2.5*octant.inertia(),rtol=0,atol=1e-13)
+    assert np.allclose(constant['centroid'],octant.centroid(quantity=False),rtol=0,atol=1e-12)
+    assert np.allclose(octant.inertia(rho=lambda lat,lon: np.full(np.shape(lat),2.5)),2.5*octant.inertia(),rtol=0,atol=1e-13)
+    assert np.isclose(octant.area(rho=np.full((180,360),2.5)),2.5*octant.area(),rtol=1e-12)
+
+    # A grid starting at another longitude is wrapped by density_field.
+    grid = np.tile(np.linspace(1,2,360),(180,1))
+    assert np.isclose(octant.area(rho=density_field(np.roll(grid,-180,axis=1),0)),octant.area(rho=grid),rtol=1e-12)
+
+def test_variable_density_around_a_pole(plates):
+    # The regions between the sides and the North Pole cover the complement of a polygon containing the South Pole.
+    polygon = plates['an']
+    rho = lambda lat,lon: 3 + np.sin(np.radians(lat))**2
+    properties = polygon.mass_properties(rho,tol=1e-10)
+    area = polygon.area()
+    assert 3*area < properties['mass'] < 4*area
+    lat,lon,depth = polygon.centroid(quantity=False,rho=rho,tol=1e-10)
+    assert lat < polygon.centroid(quantity=False)[0]
+
+def test_methods_for_a_variable_density(plates):
+    polygon = plates['nz']
+    rho = lambda lat,lon: 3 + np.cos(np.radians(lon))*np.sin(np.radians(lat))**2
+    exact = polygon.mass_properties(rho,tol=1e-13)
+
+    # 'gauss' fixes the order, whatever tol is, and 'adaptive' refines it until tol is met.
+    coarse = polygon.inertia(rho=rho,method='gauss',order=2,tol=1e-13)
+    assert np.array_equal(coarse,polygon.mass_properties(rho,order=2)['inertia'])
+    assert np.abs(coarse - exact['inertia']).max() > 1e-8
+    inertia,error = polygon.inertia(rho=rho,method='adaptive',order=2,error=True)
+    assert (np.abs(inertia - exact['inertia']) <= error + 1e-14).all()
+    assert np.abs(inertia - exact['inertia']).max() < 1e-9
+    assert np.array_equal(polygon.inertia(rho=rho,order=2),coarse)
+
+    lat,lon,depth,error = polygon.centroid(quantity=False,rho=rho,method='adaptive',tol=1e-8,error=True)
+    assert np.allclose([lat,lon,depth],exact['centroid'],rtol=0,atol=1e-6)
+    assert np.array_equal(polygon.centroid(quantity=False,rho=rho,method='gauss',order=2),polygon.mass_properties(rho,order=2)['centroid'])
+
+    for kwargs in ({'method':'dblquad'},{'method':'simpson'},{'workers':2},{'method':'gauss','workers':4}):
+        with pytest.raises(ValueError):
+            polygon.inertia(rho=rho,**kwargs)
+        with pytest.raises(ValueError):
+            polygon.centroid(rho=rho,**kwargs)
@@ -0,0 +1,88 @@
+import threading
+
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon,instrument
+
+@pytest.fixture
+def polygon(plates):
+    # A fresh polygon, so that its properties are not cached yet
+    return Sphericalpolygon(plates['jf'].vertices)
+
+def test_profile_records_stages(polygon):
+    assert not instrument.active
+    with instrument.profile() as stats:
+        assert instrument.active
+        polygon.inertia(method='gauss')
+        polygon.contains_points([[45,-128],[0,0]])
+    assert not instrument.active
+
+    assert stats['polygon_inertia']['calls'] == 1
+    assert stats['polygon_inertia']['evaluations'] > 0
+    assert stats['polygon_excess']['edges'] == len(polygon.vertices) - 1
+    assert stats['inside_polygon_indexed']['points'] <= 2
+    assert all(totals['time'] >= 0 for totals in stats.values())
+
+    # Nothing is recorded once the profile is closed.
+    polygon.contains_points([[45,-128],[0,0]])
+    assert stats['inside_polygon_indexed']['calls'] == 1
+
+def test_profile_records_other_threads(polygon,points):
+    with instrument.profile() as stats:
+        threads = [threading.Thread(target=polygon.contains_points,args=(points[k::4],)) for k in range(4)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+    assert stats['inside_polygon_indexed']['calls'] == 4
+
+def test_nested_profiles_and_callbacks(polygon):
+    records = []
+    def callback(stage,elapsed,counts):
+        records.append((stage,elapsed,dict(counts)))
+
+    instrument.add_callback(callback)
+    try:
+        assert instrument.active
+        with instrument.profile() as outer:
+            polygon.contains_points([0,0])
+            with instrument.profile() as inner:
+                polygon.centroid(method='gauss')
+        assert 'inside_polygon_indexed' in outer and 'inside_polygon_indexed' not in inner
+        assert outer['polygon_centroid'] == inner['polygon_centroid']
+    finally:
+        instrument.remove_callback(callback)
+    assert not instrument.active
+
+    # The quadrature evaluations and the timed call of a stage are separate records.
+    stages = [stage for stage,_,_ in records]
+    assert 'inside_polygon_indexed' in stages
+    centroid = [(elapsed,counts) for stage,elapsed,counts in records if stage == 'polygon_centroid']
+    assert sorted(map(sorted,(counts for _,counts in centroid))) == [['calls','edges'],['evaluations']]
+    assert sum(counts.get('evaluations',0) for _,counts in centroid) == inner['polygon_centroid']['evaluations']
+    assert sum(elapsed for elapsed,_ in centroid) == inner['polygon_centroid']['time'] > 0
+
+    # A removed callback receives nothing further.
+    polygon.inertia()
+    assert len(records) == len(stages)
+
+def test_callback_of_a_profile_is_removed_with_it(polygon):
+    records = []
+    with instrument.profile(lambda stage,elapsed,counts: records.append(stage)) as stats:
+        Sphericalpolygon(polygon.vertices)
+    assert records == ['polygon_excess'] and set(stats) == {'polygon_excess'}
+    Sphericalpolygon(polygon.vertices)
+    assert records == ['polygon_excess'] and not instrument.active
+
+def test_timing_and_record():
+    with instrument.profile() as stats:
+        with instrument.timing('block',points=3):
+            pass
+        instrument.record('block',evaluations=5)
+    assert stats['block']['points'] == 3 and stats['block']['evaluations'] == 5
+    assert stats['block']['time'] >= 0
+
+    # The same calls without an open profile are no-ops.
+    with instrument.timing('block'):
+        pass
+    instrument.record('block',evaluations=5)
+    assert stats['block']['evaluations'] == 5
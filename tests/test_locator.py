@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pytest
+
+from sphericalpolygon import PolygonCollection,PolygonLocator
+from conftest import PLATES_DIR
+
+PLATES = ['an','eu','na','nz','pa','jf']
+
+@pytest.fixture(scope='module')
+def locator(plates):
+    return PolygonLocator.from_polygons([plates[name] for name in PLATES],PLATES,resolution=16)
+
+def first_containing(polygons,points):
+    expected = np.full(len(points),-1)
+    for k in reversed(range(len(polygons))):
+        expected[polygons[k].contains_points(points)] = k
+    return expected
+
+def test_locate_finds_the_first_containing_polygon(locator,plates,points):
+    labels = locator.locate(points[:5000])
+    assert np.array_equal(labels,first_containing([plates[name] for name in PLATES],points[:5000]))
+    assert locator.locate([-90,0]) == PLATES.index('an')
+    assert locator.locate([90,0]) == PLATES.index('na')
+
+def test_all_plates_cover_the_sphere(points):
+    collection = PolygonCollection.from_file(os.path.join(PLATES_DIR,'All_boundaries'))
+    labels = PolygonLocator(collection).locate(points[:3000])
+    assert np.array_equal(labels,first_containing([collection[k] for k in range(len(collection))],points[:3000]))
+    assert (labels >= 0).mean() > 0.999
+
+def test_save_and_load(locator,points,tmp_path):
+    filename = str(tmp_path/'locator.npz')
+    locator.save(filename)
+    loaded = PolygonLocator.load(filename)
+
+    assert loaded.names == locator.names and loaded.resolution == locator.resolution
+    for key in ('owner','cell_offsets','cell_polygons'):
+        assert np.array_equal(getattr(loaded,key),getattr(locator,key))
+    assert np.array_equal(loaded.collection.vertices,locator.collection.vertices)
+    assert np.array_equal(loaded.locate(points),locator.locate(points))
+
+def test_locate_stream(locator,points,tmp_path):
+    labels = locator.locate(points)
+
+    filename = str(tmp_path/'points.npy')
+    np.save(filename,points)
+    streamed = list(locator.locate_stream(filename,chunk_size=3000))
+    assert [len(chunk) for chunk in streamed] == [3000]*6 + [2000]
+    assert np.array_equal(np.concatenate(streamed),labels)
+
+    filename = str(tmp_path/'points.csv')
+    np.savetxt(filename,points[:1000],delimiter=',',header='lat,lon')
+    streamed = locator.locate_stream(filename,chunk_size=300,buffered=False,skiprows=1,delimiter=',')
+    assert np.array_equal(np.concatenate(list(streamed)),labels[:1000])
+
+    chunks = iter(np.array_split(points,5))
+    assert np.array_equal(np.concatenate(list(locator.locate_stream(chunks))),labels)
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon
+from sphericalpolygon.centroid import polygon_centroid
+from sphericalpolygon.inertia import polygon_inertia
+
+# The octant x,y,z > 0 has closed-form moments: area π/2, first moments π/4, second moments π/6 for xx and 1/3 for xy, so the inertia is π/3 on the diagonal and -1/3 off it.
+OCTANT = [[0,0],[0,90],[90,0]]
+OCTANT_INERTIA = np.array([np.pi/2 - np.pi/6]*3 + [-1/3]*3)
+
+@pytest.fixture
+def octant():
+    return Sphericalpolygon.from_array(OCTANT)
+
+def test_octant_closed_form(octant):
+    assert np.isclose(octant.area(),np.pi/2,rtol=1e-15)
+    assert np.isclose(octant.perimeter(),3*np.pi/2,rtol=1e-15)
+    assert np.allclose(octant.inertia(),OCTANT_INERTIA,rtol=0,atol=1e-15)
+    lat,lon,depth = octant.centroid(quantity=False)
+    assert np.isclose(lat,np.degrees(np.arcsin(1/np.sqrt(3))),atol=1e-12)
+    assert np.isclose(lon,45,atol=1e-12)
+    assert np.isclose(depth,1 - np.sqrt(3)/2,atol=1e-15)
+
+def test_orientation_and_scaling(octant):
+    reverse = Sphericalpolygon.from_array(OCTANT[::-1])
+    assert octant.orientation != reverse.orientation
+    assert reverse.area() == octant.area()
+    assert np.allclose(reverse.inertia(),octant.inertia(),rtol=0,atol=1e-15)
+    assert np.isclose(octant.area(2,3),octant.area()*4*3)
+    assert np.allclose(octant.inertia(2,3),octant.inertia()*16*3)
+
+@pytest.mark.parametrize('name',['jf','nz'])
+def test_analytic_agrees_with_dblquad(plates,name):
+    vertices = plates[name].vertices
+    assert np.allclose(polygon_inertia(vertices),polygon_inertia(vertices,'dblquad'),rtol=0,atol=1e-10)
+    assert np.allclose(polygon_centroid(vertices),polygon_centroid(vertices,'dblquad'),rtol=0,atol=1e-10)
+
+@pytest.mark.parametrize('name',['an','eu','pa','nz'])
+def test_gauss_and_adaptive_within_their_error_estimates(plates,name):
+    polygon = plates[name]
+    exact = polygon.inertia()
+    for kwargs in ({'method':'gauss'},{'method':'gauss','order':8},{'method':'adaptive','tol':1e-6},{'method':'adaptive'}):
+        inertia,error = polygon.inertia(error=True,**kwargs)
+        assert (np.abs(inertia - exact) <= error + 1e-14).all()
+    inertia,error = polygon.inertia(method='adaptive',tol=1e-6,error=True)
+    assert (error <= 1e-6*polygon.area()).all()
+
+    lat,lon,depth,error = polygon.centroid(method='adaptive',tol=1e-8,quantity=False,error=True)
+    assert error <= 1e-8
+    assert np.allclose([lat,lon,depth],polygon.centroid(quantity=False),rtol=0,atol=1e-8)
+
+def test_dblquad_reports_errors(square):
+    inertia,error = square.inertia(method='dblquad',error=True)
+    assert np.allclose(inertia,square.inertia(),rtol=0,atol=1e-10)
+    assert (error < 1e-8).all()
+    lat,lon,depth,error = square.centroid(method='dblquad',quantity=False,error=True)
+    assert np.allclose([lat,lon,depth],square.centroid(quantity=False),rtol=0,atol=1e-10)
+    assert error < 1e-8
+
+def test_unknown_method(octant):
+    with pytest.raises(Exception):
+        octant.inertia(method='simpson')
+
+def test_dblquad_over_a_pool_matches_one_process(plates):
+    vertices = plates['jf'].vertices
+    inertia = polygon_inertia(vertices,'dblquad')
+    assert np.array_equal(polygon_inertia(vertices,'dblquad',workers=2),inertia)
+    with ThreadPoolExecutor(4) as executor:
+        assert np.array_equal(polygon_inertia(vertices,'dblquad',executor=executor),inertia)
+        assert np.array_equal(polygon_centroid(vertices,'dblquad',executor=executor),polygon_centroid(vertices,'dblquad'))
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon,MutableSphericalpolygon
+
+def assert_matches(mutable):
+    fresh = Sphericalpolygon.from_array(mutable.vertices)
+    assert np.isclose(mutable.area(),fresh.area(),rtol=1e-12)
+    assert np.isclose(mutable.perimeter(),fresh.perimeter(),rtol=1e-12)
+    assert np.allclose(mutable.inertia(),fresh.inertia(),rtol=0,atol=1e-12)
+    assert np.allclose(mutable.centroid(),fresh.centroid(quantity=False),rtol=0,atol=1e-9)
+    assert mutable.orientation == fresh.orientation
+
+def test_edits_match_a_fresh_polygon():
+    mutable = MutableSphericalpolygon([[0,0],[0,90],[90,0]])
+    assert len(mutable) == 3 and np.array_equal(mutable.vertices[-1],mutable.vertices[0])
+    mutable.move_vertex(1,0,60)
+    assert_matches(mutable)
+    mutable.insert_vertex(2,30,30)
+    assert len(mutable) == 4
+    assert_matches(mutable)
+    mutable.remove_vertex(2)
+    mutable.append_vertex(10,5)
+    assert np.array_equal(mutable.vertices[-2],[10,5])
+    assert_matches(mutable)
+
+    # Removing the first vertex and inserting before it split and merge the closing side.
+    mutable.remove_vertex(0)
+    assert_matches(mutable)
+    mutable.insert_vertex(0,-10,30)
+    assert_matches(mutable)
+    assert np.array_equal(mutable.to_polygon().vertices,mutable.vertices)
+
+def test_many_random_edits_on_a_plate(plates):
+    rng = np.random.default_rng(3)
+    mutable = MutableSphericalpolygon(plates['nz'],refresh_interval=50)
+    for _ in range(200):
+        n = len(mutable)
+        i = int(rng.integers(n))
+        lat,lon = mutable.vertices[i] + rng.normal(0,0.01,2)
+        action = rng.integers(3)
+        if action == 0: mutable.move_vertex(i,lat,lon)
+        elif action == 1: mutable.insert_vertex(i,*(mutable.vertices[i - 1] + mutable.vertices[i])/2)
+        else: mutable.remove_vertex(i)
+    assert_matches(mutable)
+
+def test_orientation_follows_the_vertices():
+    mutable = MutableSphericalpolygon([[10,40],[10,50],[20,50],[20,40]])
+    assert mutable.orientation == 'Counterclockwise'
+    mutable.move_vertex(1,25,45)
+    mutable.move_vertex(3,5,45)
+    assert mutable.orientation == Sphericalpolygon.from_array(mutable.vertices).orientation
+
+def test_too_few_vertices():
+    with pytest.raises(Exception):
+        MutableSphericalpolygon([[0,0],[0,90],[0,0]])
+    mutable = MutableSphericalpolygon([[0,0],[0,90],[90,0]])
+    with pytest.raises(Exception):
+        mutable.remove_vertex(0)
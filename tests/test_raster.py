@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon,PolygonCollection,rasterize_latlon,rasterize_healpix
+from sphericalpolygon.raster import healpix_rings
+
+def cell_centers(n_lat,n_lon,lon_start=-180):
+    lats = -90 + (np.arange(n_lat) + 0.5)*180/n_lat
+    lons = lon_start + (np.arange(n_lon) + 0.5)*360/n_lon
+    return np.column_stack([np.repeat(lats,n_lon),np.tile(lons,n_lat)])
+
+def healpix_centers(nside):
+    lats,lon_start,dlon,ncols = healpix_rings(nside)
+    lons = np.concatenate([start + (np.arange(n) + 0.5)*width for start,width,n in zip(lon_start,dlon,ncols)])
+    return np.column_stack([np.repeat(lats,ncols),np.mod(lons + 180,360) - 180])
+
+@pytest.mark.parametrize('name',['an','eu','nz','pa'])
+def test_mask_matches_containment_of_cell_centers(plates,name):
+    polygon = plates[name]
+    for resolution,lon_start in [(1,-180),(0.5,0)]:
+        mask = polygon.rasterize(resolution,lon_start=lon_start)
+        centers = cell_centers(*mask.shape,lon_start)
+        assert np.array_equal(mask.ravel(),np.asarray(polygon.contains_points(centers),dtype=bool))
+
+@pytest.mark.parametrize('name',['an','eu','nz','pa'])
+def test_fractions_add_up_to_the_area(plates,name):
+    polygon = plates[name]
+    fractions = polygon.rasterize(1,fraction=True,subsamples=16)
+    assert fractions.min() >= 0 and fractions.max() <= 1 + 1e-12
+
+    # Areas of the cells over a unit sphere
+    edges = np.radians(np.linspace(-90,90,fractions.shape[0] + 1))
+    cell_areas = np.diff(np.sin(edges))*np.radians(360/fractions.shape[1])
+    assert np.isclose(np.sum(fractions*cell_areas[:,None]),polygon.area(),rtol=1e-4)
+
+def test_healpix_matches_containment_of_pixel_centers(plates):
+    for name in ['an','eu','pa']:
+        polygon = plates[name]
+        pixels = polygon.rasterize_healpix(16)
+        assert len(pixels) == 12*16**2
+        assert np.array_equal(pixels,np.asarray(polygon.contains_points(healpix_centers(16)),dtype=bool))
+
+def test_collection_labels_match_single_masks(plates):
+    names = ['an','eu','na','pa']
+    collection = PolygonCollection.from_polygons([plates[name] for name in names],names)
+    for labels,masks in [(rasterize_latlon(collection,2),[rasterize_latlon(plates[name],2) for name in names]),
+                         (rasterize_healpix(collection,8),[rasterize_healpix(plates[name],8) for name in names])]:
+        # A cell takes the index of the first polygon covering it.
+        earlier = np.zeros_like(masks[0])
+        for k,mask in enumerate(masks):
+            assert np.array_equal(labels == k,mask & ~earlier)
+            earlier |= mask
+        assert np.array_equal(labels == -1,~earlier)
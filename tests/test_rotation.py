@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon,rotation_matrices
+
+ROTATIONS = [[30,-60,25],[-10,170,140],[89,0,-75]]
+
+@pytest.mark.parametrize('name',['an','nz','pa'])
+@pytest.mark.parametrize('rotation',ROTATIONS)
+def test_rotate_carries_a_consistent_area(plates,name,rotation):
+    polygon = plates[name]
+    polygon.precompute()
+    rotated = polygon.rotate(rotation)
+
+    assert rotated.area() == polygon.area()
+    assert rotated.perimeter() == polygon.perimeter()
+    # The trace of the inertia tensor over a unit sphere is twice the area.
+    assert np.isclose(rotated.inertia()[:3].sum(),2*rotated.area(),rtol=1e-14,atol=0)
+    assert rotated.orientation == polygon.orientation
+
+@pytest.mark.parametrize('rotation',ROTATIONS)
+def test_rotate_matches_the_rebuilt_polygon(plates,rotation):
+    polygon = plates['nz']
+    rotated = polygon.rotate(rotation)
+    matrix = rotation_matrices(rotation)[0][0]
+    rebuilt = Sphericalpolygon(rotated.vertices)
+
+    # The rebuilt polygon loses the nearly meridional sides with |dlon| < 1e-6 in polygon_excess, hence the loose tolerance.
+    assert np.isclose(rotated.area(),rebuilt.area(),rtol=1e-5)
+    assert np.allclose(rotated.inertia(),rebuilt.inertia(),rtol=0,atol=1e-5)
+    lat,lon,depth = polygon.centroid(quantity=False)
+    expected = matrix @ np.array([np.cos(np.radians(lat))*np.cos(np.radians(lon)),np.cos(np.radians(lat))*np.sin(np.radians(lon)),np.sin(np.radians(lat))])
+    lat_r,lon_r,depth_r = rotated.centroid(quantity=False)
+    assert np.isclose(depth_r,depth,rtol=1e-12)
+    assert np.isclose(np.sin(np.radians(lat_r)),expected[2],atol=1e-12)
+
+def test_rotate_off_the_pole_keeps_the_containment(plates):
+    polygon = plates['an']
+    rotated = polygon.rotate([0,0,90])
+    matrix = rotation_matrices([0,0,90])[0][0]
+    xyz = matrix @ np.array([0,0,-1.])
+    south_pole_image = [np.degrees(np.arcsin(xyz[2])),np.degrees(np.arctan2(xyz[1],xyz[0]))]
+
+    assert polygon.contains_points([-90,0])
+    assert rotated.contains_points(south_pole_image)
+    assert not rotated.contains_points([-90,0])
+    assert np.isclose(rotated.area(),polygon.area(),rtol=0,atol=1e-15)
+
+def test_series_agree_with_single_rotations(plates,points):
+    polygon = plates['eu']
+    series = polygon.inertia_series(ROTATIONS)
+    flags = polygon.contains_points_rotated(points[:2000],ROTATIONS)
+    for k,rotation in enumerate(ROTATIONS):
+        rotated = polygon.rotate(rotation)
+        assert np.allclose(series[k],rotated.inertia(),rtol=0,atol=1e-13)
+        assert np.array_equal(flags[k],rotated.contains_points(points[:2000]))
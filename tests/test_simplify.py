@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from sphericalpolygon import Sphericalpolygon
+from sphericalpolygon.simplify import _crossing_sides
+from sphericalpolygon.functions import latlon2xyz,arc_distances
+
+# A square with an outward bump on its southern side and a narrow notch from the north that reaches below the chord replacing the bump.
+NOTCHED = [[0,0],[-0.5,5],[0,10],[10,10],[10,5.1],[-0.2,5.1],[-0.2,4.9],[10,4.9],[10,0],[0,0]]
+
+def crossing_sides(vertices):
+    return _crossing_sides(latlon2xyz(vertices[:-1,0],vertices[:-1,1]))
+
+@pytest.mark.parametrize('name',['eu','nz','pa','jf'])
+@pytest.mark.parametrize('tolerance',[0.1,1,5])
+def test_simplify_reports_its_errors(plates,name,tolerance):
+    polygon = plates[name]
+    simplified,changes = polygon.simplify(tolerance,report=True)
+    assert changes['vertices'] == len(simplified.vertices) - len(polygon.vertices) < 0
+    assert changes['area'] == simplified.area() - polygon.area()
+    assert np.array_equal(changes['inertia'],simplified.inertia() - polygon.inertia())
+    assert 0 < changes['max_distance'] <= tolerance
+    assert np.array_equal(polygon.simplify(tolerance).vertices,simplified.vertices)
+
+    # The reported distance is measured to the side replacing each removed vertex, which bounds the distance to the simplified boundary.
+    xyz = polygon.xyz[:,None]
+    distances = arc_distances(xyz,simplified.xyz[:-1],simplified.xyz[1:]).min(axis=1)
+    assert np.degrees(distances.max()) <= changes['max_distance']*(1 + 1e-12)
+    assert len(crossing_sides(simplified.vertices)) == 0
+
+def test_simplify_keeps_the_sides_from_crossing():
+    polygon = Sphericalpolygon(NOTCHED)
+    assert len(crossing_sides(polygon.vertices)) == 0
+
+    # Dropping the bump alone would leave the chord along the equator crossing the walls of the notch.
+    simplified,changes = polygon.simplify(1,report=True)
+    assert len(crossing_sides(simplified.vertices)) == 0
+    assert [-0.5,5] in simplified.vertices.tolist()
+    assert changes['max_distance'] <= 1
+    assert simplified.contains_points([-0.3,5]) and not simplified.contains_points([0,5])
+
+    # A tolerance large enough to drop the notch leaves no crossing either.
+    simplified = polygon.simplify(20)
+    assert len(simplified.vertices) >= 4 and len(crossing_sides(simplified.vertices)) == 0
+
+def test_simplify_keeps_three_vertices(square):
+    assert len(square.simplify(1e3).vertices) == 4
+    triangle = Sphericalpolygon([[0,0],[0,90],[90,0],[0,0]])
+    assert np.array_equal(triangle.simplify(10).vertices,triangle.vertices)
+
+@pytest.mark.parametrize('name',['nz','jf'])
+def test_densify_keeps_the_shape(plates,name):
+    polygon = plates[name]
+    densified,changes = polygon.densify(0.5,report=True)
+    lengths = np.degrees(np.arccos(np.clip(np.sum(densified.xyz[:-1]*densified.xyz[1:],axis=1),-1,1)))
+    assert lengths.max() <= 0.5 + 1e-9
+    assert changes['vertices'] == len(densified.vertices) - len(polygon.vertices) > 0
+    assert abs(changes['area']) < 1e-12
+    assert np.abs(changes['inertia']).max() < 1e-12
+
+    # All original vertices are kept in order.
+    position = 0
+    for vertex in polygon.vertices:
+        while not np.array_equal(densified.vertices[position],vertex): position += 1
+    assert np.array_equal(densified.vertices[-1],polygon.vertices[-1])
+    assert len(densified.simplify(1e-6).vertices) <= len(polygon.vertices)
+
+    with pytest.raises(Exception):
+        polygon.densify(0)
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from sphericalpolygon.stream import point_chunks,prefetch
+
+@pytest.fixture
+def polygon(plates):
+    return plates['eu']
+
+def test_stream_over_npy(polygon,points,tmp_path):
+    filename = str(tmp_path/'points.npy')
+    np.save(filename,points)
+    chunks = list(polygon.contains_points_stream(filename,chunk_size=6000))
+    assert [len(chunk) for chunk in chunks] == [6000,6000,6000,2000]
+    assert np.array_equal(np.concatenate(chunks),polygon.contains_points(points))
+
+    # The file is memory-mapped rather than read at once.
+    assert isinstance(np.load(filename,mmap_mode='r'),np.memmap)
+    first = next(point_chunks(filename,chunk_size=10))
+    assert first.dtype == float and np.array_equal(first,points[:10])
+
+def test_stream_over_text_file(polygon,points,tmp_path):
+    sample = points[:2500]
+    filename = str(tmp_path/'points.csv')
+    # Extra columns before lat and lon, and a header line
+    np.savetxt(filename,np.column_stack([np.arange(len(sample)),sample]),delimiter=',',header='id,lat,lon',comments='')
+    for buffered in (True,False):
+        chunks = list(polygon.contains_points_stream(filename,chunk_size=1000,buffered=buffered,skiprows=1,delimiter=',',usecols=(1,2)))
+        assert [len(chunk) for chunk in chunks] == [1000,1000,500]
+        assert np.array_equal(np.concatenate(chunks),polygon.contains_points(sample))
+
+    filename = str(tmp_path/'points.txt')
+    np.savetxt(filename,sample[:1])
+    assert np.array_equal(np.concatenate(list(polygon.contains_points_stream(filename))),polygon.contains_points(sample[:1]))
+
+def test_stream_over_arrays_and_iterators(polygon,points):
+    flags = polygon.contains_points(points)
+    assert np.array_equal(np.concatenate(list(polygon.contains_points_stream(points,chunk_size=7000))),flags)
+
+    chunks = (chunk.tolist() for chunk in np.array_split(points,7))
+    assert np.array_equal(np.concatenate(list(polygon.contains_points_stream(chunks,method='winding'))),flags)
+
+def test_prefetch_raises_errors_of_the_reader_and_stops_early():
+    def chunks():
+        yield np.zeros((2,2))
+        raise ValueError('bad chunk')
+
+    stream = prefetch(chunks())
+    assert len(next(stream)) == 2
+    with pytest.raises(ValueError,match='bad chunk'):
+        next(stream)
+
+    # A consumer that stops early lets the reader finish rather than block on the full buffer.
+    threads = threading.active_count()
+    stream = prefetch(iter(range(100)))
+    assert next(stream) == 0
+    stream.close()
+    for _ in range(50):
+        if threading.active_count() == threads: break
+        time.sleep(0.05)
+    assert threading.active_count() == threads